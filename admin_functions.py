@@ -1,35 +1,58 @@
 # Importa os módulos necessários
 import discord
 from discord import app_commands
-import json
 import importlib
-import asyncio
-from database import query
+from database import query, executar_query_async, BancoIndisponivel
+from indice_membros import indice
+from indice_prefixos import prefixos
+from config_manager import config_manager
+from metricas import resumo, adiar
+from sincronizacao_comandos import sincronizar_comandos
+from cache_servidores import servidores
+from cache_cartoes import cartoes
+import coalescencia
+from auditoria import buscar_historico, formatar_evento, titulo_evento, cursor_evento
+from functions.cla_views import ListaPaginadaView
+from shards import estatisticas_shards
+from config_servidores import configuracoes, LIMITE_MEMBROS_MAXIMO
+from modelos import ClaNome
+from functions.cla_functions import MENSAGEM_BANCO_INDISPONIVEL
 
-# Define o nome do arquivo de configuração
-CONFIG_FILE = 'config.json'
+# Conjunto de administradores do bot, atualizado a cada recarga da configuração
+admin_ids = frozenset()
 
-# Função para carregar as configurações do arquivo JSON
+# Função para obter as configurações (snapshot imutável, sem acesso ao arquivo)
 def carregar_config():
-    with open(CONFIG_FILE, 'r') as f:
-        return json.load(f)
+    return config_manager.obter()
 
-# Verifica se o usuário é um administrador
-def is_admin(interaction: discord.Interaction) -> bool:
-    config = carregar_config()
-    return interaction.user.id in config.get('admin_ids', [])
+# Atualiza o conjunto de administradores quando a configuração é recarregada
+def _atualizar_admin_ids(config):
+    global admin_ids
+    admin_ids = frozenset(config.get('admin_ids', ()))
+
+config_manager.assinar(_atualizar_admin_ids, imediato=True)
+
+# Verifica se o usuário é um administrador do bot ou, com servidor=True, também do servidor da interação
+async def is_admin(interaction: discord.Interaction, servidor: bool = False) -> bool:
+    if interaction.user.id in admin_ids:
+        return True
+    if not servidor or interaction.guild_id is None:
+        return False
+    # Administradores do servidor (tabela servidor_config), consultados no cache em memória
+    config = await configuracoes.obter(interaction.guild_id)
+    return interaction.user.id in config["admin_ids"]
 
 # Verifica se o usuário é um administrador e envia uma mensagem se não for
-async def check_admin(interaction: discord.Interaction) -> bool:
-    if not is_admin(interaction):
+async def check_admin(interaction: discord.Interaction, servidor: bool = False) -> bool:
+    if not await is_admin(interaction, servidor):
         await interaction.response.send_message("Você não tem permissão para usar este comando.", ephemeral=True)
         return False
     return True
 
-# Função assíncrona para verificar atualizações periodicamente
+# Função assíncrona chamada periodicamente para verificar atualizações
 async def verificar_atualizacoes():
-    while True:
-        await asyncio.sleep(300)
+    # Recarrega a configuração se o arquivo tiver sido alterado
+    config_manager.verificar_alteracoes()
 
 # Configura os comandos de administração
 def setup_admin_commands(tree: app_commands.CommandTree, client: discord.Client):
@@ -40,11 +63,8 @@ def setup_admin_commands(tree: app_commands.CommandTree, client: discord.Client)
         if not await check_admin(interaction):
             return
         
-        config = carregar_config()
-        config['status'] = novo_status
-        await client.change_presence(activity=discord.Game(name=novo_status))
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump(config, f, indent=4)
+        # Grava o novo status; a presença é atualizada pelo assinante da configuração
+        config_manager.salvar({'status': novo_status})
         await interaction.response.send_message(f"Status atualizado para: Jogando {novo_status}", ephemeral=True)
 
     # Comando para recarregar um módulo específico
@@ -69,18 +89,257 @@ def setup_admin_commands(tree: app_commands.CommandTree, client: discord.Client)
             return
         
         await interaction.response.defer(ephemeral=True)
-        config = carregar_config()
-        await client.change_presence(activity=discord.Game(name=config['status']))
+        # Força a releitura do arquivo; os assinantes (presença, administradores, canal de logs) são avisados
+        try:
+            config_manager.recarregar(forcar=True)
+        except Exception as e:
+            await interaction.followup.send(f"Erro ao recarregar as configurações: {str(e)}")
+            return
         await interaction.followup.send("Configurações recarregadas!")
 
+    # Comando para comparar o índice de membros em memória com o banco de dados
+    @tree.command(name='verificar_indice', description='Compara o índice de membros dos clãs com o banco de dados')
+    @app_commands.guild_only()
+    async def verificar_indice(interaction: discord.Interaction, reconstruir: bool = False):
+        if not await check_admin(interaction):
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        try:
+            divergencias = await indice.verificar_consistencia()
+        except BancoIndisponivel:
+            await interaction.followup.send(MENSAGEM_BANCO_INDISPONIVEL)
+            return
+        if not divergencias:
+            await interaction.followup.send("Índice consistente com o banco de dados.")
+            return
+
+        mensagem = f"{len(divergencias)} divergência(s) encontrada(s):\n"
+        mensagem += "\n".join(f"- {d}" for d in divergencias[:20])
+        if len(divergencias) > 20:
+            mensagem += f"\n... e mais {len(divergencias) - 20}"
+        if reconstruir:
+            try:
+                await indice.carregar()
+                mensagem += "\nÍndice reconstruído a partir do banco."
+            except BancoIndisponivel:
+                mensagem += "\nÍndice não reconstruído: banco de dados indisponível."
+        await interaction.followup.send(mensagem[:2000])
+
+    # Comando para forçar a sincronização dos comandos com o Discord
+    @tree.command(name='sincronizar_comandos', description='Força a sincronização dos comandos com o Discord')
+    @app_commands.guild_only()
+    async def forcar_sincronizacao(interaction: discord.Interaction):
+        if not await check_admin(interaction):
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        try:
+            await sincronizar_comandos(tree, guild=interaction.guild, forcar=True)
+            await sincronizar_comandos(tree, forcar=True)
+        except discord.HTTPException as e:
+            await interaction.followup.send(f"Erro ao sincronizar os comandos: {str(e)}")
+            return
+        await interaction.followup.send("Comandos sincronizados neste servidor e globalmente!")
+
+    # Comando para consultar o histórico de alterações de um clã
+    @tree.command(name='historico_cla', description='Mostra o histórico de alterações de um clã deste servidor')
+    @app_commands.guild_only()
+    async def historico_cla(interaction: discord.Interaction, cla: str):
+        if not await check_admin(interaction, servidor=True):
+            return
+
+        await adiar(interaction, ephemeral=True)
+        try:
+            servidor_id = await servidores.resolver(interaction.guild)
+            encontrado = await executar_query_async(
+                f"SELECT {ClaNome.colunas()} FROM cla WHERE servidor_id = %s AND (name_cla = %s OR tag_cla = %s) ORDER BY id LIMIT 1",
+                (servidor_id, cla, cla), modelo=ClaNome
+            )
+            if not encontrado:
+                await interaction.followup.send(f"Nenhum clã com o nome ou TAG '{cla}' neste servidor.")
+                return
+            linha = encontrado[0]
+
+            async def buscar_lote(cursor, limite):
+                return await buscar_historico(linha.id, cursor, limite)
+
+            view = ListaPaginadaView(buscar_lote, formatar_evento, interaction.guild, interaction.user.id,
+                                     f"Histórico de {linha.name_cla} [{linha.tag_cla}]", titulo_campo=titulo_evento, cursor=cursor_evento)
+            if not await view.iniciar(interaction):
+                await interaction.followup.send("Nenhuma alteração registrada para este clã.")
+        except BancoIndisponivel:
+            await interaction.followup.send(MENSAGEM_BANCO_INDISPONIVEL)
+
+    # Sugere os clãs do servidor cujo nome ou TAG começa com o texto digitado
+    @historico_cla.autocomplete('cla')
+    async def sugerir_cla(interaction: discord.Interaction, atual: str):
+        servidor_id = servidores.obter(interaction.guild_id) if interaction.guild_id else None
+        return [
+            app_commands.Choice(name=f"{nome} [{tag}]"[:100], value=nome)
+            for _, nome, tag in prefixos.sugerir(servidor_id, atual)
+        ]
+
+    # Comando para exibir as métricas de desempenho do bot
+    @tree.command(name='metricas', description='Mostra as latências dos comandos, do banco e do Discord')
+    @app_commands.guild_only()
+    async def mostrar_metricas(interaction: discord.Interaction):
+        if not await check_admin(interaction):
+            return
+
+        await adiar(interaction, ephemeral=True)
+        secoes = [
+            ("Comandos (tempo total)", "bot_comando_segundos"),
+            ("Comandos (até o defer)", "bot_comando_defer_segundos"),
+            ("Banco de dados", "bot_db_query_segundos"),
+            ("Discord HTTP", "bot_discord_http_segundos"),
+            ("Inicialização", "bot_inicializacao_segundos"),
+        ]
+        estatisticas = cartoes.estatisticas()
+        mensagem = (f"**Cache de cartões:** {estatisticas['itens']} itens ({estatisticas['bytes'] // 1024} KiB), "
+                    f"acerto {estatisticas['taxa_acerto']:.0%} ({estatisticas['acertos']}/{estatisticas['acertos'] + estatisticas['falhas']}), "
+                    f"{estatisticas['remocoes']} remoções\n")
+        for grupo in coalescencia.grupos:
+            chamadas = grupo.estatisticas()
+            mensagem += f"**Coalescência {grupo.nome}:** {chamadas['compartilhadas']} de {chamadas['executadas'] + chamadas['compartilhadas']} chamadas compartilhadas\n"
+        for titulo, nome in secoes:
+            linhas = resumo(nome, limite=6)
+            bloco = f"**{titulo}**\n```\n" + ("\n".join(linhas) or "sem dados") + "\n```\n"
+            if len(mensagem) + len(bloco) > 2000:
+                break
+            mensagem += bloco
+        await interaction.followup.send(mensagem)
+
+    # Comando para exibir o estado de cada shard deste processo
+    @tree.command(name='shards', description='Mostra a latência, os servidores e as interações de cada shard')
+    @app_commands.guild_only()
+    async def mostrar_shards(interaction: discord.Interaction):
+        if not await check_admin(interaction):
+            return
+
+        linhas = []
+        for shard in estatisticas_shards(client):
+            latencia = f"{shard['latencia_ms']:.0f} ms" if shard['latencia_ms'] is not None else "conectando"
+            linhas.append(f"{shard['shard']:>5} {latencia:>11} {shard['servidores']:>10} {shard['interacoes']:>10} {shard['desconexoes']:>11}")
+        mensagem = (f"**Shards deste processo** (total: {client.shard_count})\n```\n"
+                    f"{'shard':>5} {'latência':>11} {'servidores':>10} {'interações':>10} {'desconexões':>11}\n"
+                    + "\n".join(linhas[:40]) + "\n```")
+        await interaction.response.send_message(mensagem, ephemeral=True)
+
+    # Grupo de comandos para as configurações do bot neste servidor (tabela servidor_config)
+    # Grava uma configuração do servidor e avisa o usuário se a gravação falhar
+    async def salvar_config(interaction: discord.Interaction, gravacao) -> bool:
+        try:
+            if await gravacao:
+                return True
+            await interaction.followup.send("Erro ao salvar a configuração. Por favor, tente novamente.")
+        except BancoIndisponivel:
+            await interaction.followup.send(MENSAGEM_BANCO_INDISPONIVEL)
+        return False
+
+    config_servidor = app_commands.Group(
+        name='config_servidor', description='Configurações do bot neste servidor',
+        guild_only=True, default_permissions=discord.Permissions(manage_guild=True)
+    )
+
+    # Comando para exibir as configurações do servidor
+    @config_servidor.command(name='ver', description='Mostra as configurações do bot neste servidor')
+    async def config_ver(interaction: discord.Interaction):
+        if not await check_admin(interaction, servidor=True):
+            return
+
+        config = await configuracoes.obter(interaction.guild_id)
+        canal = f"<#{config['canal_logs']}>" if config['canal_logs'] else "não definido"
+        administradores = ", ".join(f"<@{admin_id}>" for admin_id in sorted(config['admin_ids'])) or "nenhum"
+        mensagem = (f"**Canal de logs:** {canal}\n"
+                    f"**Limite de membros por clã:** {config['limite_membros']}\n"
+                    f"**Administradores:** {administradores}\n**Limites de uso:**\n")
+        for comando, regras in sorted(config['limites'].items()):
+            descricao = ", ".join(f"{escopo}: {regra['capacidade']} a cada {regra['periodo']}s" for escopo, regra in regras.items())
+            mensagem += f"- /{comando}: {descricao}\n"
+        await interaction.response.send_message(mensagem[:2000], ephemeral=True)
+
+    # Comando para definir o canal de logs do servidor
+    @config_servidor.command(name='canal_logs', description='Define o canal de logs do bot neste servidor')
+    async def config_canal_logs(interaction: discord.Interaction, canal: discord.TextChannel):
+        if not await check_admin(interaction, servidor=True):
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        if not await salvar_config(interaction, configuracoes.definir_canal_logs(interaction.guild, canal.id)):
+            return
+        await interaction.followup.send(f"Canal de logs definido: {canal.mention}")
+
+    # Comando para definir o limite de membros por clã no servidor
+    @config_servidor.command(name='limite_membros', description='Define a quantidade máxima de membros por clã neste servidor')
+    async def config_limite_membros(interaction: discord.Interaction, quantidade: app_commands.Range[int, 2, LIMITE_MEMBROS_MAXIMO]):
+        if not await check_admin(interaction, servidor=True):
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        if not await salvar_config(interaction, configuracoes.definir_limite_membros(interaction.guild, quantidade)):
+            return
+        await interaction.followup.send(f"Limite de membros por clã definido: {quantidade}")
+
+    # Comando para adicionar ou remover um administrador do bot no servidor
+    @config_servidor.command(name='admin', description='Adiciona ou remove um administrador do bot neste servidor')
+    @app_commands.choices(acao=[
+        app_commands.Choice(name="Adicionar", value="adicionar"),
+        app_commands.Choice(name="Remover", value="remover")
+    ])
+    async def config_admin(interaction: discord.Interaction, acao: app_commands.Choice[str], membro: discord.Member):
+        if not await check_admin(interaction, servidor=True):
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        adicionar = acao.value == 'adicionar'
+        if not await salvar_config(interaction, configuracoes.alterar_admin(interaction.guild, membro.id, adicionar)):
+            return
+        await interaction.followup.send(f"{membro.mention} {'adicionado aos' if adicionar else 'removido dos'} administradores deste servidor.")
+
+    # Comando para definir o limite de uso de um comando no servidor (capacidade 0 volta ao padrão do bot)
+    @config_servidor.command(name='limite_comando', description='Define quantas vezes um comando pode ser usado por período neste servidor')
+    @app_commands.choices(escopo=[
+        app_commands.Choice(name="Por usuário", value="usuario"),
+        app_commands.Choice(name="Por servidor", value="servidor")
+    ])
+    async def config_limite_comando(interaction: discord.Interaction, comando: str, escopo: app_commands.Choice[str],
+                                    capacidade: app_commands.Range[int, 0, 1000], periodo: app_commands.Range[int, 1, 86400]):
+        if not await check_admin(interaction, servidor=True):
+            return
+
+        comando = comando.strip().lstrip('/')
+        if tree.get_command(comando.split(' ')[0]) is None:
+            await interaction.response.send_message(f"Comando /{comando} não encontrado.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        # Grava apenas o escopo alterado; os outros escopos do comando continuam como estão
+        regra = {"capacidade": capacidade, "periodo": periodo} if capacidade else None
+        if not await salvar_config(interaction, configuracoes.definir_limite_comando(interaction.guild, comando, escopo.value, regra)):
+            return
+        descricao = f"{capacidade} a cada {periodo}s" if capacidade else "padrão do bot"
+        await interaction.followup.send(f"Limite de /{comando} ({escopo.name.lower()}) definido: {descricao}")
+
+    tree.add_command(config_servidor)
+
     # Retorna a lista de comandos configurados
-    return [atualizar_status, recarregar, recarregar_config]
+    return [atualizar_status, recarregar, recarregar_config, verificar_indice, forcar_sincronizacao, historico_cla, mostrar_metricas, mostrar_shards, config_servidor]
 
 # Resumo do arquivo:
 # Este arquivo contém funções e comandos relacionados à administração de um bot Discord.
-# Ele inclui funções para carregar configurações, verificar permissões de administrador,
+# Ele inclui funções para obter as configurações (via config_manager), verificar permissões de administrador,
 # e configurar comandos específicos para administradores. Os comandos incluem:
 # - Atualizar o status do bot
 # - Recarregar módulos específicos
 # - Recarregar configurações
+# - Verificar a consistência do índice de membros dos clãs com o banco
+# - Forçar a sincronização dos comandos com o Discord
+# - Consultar o histórico de alterações de um clã (tabela cla_auditoria), página a página, com autocomplete do clã
+# - Exibir as métricas de desempenho (latência dos comandos, do banco, do Discord e da inicialização)
+# - Exibir a latência, os servidores, as interações e as desconexões de cada shard
+# - Ver e alterar as configurações do bot em cada servidor (/config_servidor: canal de logs, limite de membros
+#   por clã, administradores e limites de uso dos comandos), gravadas pelo config_servidores.py
+# Os comandos são registrados globalmente. Os que afetam o bot inteiro exigem um administrador do bot (admin_ids
+# do config.json); o histórico de clãs e /config_servidor também aceitam os administradores do próprio servidor.
 # O arquivo também define uma função para verificar atualizações periodicamente.
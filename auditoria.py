@@ -0,0 +1,76 @@
+# Importa os módulos necessários
+import logging  # Importa o módulo logging para registrar eventos
+from database import executar_query_async  # Importa o acesso assíncrono ao banco
+
+# Configura o logger para este módulo
+logger = logging.getLogger('bot')
+
+# Quantidade de meses com partição criada antecipadamente na tabela cla_auditoria
+MESES_A_FRENTE = 3
+
+# Descrição de cada ação registrada na tabela cla_auditoria
+DESCRICAO_ACOES = {
+    "criar": "Clã criado",
+    "adicionar": "Membros adicionados",
+    "remover": "Membros removidos",
+    "editar": "Membros alterados",
+    "excluir": "Clã excluído",
+    "historico": "Alteração (registro anterior ao histórico detalhado)",
+}
+
+# Eventos de um clã, do mais recente para o mais antigo, já com os discord_id resolvidos:
+# (id, criado_em, acao, autor_discord_id, adicionados_discord_ids, removidos_discord_ids)
+CONSULTA_HISTORICO = """
+    SELECT a.id, a.criado_em, a.acao, autor.discord_id,
+           ARRAY(SELECT m.discord_id FROM membros m WHERE m.id = ANY(a.adicionados) ORDER BY m.id),
+           ARRAY(SELECT m.discord_id FROM membros m WHERE m.id = ANY(a.removidos) ORDER BY m.id)
+    FROM cla_auditoria a
+    LEFT JOIN membros autor ON autor.id = a.autor_id
+    WHERE a.cla_id = %s {cursor}
+    ORDER BY a.criado_em DESC, a.id DESC
+    LIMIT %s
+"""
+
+async def buscar_historico(cla_id, cursor, limite):
+    """
+    Retorna uma página do histórico do clã. 'cursor' é o par (criado_em, id) do último
+    evento da página anterior, ou None para a primeira página.
+    """
+    if cursor is None:
+        return await executar_query_async(CONSULTA_HISTORICO.format(cursor=""), (cla_id, limite))
+    return await executar_query_async(
+        CONSULTA_HISTORICO.format(cursor="AND (a.criado_em, a.id) < (%s, %s)"), (cla_id, *cursor, limite)
+    )
+
+def cursor_evento(evento):
+    # Cursor da paginação: (criado_em, id) do evento
+    return (evento[1], evento[0])
+
+def titulo_evento(evento):
+    evento_id, criado_em, acao = evento[:3]
+    return f"{criado_em:%d/%m/%Y %H:%M} — {DESCRICAO_ACOES.get(acao, acao)}"
+
+def formatar_evento(evento, guild):
+    """
+    Monta o texto de um evento do histórico.
+    """
+    evento_id, criado_em, acao, autor_discord_id, adicionados, removidos = evento
+    mensagem = f"**Autor:** <@{autor_discord_id}>\n" if autor_discord_id else "**Autor:** Desconhecido\n"
+    if adicionados:
+        mensagem += "**Entraram:** " + ", ".join(f"<@{discord_id}>" for discord_id in adicionados) + "\n"
+    if removidos:
+        mensagem += "**Saíram:** " + ", ".join(f"<@{discord_id}>" for discord_id in removidos) + "\n"
+    return mensagem
+
+async def garantir_particoes():
+    """
+    Cria as partições mensais da tabela cla_auditoria para os próximos meses, se faltarem.
+    """
+    await executar_query_async("SELECT criar_particoes_cla_auditoria(CURRENT_DATE, %s)", (MESES_A_FRENTE,))
+    logger.info("Partições da auditoria de clãs verificadas")
+
+# Resumo do arquivo:
+# Este arquivo reúne o acesso ao histórico de alterações dos clãs (tabela cla_auditoria).
+# Os eventos são gravados pelo próprio banco, por triggers na tabela cla, na mesma transação de cada escrita;
+# aqui ficam a consulta paginada por cursor (criado_em, id) usada pelo comando /historico_cla, a formatação
+# dos eventos e a criação antecipada das partições mensais da tabela.
@@ -0,0 +1,298 @@
+# Benchmark e teste de carga dos comandos de clã, sem Discord.
+#
+# Os comandos do ClaCog são chamados diretamente com objetos falsos de Interaction/Guild,
+# contra um banco PostgreSQL local descartável: o script cria um banco temporário,
+# aplica as migrações, gera servidores/membros/clãs, executa os cenários e apaga o banco.
+#
+# Uso (a partir da raiz do repositório):
+#   python benchmarks/bench_cla.py --host localhost --usuario postgres --senha postgres --clas 200 --usuarios 50
+
+# Importa os módulos necessários
+import argparse  # Importa o módulo argparse para ler os argumentos da linha de comando
+import asyncio  # Importa o módulo asyncio para simular usuários simultâneos
+import json  # Importa o módulo json para gerar o arquivo de configuração temporário
+import os  # Importa o módulo os para variáveis de ambiente e caminhos
+import statistics  # Importa o módulo statistics para calcular as latências
+import sys  # Importa o módulo sys para ajustar o caminho de importação
+import tempfile  # Importa o módulo tempfile para o arquivo de configuração temporário
+import time  # Importa o módulo time para medir as durações
+
+import psycopg  # Importa o psycopg 3 para criar e apagar o banco temporário
+
+# Permite importar os módulos do bot a partir da raiz do repositório
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+# ID base dos usuários e do servidor falsos (snowflakes fictícios)
+ID_BASE_USUARIO = 100000000000000000
+ID_SERVIDOR = 900000000000000000
+MEMBROS_POR_CLA = 5
+
+# ---------------------------------------------------------------------------
+# Objetos falsos do Discord
+# ---------------------------------------------------------------------------
+
+class MembroFalso:
+    def __init__(self, discord_id):
+        self.id = discord_id
+        self.name = f"usuario{discord_id - ID_BASE_USUARIO}"
+        self.mention = f"<@{discord_id}>"
+
+class GuildFalsa:
+    def __init__(self, discord_id, membros):
+        self.id = discord_id
+        self.name = "Servidor de benchmark"
+        self._membros = {membro.id: membro for membro in membros}
+
+    def get_member(self, discord_id):
+        return self._membros.get(discord_id)
+
+    async def fetch_member(self, discord_id):
+        await asyncio.sleep(0.05)  # Simula a latência de uma requisição HTTP
+        return self._membros[discord_id]
+
+class MensagemFalsa:
+    async def edit(self, **kwargs):
+        pass
+
+class RespostaFalsa:
+    def __init__(self):
+        self._concluida = False
+
+    def is_done(self):
+        return self._concluida
+
+    async def defer(self, **kwargs):
+        self._concluida = True
+
+    async def send_message(self, *args, **kwargs):
+        self._concluida = True
+
+    async def edit_message(self, **kwargs):
+        self._concluida = True
+
+class FollowupFalso:
+    def __init__(self):
+        self.mensagens = []
+
+    async def send(self, conteudo=None, **kwargs):
+        self.mensagens.append(conteudo if conteudo is not None else kwargs)
+        return MensagemFalsa()
+
+class InteracaoFalsa:
+    def __init__(self, usuario, guild, comando):
+        self.user = usuario
+        self.guild = guild
+        self.guild_id = guild.id
+        self.command = comando
+        self.extras = {}
+        self.response = RespostaFalsa()
+        self.followup = FollowupFalso()
+        self.channel = None
+
+# ---------------------------------------------------------------------------
+# Banco de dados temporário
+# ---------------------------------------------------------------------------
+
+def criar_banco(args, nome_banco):
+    with psycopg.connect(host=args.host, port=args.port, user=args.usuario, password=args.senha,
+                         dbname="postgres", autocommit=True) as conn:
+        conn.execute(f"CREATE DATABASE {nome_banco}")
+
+def apagar_banco(args, nome_banco):
+    with psycopg.connect(host=args.host, port=args.port, user=args.usuario, password=args.senha,
+                         dbname="postgres", autocommit=True) as conn:
+        conn.execute(f"DROP DATABASE IF EXISTS {nome_banco} WITH (FORCE)")
+
+def escrever_config(args, nome_banco):
+    # Gera um config.json temporário apontando para o banco de benchmark
+    with open(os.path.join(RAIZ, "config EXEMPLO.json"), "r") as f:
+        config = json.load(f)
+    config["database"] = {"host": args.host, "port": args.port, "nome": nome_banco,
+                          "usuario": args.usuario, "senha": args.senha}
+    config.pop("metricas", None)
+    arquivo = tempfile.NamedTemporaryFile("w", suffix=".json", delete=False)
+    json.dump(config, arquivo)
+    arquivo.close()
+    return arquivo.name
+
+def popular_banco(args, nome_banco):
+    # Gera o servidor, os membros e os clãs (MEMBROS_POR_CLA membros cada)
+    total_membros = args.clas * MEMBROS_POR_CLA + args.usuarios * 2
+    with psycopg.connect(host=args.host, port=args.port, user=args.usuario, password=args.senha,
+                         dbname=nome_banco) as conn:
+        servidor_id = conn.execute(
+            "INSERT INTO servidores (nome, discord_id) VALUES (%s, %s) RETURNING id",
+            ("Servidor de benchmark", ID_SERVIDOR)).fetchone()[0]
+        conn.execute(
+            "INSERT INTO membros (discord_id, nome) "
+            "SELECT %s + n, 'usuario' || n FROM generate_series(0, %s - 1) AS n",
+            (ID_BASE_USUARIO, total_membros))
+        conn.execute("""
+            INSERT INTO cla (lider_id, name_cla, tag_cla, members_cla, servidor_id, ativo, last_modified_by)
+            SELECT ids[1], 'Clã ' || g, 'T' || g, ids, %s, TRUE, ids[1]
+            FROM (
+                SELECT g, array_agg(m.id ORDER BY m.id) AS ids
+                FROM generate_series(0, %s - 1) AS g
+                JOIN membros m ON m.discord_id BETWEEN %s + g * %s AND %s + g * %s + %s - 1
+                GROUP BY g
+            ) AS grupos
+        """, (servidor_id, args.clas, ID_BASE_USUARIO, MEMBROS_POR_CLA, ID_BASE_USUARIO, MEMBROS_POR_CLA, MEMBROS_POR_CLA))
+    return total_membros
+
+# ---------------------------------------------------------------------------
+# Execução dos cenários
+# ---------------------------------------------------------------------------
+
+def total_queries():
+    from metricas import metricas
+    return sum(histograma.total for _, _, histograma in metricas.histogramas("bot_db_query_segundos"))
+
+async def executar_cenario(nome, chamadas, concorrencia):
+    """
+    Executa as chamadas (corrotinas sem argumentos) com no máximo 'concorrencia'
+    em paralelo e retorna as estatísticas do cenário.
+    """
+    semaforo = asyncio.Semaphore(concorrencia)
+    latencias = []
+
+    async def executar(chamada):
+        async with semaforo:
+            inicio = time.perf_counter()
+            await chamada()
+            latencias.append(time.perf_counter() - inicio)
+
+    queries_antes = total_queries()
+    inicio = time.perf_counter()
+    await asyncio.gather(*(executar(chamada) for chamada in chamadas))
+    duracao = time.perf_counter() - inicio
+    queries = total_queries() - queries_antes
+
+    latencias.sort()
+    def percentil(p):
+        return latencias[min(len(latencias) - 1, int(len(latencias) * p / 100))] * 1000
+    return {
+        "cenario": nome,
+        "chamadas": len(latencias),
+        "vazao": len(latencias) / duracao if duracao else 0.0,
+        "p50": percentil(50),
+        "p95": percentil(95),
+        "p99": percentil(99),
+        "media": statistics.mean(latencias) * 1000 if latencias else 0.0,
+        "queries_por_comando": queries / len(latencias) if latencias else 0.0,
+    }
+
+async def executar_benchmark(args, total_membros):
+    # Importa os módulos do bot somente depois de BOT_CONFIG apontar para o banco temporário
+    from discord import app_commands
+    from functions.cla_functions import ClaCog
+    from functions.user_search import UsuarioCog
+    from indice_membros import indice
+    from cache_servidores import servidores
+    from metricas import marcar_inicio
+    from database import fechar_conexoes_async
+
+    await indice.carregar()
+    await servidores.carregar()
+
+    cog = ClaCog()
+    cog_usuario = UsuarioCog()
+    membros = [MembroFalso(ID_BASE_USUARIO + n) for n in range(total_membros)]
+    guild = GuildFalsa(ID_SERVIDOR, membros)
+
+    def chamada(nome_comando, usuario, grupo=cog, **parametros):
+        comando = grupo.get_command(nome_comando)
+
+        async def executar():
+            interacao = InteracaoFalsa(usuario, guild, comando)
+            marcar_inicio(interacao)
+            await comando.callback(grupo, interacao, **parametros)
+        return executar
+
+    lideres = [membros[i * MEMBROS_POR_CLA] for i in range(min(args.clas, args.usuarios))]
+    livres = membros[args.clas * MEMBROS_POR_CLA:]
+    resultados = []
+
+    for _ in range(args.rodadas):
+        resultados.append(await executar_cenario(
+            "cla status",
+            [chamada("status", membros[(i * 7) % (args.clas * MEMBROS_POR_CLA)]) for i in range(args.usuarios)],
+            args.concorrencia))
+        resultados.append(await executar_cenario(
+            "cla list", [chamada("list", lideres[0])], 1))
+        # Alterna trechos exatos, trechos com erro de digitação e IDs do Discord
+        formatos = (lambda n: f"usuario{n}", lambda n: f"usaurio{n}", lambda n: str(ID_BASE_USUARIO + n))
+        termos = [formatos[i % 3]((i * 37) % total_membros) for i in range(args.usuarios)]
+        resultados.append(await executar_cenario(
+            "usuario buscar",
+            [chamada("buscar", membros[0], grupo=cog_usuario, termo=termo) for termo in termos],
+            args.concorrencia))
+
+    # Cada líder adiciona e depois remove um membro livre
+    adicionar = app_commands.Choice(name="Adicionar", value="adicionar")
+    remover = app_commands.Choice(name="Remover", value="remover")
+    alvos = list(zip(lideres, livres))
+    resultados.append(await executar_cenario(
+        "cla editar (adicionar)",
+        [chamada("editar", lider, acao=adicionar, membros=livre.mention) for lider, livre in alvos],
+        args.concorrencia))
+    resultados.append(await executar_cenario(
+        "cla editar (remover)",
+        [chamada("editar", lider, acao=remover, membros=livre.mention) for lider, livre in alvos],
+        args.concorrencia))
+
+    # Usuários sem clã criam clãs em duplas
+    pares = [(livres[i], livres[i + 1]) for i in range(0, len(livres) - 1, 2)]
+    resultados.append(await executar_cenario(
+        "cla criar",
+        [chamada("criar", a, nome=f"Bench {a.id}", tag=f"B{a.id % 100000}", membros=b.mention) for a, b in pares],
+        args.concorrencia))
+
+    await fechar_conexoes_async()
+    return resultados
+
+def imprimir_relatorio(resultados):
+    print(f"{'cenário':24} {'chamadas':>8} {'vazão/s':>9} {'média':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'queries/cmd':>12}")
+    for r in resultados:
+        print(f"{r['cenario']:24} {r['chamadas']:>8} {r['vazao']:>9.1f} {r['media']:>7.1f}ms "
+              f"{r['p50']:>7.1f}ms {r['p95']:>7.1f}ms {r['p99']:>7.1f}ms {r['queries_por_comando']:>12.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos comandos de clã contra um PostgreSQL local")
+    parser.add_argument("--host", default=os.environ.get("PGHOST", "localhost"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PGPORT", 5432)))
+    parser.add_argument("--usuario", default=os.environ.get("PGUSER", "postgres"))
+    parser.add_argument("--senha", default=os.environ.get("PGPASSWORD", ""))
+    parser.add_argument("--clas", type=int, default=200, help="quantidade de clãs gerados")
+    parser.add_argument("--usuarios", type=int, default=50, help="usuários simulados por cenário")
+    parser.add_argument("--concorrencia", type=int, default=50, help="comandos executados em paralelo")
+    parser.add_argument("--rodadas", type=int, default=3, help="repetições dos cenários de leitura")
+    args = parser.parse_args()
+
+    nome_banco = f"bot_bench_{os.getpid()}"
+    criar_banco(args, nome_banco)
+    caminho_config = escrever_config(args, nome_banco)
+    os.environ["BOT_CONFIG"] = caminho_config
+    try:
+        from db_create.migrar import aplicar_migracoes
+        import psycopg2
+        conn = psycopg2.connect(host=args.host, port=args.port, user=args.usuario, password=args.senha, dbname=nome_banco)
+        try:
+            aplicar_migracoes(conn)
+        finally:
+            conn.close()
+        total_membros = popular_banco(args, nome_banco)
+        resultados = asyncio.run(executar_benchmark(args, total_membros))
+        imprimir_relatorio(resultados)
+    finally:
+        os.unlink(caminho_config)
+        apagar_banco(args, nome_banco)
+
+if __name__ == "__main__":
+    main()
+
+# Resumo do arquivo:
+# Este arquivo implementa o benchmark e teste de carga dos comandos do ClaCog (status, criar, editar e list).
+# Ele cria um banco PostgreSQL temporário, aplica as migrações e gera muitos clãs e membros; depois executa os
+# comandos com objetos falsos do Discord simulando vários usuários simultâneos. O relatório mostra vazão,
+# latências (média, p50, p95, p99) e quantidade de idas ao banco por comando, a partir das métricas do bot.
@@ -0,0 +1,107 @@
+# Importa os módulos necessários
+import logging  # Importa o módulo logging para registrar eventos
+import sys  # Importa o módulo sys para estimar a memória ocupada pelos cartões
+from collections import OrderedDict  # Importa o OrderedDict para a ordem de uso (LRU)
+from config_manager import config_manager  # Importa o serviço de configuração compartilhado
+from database import registrar_observador  # Importa o registro de observadores de escrita
+from metricas import metricas  # Importa o registro de métricas do bot
+
+# Configura o logger para este módulo
+logger = logging.getLogger('bot')
+
+# Limites padrão do cache (podem ser definidos na seção "cache_cartoes" do config.json)
+MAX_ITENS_PADRAO = 2000
+MAX_BYTES_PADRAO = 4 * 1024 * 1024
+
+class CacheCartoes:
+    """
+    Cache LRU dos cartões (texto já formatado) dos clãs, por id e versão (ult_atualizacao).
+    Uma entrada só é usada se a versão pedida for a mesma guardada; as escritas na
+    tabela cla descartam a entrada do clã alterado.
+    """
+
+    def __init__(self, max_itens=MAX_ITENS_PADRAO, max_bytes=MAX_BYTES_PADRAO):
+        # cla_id -> (versao, linha, texto, tamanho), do menos para o mais recentemente usado
+        self._itens = OrderedDict()
+        self.max_itens = max_itens
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.acertos = 0
+        self.falhas = 0
+        self.remocoes = 0
+
+    def obter(self, cla_id, versao, contar=True):
+        """
+        Retorna (linha, texto) do clã na versão informada, ou None.
+        Com contar=False a consulta não entra nas estatísticas.
+        """
+        item = self._itens.get(cla_id)
+        if item is None or item[0] != versao:
+            if contar:
+                self.falhas += 1
+                metricas.incrementar("bot_cache_cartoes_total", resultado="falha")
+            return None
+        self._itens.move_to_end(cla_id)
+        if contar:
+            self.acertos += 1
+            metricas.incrementar("bot_cache_cartoes_total", resultado="acerto")
+        return item[1], item[2]
+
+    def guardar(self, cla_id, versao, linha, texto):
+        """
+        Guarda o cartão do clã, descartando os menos usados se os limites forem ultrapassados.
+        """
+        self.invalidar(cla_id)
+        tamanho = sys.getsizeof(texto) + sys.getsizeof(linha)
+        self._itens[cla_id] = (versao, linha, texto, tamanho)
+        self.bytes += tamanho
+        while self._itens and (len(self._itens) > self.max_itens or self.bytes > self.max_bytes):
+            _, (_, _, _, tamanho_removido) = self._itens.popitem(last=False)
+            self.bytes -= tamanho_removido
+            self.remocoes += 1
+            metricas.incrementar("bot_cache_cartoes_total", resultado="remocao")
+
+    def invalidar(self, cla_id):
+        item = self._itens.pop(cla_id, None)
+        if item is not None:
+            self.bytes -= item[3]
+
+    def limpar(self):
+        self._itens.clear()
+        self.bytes = 0
+
+    def estatisticas(self):
+        """
+        Retorna a ocupação e a taxa de acerto do cache.
+        """
+        consultas = self.acertos + self.falhas
+        return {
+            "itens": len(self._itens),
+            "bytes": self.bytes,
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "remocoes": self.remocoes,
+            "taxa_acerto": self.acertos / consultas if consultas else 0.0,
+        }
+
+    def _aplicar_config(self, config):
+        # Atualiza os limites quando a configuração é recarregada
+        limites = config.get('cache_cartoes', {})
+        self.max_itens = limites.get('max_itens', MAX_ITENS_PADRAO)
+        self.max_bytes = limites.get('max_bytes', MAX_BYTES_PADRAO)
+
+    def _ao_alterar_cla(self, operacao, registros):
+        # Observador da tabela cla: qualquer escrita descarta o cartão do clã
+        for registro in registros:
+            self.invalidar(registro["id"])
+
+# Instância única do cache, compartilhada pelos comandos
+cartoes = CacheCartoes()
+config_manager.assinar(cartoes._aplicar_config, imediato=True)
+registrar_observador("cla", cartoes._ao_alterar_cla)
+
+# Resumo do arquivo:
+# Este arquivo define o CacheCartoes, um cache LRU dos cartões de clã já formatados usados por /cla status
+# e /cla list. Cada entrada é identificada pelo id do clã e validada pela versão (ult_atualizacao) conhecida
+# pelo índice de membros, e é descartada a cada escrita na tabela cla (criação e edição pelo ClaCog).
+# O cache é limitado em quantidade de itens e em memória estimada, e contabiliza acertos, falhas e remoções.
@@ -0,0 +1,79 @@
+# Importa os módulos necessários
+import logging  # Importa o módulo logging para registrar eventos
+from database import executar_query_async, upsert_async, registrar_observador  # Importa o acesso assíncrono ao banco
+from coalescencia import GrupoChamadas  # Importa a coalescência de chamadas simultâneas
+from modelos import Servidor  # Importa a linha tipada da tabela servidores
+
+# Configura o logger para este módulo
+logger = logging.getLogger('bot')
+
+class CacheServidores:
+    """
+    Cache do mapeamento entre o ID do servidor no Discord e o id da tabela servidores.
+    """
+
+    def __init__(self):
+        # discord_id do servidor -> servidores.id
+        self._ids = {}
+        # Cadastros em andamento, para que comandos simultâneos compartilhem o mesmo upsert
+        self._pendentes = GrupoChamadas("servidores")
+
+    async def carregar(self):
+        """
+        Preenche o cache com todos os servidores cadastrados.
+        """
+        resultado = await executar_query_async(f"SELECT {Servidor.colunas()} FROM servidores", modelo=Servidor)
+        if resultado is None:
+            logger.error("Não foi possível carregar o cache de servidores")
+            return
+        self._ids = {int(servidor.discord_id): servidor.id for servidor in resultado}
+        logger.info(f"Cache de servidores carregado: {len(self._ids)} servidores")
+
+    def obter(self, discord_id):
+        """
+        Retorna o id do servidor no banco se ele estiver em cache, ou None.
+        """
+        return self._ids.get(int(discord_id))
+
+    async def resolver(self, guild):
+        """
+        Retorna o id do servidor no banco, cadastrando-o se necessário.
+        Retorna None se o cadastro falhar.
+        """
+        servidor_id = self._ids.get(guild.id)
+        if servidor_id is not None:
+            return servidor_id
+
+        return await self._pendentes.executar(guild.id, self._registrar, guild)
+
+    async def _registrar(self, guild):
+        # Upsert atômico: servidores.discord_id é UNIQUE, então cadastros simultâneos
+        # (inclusive de outros processos) resultam na mesma linha
+        ids = await upsert_async("servidores", ["nome", "discord_id"], [(guild.name, guild.id)],
+                                 conflito="discord_id", atualizar=["nome"])
+        if not ids:
+            logger.error(f"Não foi possível registrar o servidor {guild.id}")
+            return None
+        servidor_id = ids.get(guild.id)
+        logger.info(f"Servidor {guild.id} registrado com ID: {servidor_id}")
+        return servidor_id
+
+    def _ao_alterar_servidor(self, operacao, registros):
+        # Observador da tabela servidores, chamado por database.py após cada escrita
+        for registro in registros:
+            if operacao == "exclude":
+                for discord_id, servidor_id in list(self._ids.items()):
+                    if servidor_id == registro["id"]:
+                        del self._ids[discord_id]
+            elif "discord_id" in registro:
+                self._ids[int(registro["discord_id"])] = registro["id"]
+
+# Instância única do cache, compartilhada pelos comandos
+servidores = CacheServidores()
+registrar_observador("servidores", servidores._ao_alterar_servidor)
+
+# Resumo do arquivo:
+# Este arquivo define o CacheServidores, que mapeia o ID de cada servidor do Discord para o id da tabela servidores.
+# O cache é preenchido na inicialização do bot e quando o bot entra em um novo servidor.
+# Em caso de ausência, o servidor é cadastrado com um upsert atômico (ON CONFLICT), e comandos simultâneos
+# no mesmo servidor compartilham o mesmo cadastro em andamento, evitando linhas duplicadas.
@@ -0,0 +1,48 @@
+# Importa os módulos necessários
+import asyncio  # Importa o módulo asyncio para compartilhar as chamadas em andamento
+from metricas import metricas  # Importa o registro de métricas do bot
+
+# Todos os grupos criados, para exibição das estatísticas
+grupos = []
+
+class GrupoChamadas:
+    """
+    Coalescência de chamadas idênticas simultâneas (singleflight): enquanto uma chamada
+    com a mesma chave estiver em andamento, as demais aguardam e recebem o mesmo
+    resultado (ou a mesma exceção) em vez de repetir o trabalho.
+    """
+
+    def __init__(self, nome):
+        self.nome = nome
+        # chave -> tarefa em andamento
+        self._em_andamento = {}
+        grupos.append(self)
+
+    async def executar(self, chave, funcao, *args):
+        """
+        Executa funcao(*args), ou aguarda a execução em andamento com a mesma chave.
+        A execução continua mesmo que quem a iniciou seja cancelado.
+        """
+        tarefa = self._em_andamento.get(chave)
+        if tarefa is None:
+            tarefa = asyncio.ensure_future(funcao(*args))
+            self._em_andamento[chave] = tarefa
+            tarefa.add_done_callback(lambda _: self._em_andamento.pop(chave, None))
+            metricas.incrementar("bot_chamadas_coalescidas_total", grupo=self.nome, resultado="executada")
+        else:
+            metricas.incrementar("bot_chamadas_coalescidas_total", grupo=self.nome, resultado="compartilhada")
+        return await asyncio.shield(tarefa)
+
+    def estatisticas(self):
+        """
+        Retorna quantas chamadas foram executadas e quantas reaproveitaram uma execução em andamento.
+        """
+        return {
+            "executadas": metricas.contador("bot_chamadas_coalescidas_total", grupo=self.nome, resultado="executada"),
+            "compartilhadas": metricas.contador("bot_chamadas_coalescidas_total", grupo=self.nome, resultado="compartilhada"),
+        }
+
+# Resumo do arquivo:
+# Este arquivo define o GrupoChamadas, que faz chamadas assíncronas idênticas e simultâneas compartilharem
+# uma única execução (por exemplo, vários membros executando /cla status ao mesmo tempo).
+# Cada grupo contabiliza as chamadas executadas e as compartilhadas nas métricas do bot.
@@ -0,0 +1,133 @@
+# Importa os módulos necessários
+import asyncio  # Importa o módulo asyncio para agendar assinantes assíncronos
+import hashlib  # Importa o módulo hashlib para detectar mudanças no conteúdo do arquivo
+import inspect  # Importa o módulo inspect para identificar callbacks assíncronos
+import json  # Importa o módulo json para ler e gravar o arquivo de configuração
+import logging  # Importa o módulo logging para registrar eventos
+import os  # Importa o módulo os para consultar a data de modificação do arquivo
+import threading  # Importa o módulo threading para proteger a recarga
+from types import MappingProxyType  # Importa o tipo de dicionário somente leitura
+
+# Configura o logger para este módulo
+logger = logging.getLogger('config')
+
+# Caminho do arquivo de configuração (pode ser trocado pela variável de ambiente BOT_CONFIG)
+CONFIG_FILE = os.environ.get('BOT_CONFIG', 'config.json')
+
+def congelar(valor):
+    """
+    Converte dicionários e listas em estruturas imutáveis, recursivamente.
+    """
+    if isinstance(valor, dict):
+        return MappingProxyType({chave: congelar(item) for chave, item in valor.items()})
+    if isinstance(valor, list):
+        return tuple(congelar(item) for item in valor)
+    return valor
+
+def descongelar(valor):
+    """
+    Converte um snapshot imutável de volta em dicionários e listas comuns.
+    """
+    if isinstance(valor, MappingProxyType):
+        return {chave: descongelar(item) for chave, item in valor.items()}
+    if isinstance(valor, tuple):
+        return [descongelar(item) for item in valor]
+    return valor
+
+class ConfigManager:
+    """
+    Lê o arquivo de configuração uma única vez e serve um snapshot imutável.
+    O arquivo só é relido quando sua data de modificação ou seu conteúdo mudam,
+    ou quando uma recarga é forçada; os assinantes são avisados a cada recarga.
+    """
+
+    def __init__(self, caminho=CONFIG_FILE):
+        self.caminho = caminho
+        self._snapshot = None
+        self._mtime = None
+        self._hash = None
+        self._assinantes = []
+        self._lock = threading.Lock()
+
+    def obter(self):
+        """
+        Retorna o snapshot atual da configuração, carregando o arquivo na primeira chamada.
+        """
+        if self._snapshot is None:
+            self.recarregar()
+        return self._snapshot
+
+    def recarregar(self, forcar=False):
+        """
+        Relê o arquivo. Retorna True se a configuração mudou (ou se forcar=True)
+        e os assinantes foram avisados.
+        """
+        with self._lock:
+            mtime = os.stat(self.caminho).st_mtime
+            with open(self.caminho, 'rb') as f:
+                conteudo = f.read()
+            novo_hash = hashlib.sha256(conteudo).hexdigest()
+            self._mtime = mtime
+            if novo_hash == self._hash and not forcar:
+                return False
+            snapshot = congelar(json.loads(conteudo))
+            self._snapshot = snapshot
+            self._hash = novo_hash
+        logger.info(f"Configuração carregada de {self.caminho}")
+        self._notificar(snapshot)
+        return True
+
+    def verificar_alteracoes(self):
+        """
+        Recarrega o arquivo apenas se a data de modificação mudou. Erros de leitura
+        mantêm o snapshot anterior.
+        """
+        try:
+            if self._snapshot is not None and os.stat(self.caminho).st_mtime == self._mtime:
+                return False
+            return self.recarregar()
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"Erro ao recarregar o arquivo de configuração: {e}")
+            return False
+
+    def salvar(self, alteracoes):
+        """
+        Grava as chaves informadas no arquivo e recarrega a configuração.
+        """
+        config = descongelar(self.obter())
+        config.update(alteracoes)
+        with open(self.caminho, 'w') as f:
+            json.dump(config, f, indent=4)
+        self.recarregar(forcar=True)
+
+    def assinar(self, callback, imediato=False):
+        """
+        Registra callback(config), chamado a cada recarga. Callbacks assíncronos
+        são agendados no event loop em execução. Com imediato=True o callback
+        também é chamado com o snapshot atual.
+        """
+        self._assinantes.append(callback)
+        if imediato:
+            self._chamar(callback, self.obter())
+
+    def _notificar(self, snapshot):
+        for callback in list(self._assinantes):
+            self._chamar(callback, snapshot)
+
+    def _chamar(self, callback, snapshot):
+        try:
+            resultado = callback(snapshot)
+            if inspect.isawaitable(resultado):
+                asyncio.get_running_loop().create_task(resultado)
+        except Exception as e:
+            logger.error(f"Erro em assinante da configuração: {e}", exc_info=True)
+
+# Instância única compartilhada por todos os módulos
+config_manager = ConfigManager()
+
+# Resumo do arquivo:
+# Este arquivo implementa o ConfigManager, o serviço de configuração compartilhado pelo bot.
+# O config.json é lido uma única vez e servido como um snapshot imutável (MappingProxyType/tuplas).
+# A releitura só acontece quando a data de modificação e o conteúdo (hash) do arquivo mudam,
+# ou quando é forçada (por exemplo pelo comando /recarregar_config).
+# Os módulos interessados (presença do bot, lista de administradores, canal de logs) assinam as recargas.
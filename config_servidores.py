@@ -0,0 +1,195 @@
+# Importa os módulos necessários
+import logging  # Importa o módulo logging para registrar eventos
+import time  # Importa o módulo time para a validade (TTL) das entradas
+from collections import OrderedDict  # Importa o OrderedDict para descartar os servidores menos usados (LRU)
+from types import MappingProxyType  # Importa o tipo de dicionário somente leitura
+from psycopg.types.json import Jsonb  # Importa o adaptador de JSONB do psycopg 3
+from config_manager import config_manager, congelar  # Importa o serviço de configuração compartilhado
+from database import executar_query_async, registrar_observador, BancoIndisponivel  # Importa o acesso assíncrono ao banco
+from cache_servidores import servidores  # Importa o cache de servidores cadastrados
+from coalescencia import GrupoChamadas  # Importa a coalescência de chamadas simultâneas
+from metricas import metricas  # Importa o registro de métricas do bot
+
+# Configura o logger para este módulo
+logger = logging.getLogger('bot')
+
+# Validade padrão, em segundos, das configurações em cache (seção "config_servidores" do config.json)
+TTL_PADRAO = 300
+
+# Quantidade máxima de servidores com configuração em memória
+MAX_SERVIDORES = 10000
+
+# Quantidade de membros por clã quando o servidor não define outra
+LIMITE_MEMBROS_PADRAO = 13
+
+# Maior limite de membros aceito (mesmo valor da restrição da tabela cla, migração 0006)
+LIMITE_MEMBROS_MAXIMO = 100
+
+# Configuração de um servidor, já com o id do servidor no banco (nulo se não cadastrado):
+# (servidor_id, admin_ids, canal_logs, limite_membros, limites)
+CONSULTA_CONFIG = """
+    SELECT s.id, sc.admin_ids, sc.canal_logs, sc.limite_membros, sc.limites
+    FROM servidores s
+    LEFT JOIN servidor_config sc ON sc.servidor_id = s.id
+    WHERE s.discord_id = %s
+"""
+
+class ConfigServidores:
+    """
+    Configurações de cada servidor (administradores, canal de logs, limite de membros por clã
+    e limites de uso dos comandos), gravadas na tabela servidor_config e mantidas em memória
+    por TTL_PADRAO segundos. O que o servidor não define vem do config.json.
+    """
+
+    def __init__(self):
+        # discord_id do servidor -> (expira_em, configuração), do menos para o mais recentemente usado
+        self._itens = OrderedDict()
+        # servidores.id -> discord_id, para invalidar a entrada a partir das notificações do banco
+        self._discord_por_servidor = {}
+        self._consultas = GrupoChamadas("config_servidores")
+        self._padrao = MappingProxyType({})
+        self.ttl = TTL_PADRAO
+
+    def _aplicar_config(self, config):
+        # Valores usados quando o servidor não define os seus; as entradas em cache são refeitas
+        self._padrao = MappingProxyType({
+            "admin_ids": frozenset(config.get('admin_ids', ())),
+            "canal_logs": config.get('canais', {}).get('logs'),
+            "limite_membros": LIMITE_MEMBROS_PADRAO,
+            "limites": config.get('limites', MappingProxyType({})),
+        })
+        self.ttl = config.get('config_servidores', {}).get('ttl', TTL_PADRAO)
+        self.limpar()
+
+    def _mesclar(self, admin_ids, canal_logs, limite_membros, limites):
+        # Os administradores do bot (config.json) também administram todos os servidores.
+        # Os limites do servidor substituem os do config.json escopo a escopo; os outros escopos do comando
+        # continuam seguindo o config.json.
+        padrao = self._padrao["limites"]
+        proprios = {
+            comando: MappingProxyType({**padrao.get(comando, {}), **regras})
+            for comando, regras in congelar(limites or {}).items()
+        }
+        return MappingProxyType({
+            "admin_ids": self._padrao["admin_ids"] | frozenset(admin_ids or ()),
+            "canal_logs": canal_logs or self._padrao["canal_logs"],
+            "limite_membros": limite_membros or self._padrao["limite_membros"],
+            "limites": MappingProxyType({**padrao, **proprios}),
+        })
+
+    async def obter(self, guild_id):
+        """
+        Retorna a configuração do servidor (ou a padrão, para guild_id None). Em O(1) enquanto
+        a entrada estiver válida; se o banco estiver indisponível, usa a última configuração conhecida.
+        """
+        if guild_id is None:
+            return self._padrao
+        item = self._itens.get(guild_id)
+        if item is not None and item[0] > time.monotonic():
+            self._itens.move_to_end(guild_id)
+            metricas.incrementar("bot_cache_config_servidores_total", resultado="acerto")
+            return item[1]
+        metricas.incrementar("bot_cache_config_servidores_total", resultado="falha")
+        try:
+            return await self._consultas.executar(guild_id, self._carregar, guild_id)
+        except BancoIndisponivel:
+            return item[1] if item is not None else self._padrao
+
+    async def _carregar(self, guild_id):
+        resultado = await executar_query_async(CONSULTA_CONFIG, (guild_id,))
+        if resultado is None:
+            return self._padrao
+        if resultado:
+            servidor_id, *colunas = resultado[0]
+            self._discord_por_servidor[servidor_id] = guild_id
+            config = self._mesclar(*colunas)
+        else:
+            config = self._padrao
+        self._itens[guild_id] = (time.monotonic() + self.ttl, config)
+        self._itens.move_to_end(guild_id)
+        while len(self._itens) > MAX_SERVIDORES:
+            self._itens.popitem(last=False)
+        return config
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    async def _gravar(self, guild, atribuicao, params):
+        # Upsert atômico de uma coluna; 'atribuicao' usa servidor_config.<coluna> para o valor atual
+        servidor_id = await servidores.resolver(guild)
+        if servidor_id is None:
+            return False
+        coluna, expressao_insercao, expressao_atualizacao = atribuicao
+        resultado = await executar_query_async(
+            f"""
+            INSERT INTO servidor_config (servidor_id, {coluna}) VALUES (%s, {expressao_insercao})
+            ON CONFLICT (servidor_id) DO UPDATE
+            SET {coluna} = {expressao_atualizacao}, atualizado_em = CURRENT_TIMESTAMP
+            RETURNING servidor_id
+            """,
+            (servidor_id, *params)
+        )
+        self.invalidar(guild.id)
+        return bool(resultado)
+
+    async def definir_canal_logs(self, guild, canal_id):
+        return await self._gravar(guild, ("canal_logs", "%s", "EXCLUDED.canal_logs"), (canal_id,))
+
+    async def definir_limite_membros(self, guild, limite):
+        return await self._gravar(guild, ("limite_membros", "%s", "EXCLUDED.limite_membros"), (limite,))
+
+    async def alterar_admin(self, guild, membro_id, adicionar):
+        if adicionar:
+            return await self._gravar(guild, (
+                "admin_ids", "ARRAY[%s]::BIGINT[]",
+                "array_append(array_remove(servidor_config.admin_ids, EXCLUDED.admin_ids[1]), EXCLUDED.admin_ids[1])"
+            ), (membro_id,))
+        return await self._gravar(guild, (
+            "admin_ids", "'{}'::BIGINT[]", "array_remove(servidor_config.admin_ids, %s::BIGINT)"
+        ), (membro_id,))
+
+    async def definir_limite_comando(self, guild, comando, escopo, regra):
+        """
+        Define o limite de uso de um escopo do comando no servidor ({"capacidade": n, "periodo": s}),
+        ou remove a definição (o escopo volta ao config.json) com regra None. Só o escopo informado é
+        gravado; os demais escopos do comando não são copiados do config.json.
+        """
+        if regra is None:
+            return await self._gravar(guild, (
+                "limites", "'{}'::JSONB", "servidor_config.limites #- ARRAY[%s::TEXT, %s::TEXT]"
+            ), (comando, escopo))
+        return await self._gravar(guild, (
+            "limites", "jsonb_build_object(%s::TEXT, jsonb_build_object(%s::TEXT, %s::JSONB))",
+            "jsonb_set(servidor_config.limites, ARRAY[%s::TEXT], "
+            "COALESCE(servidor_config.limites -> %s, '{}'::JSONB) || (EXCLUDED.limites -> %s))"
+        ), (comando, escopo, Jsonb(regra), comando, comando, comando))
+
+    # ------------------------------------------------------------------
+    # Invalidação
+    # ------------------------------------------------------------------
+
+    def invalidar(self, guild_id):
+        self._itens.pop(guild_id, None)
+
+    def limpar(self):
+        self._itens.clear()
+
+    def _ao_alterar_config(self, operacao, registros):
+        # Observador da tabela servidor_config (alterações de outros processos, via notificações do banco)
+        for registro in registros:
+            guild_id = self._discord_por_servidor.get(registro["servidor_id"])
+            if guild_id is not None:
+                self.invalidar(guild_id)
+
+# Instância única do cache, compartilhada pelos comandos
+configuracoes = ConfigServidores()
+config_manager.assinar(configuracoes._aplicar_config, imediato=True)
+registrar_observador("servidor_config", configuracoes._ao_alterar_config)
+
+# Resumo do arquivo:
+# Este arquivo define o ConfigServidores, as configurações de cada servidor do Discord gravadas na tabela
+# servidor_config (migração 0006): administradores, canal de logs, limite de membros por clã e limites de uso
+# dos comandos. As configurações ficam em memória (LRU com validade), são consultadas em O(1) por check_admin,
+# pelo LogManager, pelo ClaCog e pelo limitador, e são invalidadas a cada gravação e pelas notificações do banco.
+# O que o servidor não define vem do config.json (admin_ids, canais.logs e limites).
@@ -0,0 +1,88 @@
+# Importa os módulos necessários
+import atexit  # Importa o módulo atexit para esvaziar a fila de logs ao encerrar
+import logging  # Importa o módulo logging para configurar os loggers
+import logging.handlers  # Importa QueueHandler e QueueListener
+import queue  # Importa o módulo queue para a fila entre o event loop e a thread de escrita
+import sys  # Importa o módulo sys para escrever no stderr
+from config_manager import config_manager  # Importa o serviço de configuração compartilhado
+
+# Formato padrão das linhas de log
+FORMATO_PADRAO = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Valores padrão da seção "logs" do config.json
+PADROES_LOGS = {
+    "nivel": "INFO",  # Nível do logger raiz
+    "niveis": {},  # Nível de cada logger, por nome (por exemplo {"database": "WARNING"})
+    "arquivo": None,  # Arquivo de log, além do stderr
+    "amostragem_queries": 0.01,  # Fração das queries registradas no log (0 desativa, 1 registra todas)
+    "query_lenta_ms": 500,  # Queries mais lentas que isso são sempre registradas, como aviso
+}
+
+# Listener (thread de escrita) em execução
+_listener = None
+
+# Níveis definidos pela configuração anterior, para restaurar loggers removidos da configuração
+_niveis_aplicados = set()
+
+def opcoes_logs():
+    """
+    Retorna a seção "logs" do config.json, completada com os valores padrão.
+    """
+    return {**PADROES_LOGS, **config_manager.obter().get('logs', {})}
+
+def iniciar_logs():
+    """
+    Substitui os handlers do logger raiz por uma fila: os registros são escritos no stderr
+    (e no arquivo configurado) por uma thread separada. Pode ser chamada mais de uma vez.
+    """
+    global _listener
+    if _listener is not None:
+        return
+    opcoes = opcoes_logs()
+    formato = logging.Formatter(FORMATO_PADRAO)
+    destinos = [logging.StreamHandler(sys.stderr)]
+    if opcoes['arquivo']:
+        destinos.append(logging.FileHandler(opcoes['arquivo'], encoding='utf-8'))
+    for destino in destinos:
+        destino.setFormatter(formato)
+
+    fila = queue.SimpleQueue()
+    raiz = logging.getLogger()
+    for handler in list(raiz.handlers):
+        raiz.removeHandler(handler)
+    # O QueueHandler monta a mensagem (args e traceback) já na origem: os argumentos podem ser objetos
+    # mutáveis ou não seguros entre threads, e o traceback só está disponível enquanto a exceção existe.
+    # A thread de escrita aplica apenas o FORMATO_PADRAO e escreve.
+    raiz.addHandler(logging.handlers.QueueHandler(fila))
+    _listener = logging.handlers.QueueListener(fila, *destinos, respect_handler_level=True)
+    _listener.start()
+    atexit.register(encerrar_logs)
+    config_manager.assinar(_aplicar_config, imediato=True)
+
+def encerrar_logs():
+    """
+    Escreve os registros pendentes e encerra a thread de escrita.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def _aplicar_config(config):
+    # Aplica os níveis de log a cada recarga da configuração
+    opcoes = {**PADROES_LOGS, **config.get('logs', {})}
+    logging.getLogger().setLevel(opcoes['nivel'].upper())
+    niveis = opcoes['niveis']
+    for nome in _niveis_aplicados - set(niveis):
+        logging.getLogger(nome).setLevel(logging.NOTSET)
+    for nome, nivel in niveis.items():
+        logging.getLogger(nome).setLevel(nivel.upper())
+    _niveis_aplicados.clear()
+    _niveis_aplicados.update(niveis)
+
+# Resumo do arquivo:
+# Este arquivo configura o logging do bot: todos os loggers (bot, database, log_manager, config...) enviam
+# seus registros a uma fila (com a mensagem já montada), e uma thread separada (QueueListener) aplica o formato
+# das linhas e escreve no stderr e, opcionalmente, em um arquivo. Assim o event loop não espera pela escrita dos logs.
+# Os níveis do logger raiz e de cada logger são definidos na seção "logs" do config.json e reaplicados
+# a cada recarga da configuração.
@@ -1,49 +1,264 @@
 import psycopg2  # Importa o módulo psycopg2 para interagir com o PostgreSQL
 from psycopg2 import pool  # Importa o módulo de pool de conexões do psycopg2
-import json  # Importa o módulo json para manipular arquivos JSON
+import psycopg  # Importa o psycopg 3, usado pela camada assíncrona
+from psycopg.rows import class_row  # Importa a fábrica de linhas tipadas (modelos.py) do psycopg 3
+from psycopg_pool import AsyncConnectionPool, PoolTimeout  # Importa o pool de conexões assíncrono do psycopg 3
+import asyncio  # Importa o módulo asyncio para a camada assíncrona
+import sys  # Importa o módulo sys para identificar quem chamou executar_query
+import threading  # Importa o módulo threading para criar o pool síncrono uma única vez
+import time  # Importa o módulo time para medir a duração das queries
 import logging  # Importa o módulo logging para registrar logs
+import os  # Importa o módulo os para identificar o processo
+import socket  # Importa o módulo socket para identificar a máquina
+import random  # Importa o módulo random para a amostragem do log de queries
+import reprlib  # Importa o módulo reprlib para resumir os parâmetros no log
+from config_manager import config_manager  # Importa o serviço de configuração compartilhado
+from configuracao_logs import PADROES_LOGS  # Importa os valores padrão do log de queries
+from metricas import metricas  # Importa o registro de métricas do bot
 
 # Configuração do logger
 logger = logging.getLogger('database')
-logger.setLevel(logging.INFO)
 
-# Carrega as configurações do arquivo config.json
-with open('config.json', 'r') as config_file:
-    config = json.load(config_file)  # Lê o arquivo de configuração e armazena em 'config'
+# Resumo dos parâmetros no log das queries (strings e listas truncadas)
+_resumo_params = reprlib.Repr()
+_resumo_params.maxstring = 60
+_resumo_params.maxother = 60
+_resumo_params.maxlist = _resumo_params.maxtuple = 8
 
-# Configurações do banco de dados
-db_config = config['database']  # Extrai as configurações específicas do banco de dados
+# Amostragem do log de queries, atualizada a cada recarga da configuração
+_opcoes_log = {}
 
-# Cria um pool de conexões
-connection_pool = psycopg2.pool.SimpleConnectionPool(
-    1, 10,  # Define o número mínimo e máximo de conexões no pool
-    host=db_config['host'],  # Define o host do banco de dados
-    port=db_config['port'],  # Define a porta do banco de dados
-    database=db_config['nome'],  # Define o nome do banco de dados
-    user=db_config['usuario'],  # Define o usuário do banco de dados
-    password=db_config['senha']  # Define a senha do banco de dados
-)
+def _aplicar_config_logs(config):
+    opcoes = {**PADROES_LOGS, **config.get('logs', {})}
+    _opcoes_log["amostragem_queries"] = opcoes["amostragem_queries"]
+    _opcoes_log["query_lenta_ms"] = opcoes["query_lenta_ms"]
 
-def executar_query(query, params=None):
+config_manager.assinar(_aplicar_config_logs, imediato=True)
+
+def _registrar_query(origem, params, duracao, linhas):
+    """
+    Registra uma query no log, por amostragem: duração, linhas e parâmetros resumidos.
+    Queries lentas são sempre registradas, como aviso.
+    """
+    duracao_ms = duracao * 1000
+    lenta = duracao_ms >= _opcoes_log["query_lenta_ms"]
+    if not lenta and random.random() >= _opcoes_log["amostragem_queries"]:
+        return
+    nivel = logging.WARNING if lenta else logging.INFO
+    if logger.isEnabledFor(nivel):
+        logger.log(nivel, "query origem=%s duracao_ms=%.1f linhas=%s params=%s",
+                   origem, duracao_ms, linhas, _resumo_params.repr(params))
+
+# Valores padrão das opções de conexão (podem ser definidos na seção "database" do config.json)
+PADROES_CONEXAO = {
+    "pool_min": 1,  # Conexões mantidas abertas em cada pool
+    "pool_max": 10,  # Máximo de conexões em cada pool
+    "statement_timeout_ms": 10000,  # Tempo máximo de cada comando no servidor (0 desativa)
+    "connect_timeout": 5,  # Tempo máximo para abrir uma conexão, em segundos
+    "espera_conexao": 5,  # Tempo máximo de espera por uma conexão livre no pool, em segundos
+    "circuito_falhas": 5,  # Falhas de conexão seguidas que abrem o circuito
+    "circuito_espera": 30,  # Segundos com o circuito aberto antes de testar o banco novamente
+}
+
+# Identifica as conexões deste processo no banco (application_name); as notificações de alteração
+# trazem esse valor como origem, para que cada processo ignore as próprias escritas
+ID_INSTANCIA = f"bot-{socket.gethostname()}-{os.getpid()}"[:63]
+
+class BancoIndisponivel(Exception):
+    """
+    O banco de dados está inacessível (ou o circuito está aberto após falhas seguidas).
+    """
+
+# Erros que indicam que o banco (ou a conexão) está indisponível, e não um erro da query
+ERROS_CONEXAO = (psycopg2.OperationalError, psycopg2.InterfaceError,
+                 psycopg.OperationalError, psycopg.InterfaceError, PoolTimeout)
+
+# Subclasses de OperationalError causadas pela própria query (statement_timeout, deadlock, serialização):
+# o banco respondeu, então não contam como falha no circuito nem descartam a conexão
+ERROS_QUERY = (psycopg2.extensions.QueryCanceledError, psycopg2.extensions.TransactionRollbackError,
+               psycopg.errors.QueryCanceled, psycopg.errors.TransactionRollback)
+
+def opcoes_banco():
+    """
+    Retorna as configurações do banco, completadas com os valores padrão.
+    """
+    return dict(PADROES_CONEXAO, **config_manager.obter()['database'])
+
+def _parametros_conexao(config):
+    # Parâmetros de conexão comuns aos dois pools
+    parametros = {
+        "host": config['host'],
+        "port": config['port'],
+        "dbname": config['nome'],
+        "user": config['usuario'],
+        "password": config['senha'],
+        "connect_timeout": config['connect_timeout'],
+        "application_name": ID_INSTANCIA,
+    }
+    if config['statement_timeout_ms']:
+        parametros["options"] = f"-c statement_timeout={int(config['statement_timeout_ms'])}"
+    return parametros
+
+class Circuito:
+    """
+    Disjuntor do banco de dados. Após uma sequência de falhas de conexão o circuito
+    abre e as chamadas falham imediatamente com BancoIndisponivel; passado o tempo
+    de espera, uma única chamada de teste é liberada (meio-aberto) e o resultado
+    dela fecha ou reabre o circuito.
+    """
+    FECHADO, ABERTO, MEIO_ABERTO = "fechado", "aberto", "meio-aberto"
+
+    def __init__(self):
+        self.estado = self.FECHADO
+        self.falhas = 0
+        self.aberto_em = 0.0
+        self._lock = threading.Lock()
+
+    def permitir(self):
+        """
+        Levanta BancoIndisponivel se a chamada não deve chegar ao banco.
+        """
+        with self._lock:
+            if self.estado == self.FECHADO:
+                return
+            # Passado o tempo de espera, libera apenas esta chamada como teste
+            # (também quando um teste anterior terminou sem resultado, por exemplo cancelado)
+            if time.monotonic() - self.aberto_em >= opcoes_banco()['circuito_espera']:
+                self.estado = self.MEIO_ABERTO
+                self.aberto_em = time.monotonic()
+                logger.info("Circuito do banco meio-aberto: testando a conexão")
+                return
+            raise BancoIndisponivel("Circuito do banco aberto")
+
+    def registrar_sucesso(self):
+        with self._lock:
+            if self.estado != self.FECHADO:
+                logger.info("Circuito do banco fechado: conexão restabelecida")
+            self.estado = self.FECHADO
+            self.falhas = 0
+
+    def registrar_falha(self):
+        with self._lock:
+            self.falhas += 1
+            if self.estado == self.MEIO_ABERTO or self.falhas >= opcoes_banco()['circuito_falhas']:
+                if self.estado != self.ABERTO:
+                    logger.error(f"Circuito do banco aberto após {self.falhas} falha(s) de conexão")
+                    metricas.incrementar("bot_db_circuito_aberto_total")
+                self.estado = self.ABERTO
+                self.aberto_em = time.monotonic()
+
+# Disjuntor compartilhado pelas camadas síncrona e assíncrona
+circuito = Circuito()
+
+# Pool síncrono, criado no primeiro uso para que importar este módulo não dependa do banco
+connection_pool = None
+_pool_lock = threading.Lock()
+
+def _obter_pool():
+    """
+    Retorna o pool síncrono, criando-o na primeira chamada.
+    """
+    global connection_pool
+    if connection_pool is None:
+        with _pool_lock:
+            if connection_pool is None:
+                config = opcoes_banco()
+                logger.info("Criando pool de conexões")
+                connection_pool = psycopg2.pool.SimpleConnectionPool(
+                    config['pool_min'], config['pool_max'],  # Define o número mínimo e máximo de conexões no pool
+                    **_parametros_conexao(config)
+                )
+    return connection_pool
+
+def _obter_conexao():
+    """
+    Retorna uma conexão válida do pool síncrono, descartando as que foram encerradas
+    pelo servidor ou pela rede.
+    """
+    pool_sync = _obter_pool()
+    conn = pool_sync.getconn()
+    try:
+        if conn.closed:
+            raise psycopg2.InterfaceError("conexão encerrada")
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+        conn.rollback()
+        return conn
+    except ERROS_CONEXAO:
+        # Descarta a conexão quebrada e abre outra no lugar
+        logger.warning("Conexão inválida descartada do pool")
+        pool_sync.putconn(conn, close=True)
+        return pool_sync.getconn()
+
+# Observadores de alterações, por tabela. Permitem que caches em memória
+# (como o índice de membros dos clãs) sejam atualizados a cada escrita.
+_observadores = {}
+
+def registrar_observador(tabela, callback):
+    """
+    Registra uma função chamada como callback(operacao, registros) após cada
+    add/edit/exclude bem-sucedido na tabela. Cada registro é um dicionário com
+    o 'id' afetado e as colunas escritas.
+    """
+    _observadores.setdefault(tabela, []).append(callback)
+
+def notificar_alteracao(tabela, operacao, registros):
+    """
+    Repassa uma alteração aos observadores registrados para a tabela.
+    """
+    for callback in _observadores.get(tabela, []):
+        try:
+            callback(operacao, registros)
+        except Exception as error:
+            logger.error(f"Erro em observador de {tabela}: {error}", exc_info=True)
+
+def executar_query(query, params=None, origem=None):
     """
     Executa uma query no banco de dados.
+    'origem' identifica a chamada nas métricas; por padrão, é a função que chamou.
+    Levanta BancoIndisponivel se o banco estiver inacessível.
     """
-    conn = connection_pool.getconn()  # Obtém uma conexão do pool
+    origem = origem or sys._getframe(1).f_code.co_name  # Identifica o ponto de chamada
+    circuito.permitir()  # Falha imediatamente se o circuito estiver aberto
+    inicio = time.perf_counter()  # Marca o início para as métricas
+    conn = None
+    linhas = None  # Linhas retornadas ou afetadas, para o log
     try:
+        conn = _obter_conexao()  # Obtém uma conexão válida do pool
         with conn.cursor() as cur:  # Cria um cursor para executar a query
-            logger.info(f"Executando query: {query}")
-            logger.info(f"Parâmetros: {params}")
             cur.execute(query, params)  # Executa a query com os parâmetros fornecidos
             conn.commit()  # Confirma a transação
+            circuito.registrar_sucesso()  # O banco respondeu
+            linhas = cur.rowcount  # Linhas afetadas (ou retornadas)
             if cur.description:  # Verifica se a query retornou resultados
                 resultado = cur.fetchall()  # Retorna todos os resultados
-                logger.info(f"Resultado da query: {resultado}")
+                linhas = len(resultado)
                 return resultado
-            logger.info("Query executada com sucesso (sem retorno)")
+    except ERROS_QUERY as error:
+        logger.error(f"Query cancelada ou revertida pelo banco: {error}")
+        metricas.incrementar("bot_db_erros_total", origem=origem)  # Contabiliza o erro
+        circuito.registrar_sucesso()  # O banco respondeu
+        if conn is not None:
+            conn.rollback()  # Desfaz a transação antes de devolver a conexão
+    except ERROS_CONEXAO as error:
+        logger.error(f"Banco de dados indisponível: {error}")
+        metricas.incrementar("bot_db_erros_total", origem=origem)  # Contabiliza o erro
+        circuito.registrar_falha()  # Conta a falha no disjuntor
+        if conn is not None:
+            _obter_pool().putconn(conn, close=True)  # Descarta a conexão quebrada
+            conn = None
+        raise BancoIndisponivel(str(error)) from error
     except (Exception, psycopg2.Error) as error:
         logger.error(f"Erro ao executar query: {error}")  # Imprime mensagem de erro
+        metricas.incrementar("bot_db_erros_total", origem=origem)  # Contabiliza o erro
+        if conn is not None:
+            conn.rollback()  # Desfaz a transação com erro antes de devolver a conexão
     finally:
-        connection_pool.putconn(conn)  # Devolve a conexão ao pool
+        if conn is not None:
+            _obter_pool().putconn(conn)  # Devolve a conexão ao pool
+        duracao = time.perf_counter() - inicio
+        metricas.observar("bot_db_query_segundos", duracao, origem=origem)  # Registra a duração
+        _registrar_query(origem, params, duracao, linhas)  # Registra a query no log, por amostragem
 
 def query(tabela, colunas="*", condicao=None, params=None):
     """
@@ -52,8 +267,8 @@ def query(tabela, colunas="*", condicao=None, params=None):
     query = f"SELECT {colunas} FROM {tabela}"
     if condicao:
         query += f" WHERE {condicao}"
-    logger.info(f"Executando consulta em {tabela}")
-    return executar_query(query, params)
+    logger.debug("Executando consulta em %s", tabela)
+    return executar_query(query, params, f"query:{tabela}")
 
 def add(tabela, dados):
     """
@@ -62,10 +277,11 @@ def add(tabela, dados):
     colunas = ", ".join(dados.keys())
     valores = ", ".join(["%s"] * len(dados))
     query = f"INSERT INTO {tabela} ({colunas}) VALUES ({valores}) RETURNING id"
-    logger.info(f"Adicionando novo registro em {tabela}")
-    resultado = executar_query(query, tuple(dados.values()))
+    logger.debug("Adicionando novo registro em %s", tabela)
+    resultado = executar_query(query, tuple(dados.values()), f"add:{tabela}")
     if resultado:
         logger.info(f"Novo registro adicionado em {tabela} com ID: {resultado[0][0]}")
+        notificar_alteracao(tabela, "add", [dict(dados, id=resultado[0][0])])
         return resultado[0]
     logger.warning(f"Falha ao adicionar novo registro em {tabela}")
     return None
@@ -75,43 +291,240 @@ def edit(tabela, dados, condicao, params):
     Edita registros na tabela especificada que atendem à condição.
     """
     set_clause = ", ".join([f"{coluna} = %s" for coluna in dados.keys()])
-    query = f"UPDATE {tabela} SET {set_clause} WHERE {condicao}"
-    logger.info(f"Editando registros em {tabela}")
-    resultado = executar_query(query, tuple(dados.values()) + params)
-    logger.info(f"Registros atualizados em {tabela}")
+    query = f"UPDATE {tabela} SET {set_clause} WHERE {condicao} RETURNING id"
+    logger.debug("Editando registros em %s", tabela)
+    resultado = executar_query(query, tuple(dados.values()) + params, f"edit:{tabela}")
+    logger.debug("Registros atualizados em %s", tabela)
+    if resultado:
+        notificar_alteracao(tabela, "edit", [dict(dados, id=linha[0]) for linha in resultado])
     return resultado
 
 def exclude(tabela, condicao, params):
     """
     Exclui registros da tabela especificada que atendem à condição.
     """
-    query = f"DELETE FROM {tabela} WHERE {condicao}"  # Monta a query DELETE
-    logger.info(f"Excluindo registros de {tabela}")
-    resultado = executar_query(query, params)  # Executa a query
-    logger.info(f"Registros excluídos de {tabela}")
+    query = f"DELETE FROM {tabela} WHERE {condicao} RETURNING id"  # Monta a query DELETE
+    logger.debug("Excluindo registros de %s", tabela)
+    resultado = executar_query(query, params, f"exclude:{tabela}")  # Executa a query
+    logger.debug("Registros excluídos de %s", tabela)
+    if resultado:
+        notificar_alteracao(tabela, "exclude", [{"id": linha[0]} for linha in resultado])
     return resultado
 
 def fechar_conexoes():
     """
     Fecha todas as conexões do pool.
     """
+    global connection_pool
+    if connection_pool is None:
+        return
     logger.info("Fechando todas as conexões do pool")
     connection_pool.closeall()  # Fecha todas as conexões no pool
+    connection_pool = None
     logger.info("Todas as conexões foram fechadas")
 
+# ---------------------------------------------------------------------------
+# Camada assíncrona
+# ---------------------------------------------------------------------------
+# As funções abaixo espelham query/add/edit/exclude, mas rodam sobre um pool
+# assíncrono do psycopg 3 para não bloquear o event loop do discord.py.
+
+# Pool assíncrono, criado no primeiro uso (precisa de um event loop em execução)
+_pool_async = None
+_pool_async_lock = None
+
+async def _obter_pool_async():
+    """
+    Retorna o pool assíncrono, criando-o na primeira chamada.
+    """
+    global _pool_async, _pool_async_lock
+    if _pool_async is not None:
+        return _pool_async
+    if _pool_async_lock is None:
+        _pool_async_lock = asyncio.Lock()
+    async with _pool_async_lock:
+        if _pool_async is None:
+            config = opcoes_banco()
+            logger.info("Criando pool de conexões assíncrono")
+            novo_pool = AsyncConnectionPool(
+                min_size=config['pool_min'], max_size=config['pool_max'],  # Mesmos limites do pool síncrono
+                kwargs=_parametros_conexao(config),
+                timeout=config['espera_conexao'],  # Espera máxima por uma conexão livre
+                check=AsyncConnectionPool.check_connection,  # Valida cada conexão ao retirá-la do pool
+                reconnect_timeout=0,  # Continua tentando reconectar enquanto o banco estiver fora
+                open=False
+            )
+            await novo_pool.open()
+            _pool_async = novo_pool
+    return _pool_async
+
+async def conectar_async():
+    """
+    Abre uma conexão assíncrona dedicada (fora do pool, em autocommit), por exemplo para LISTEN.
+    """
+    return await psycopg.AsyncConnection.connect(autocommit=True, **_parametros_conexao(opcoes_banco()))
+
+async def abrir_pool_async():
+    """
+    Abre o pool assíncrono antecipadamente (por exemplo na inicialização do bot).
+    """
+    await _obter_pool_async()
+
+async def executar_query_async(query, params=None, origem=None, modelo=None):
+    """
+    Executa uma query no banco de dados sem bloquear o event loop.
+    'origem' identifica a chamada nas métricas; por padrão, é a função que chamou.
+    Com 'modelo' (uma classe de modelos.py), cada linha é criada pelo nome das colunas em vez de uma tupla.
+    Levanta BancoIndisponivel se o banco estiver inacessível.
+    """
+    origem = origem or sys._getframe(1).f_code.co_name
+    circuito.permitir()
+    inicio = time.perf_counter()
+    linhas = None
+    pool_async = await _obter_pool_async()
+    try:
+        # A conexão faz commit ao sair do bloco (ou rollback em caso de erro)
+        async with pool_async.connection() as conn:
+            async with conn.cursor(row_factory=class_row(modelo) if modelo else None) as cur:
+                await cur.execute(query, params)
+                circuito.registrar_sucesso()
+                linhas = cur.rowcount
+                if cur.description:
+                    resultado = await cur.fetchall()
+                    linhas = len(resultado)
+                    return resultado
+    except ERROS_QUERY as error:
+        logger.error(f"Query cancelada ou revertida pelo banco: {error}")
+        metricas.incrementar("bot_db_erros_total", origem=origem)
+        circuito.registrar_sucesso()
+    except ERROS_CONEXAO as error:
+        logger.error(f"Banco de dados indisponível: {error}")
+        metricas.incrementar("bot_db_erros_total", origem=origem)
+        circuito.registrar_falha()
+        raise BancoIndisponivel(str(error)) from error
+    except (Exception, psycopg.Error) as error:
+        logger.error(f"Erro ao executar query: {error}")
+        metricas.incrementar("bot_db_erros_total", origem=origem)
+    finally:
+        duracao = time.perf_counter() - inicio
+        metricas.observar("bot_db_query_segundos", duracao, origem=origem)
+        _registrar_query(origem, params, duracao, linhas)
+
+async def query_async(tabela, colunas="*", condicao=None, params=None):
+    """
+    Versão assíncrona de query().
+    """
+    query = f"SELECT {colunas} FROM {tabela}"
+    if condicao:
+        query += f" WHERE {condicao}"
+    logger.debug("Executando consulta em %s", tabela)
+    return await executar_query_async(query, params, f"query:{tabela}")
+
+async def add_async(tabela, dados):
+    """
+    Versão assíncrona de add().
+    """
+    colunas = ", ".join(dados.keys())
+    valores = ", ".join(["%s"] * len(dados))
+    query = f"INSERT INTO {tabela} ({colunas}) VALUES ({valores}) RETURNING id"
+    logger.debug("Adicionando novo registro em %s", tabela)
+    resultado = await executar_query_async(query, tuple(dados.values()), f"add:{tabela}")
+    if resultado:
+        logger.info(f"Novo registro adicionado em {tabela} com ID: {resultado[0][0]}")
+        notificar_alteracao(tabela, "add", [dict(dados, id=resultado[0][0])])
+        return resultado[0]
+    logger.warning(f"Falha ao adicionar novo registro em {tabela}")
+    return None
+
+async def edit_async(tabela, dados, condicao, params):
+    """
+    Versão assíncrona de edit().
+    """
+    set_clause = ", ".join([f"{coluna} = %s" for coluna in dados.keys()])
+    query = f"UPDATE {tabela} SET {set_clause} WHERE {condicao} RETURNING id"
+    logger.debug("Editando registros em %s", tabela)
+    resultado = await executar_query_async(query, tuple(dados.values()) + params, f"edit:{tabela}")
+    logger.debug("Registros atualizados em %s", tabela)
+    if resultado:
+        notificar_alteracao(tabela, "edit", [dict(dados, id=linha[0]) for linha in resultado])
+    return resultado
+
+async def exclude_async(tabela, condicao, params):
+    """
+    Versão assíncrona de exclude().
+    """
+    query = f"DELETE FROM {tabela} WHERE {condicao} RETURNING id"
+    logger.debug("Excluindo registros de %s", tabela)
+    resultado = await executar_query_async(query, params, f"exclude:{tabela}")
+    logger.debug("Registros excluídos de %s", tabela)
+    if resultado:
+        notificar_alteracao(tabela, "exclude", [{"id": linha[0]} for linha in resultado])
+    return resultado
+
+async def upsert_async(tabela, colunas, linhas, conflito, atualizar=None):
+    """
+    Insere várias linhas em um único comando, atualizando as que já existirem
+    (INSERT ... ON CONFLICT). Retorna um dicionário {valor da coluna de conflito: id},
+    incluindo as linhas que já existiam, ou None em caso de erro.
+    """
+    indice_conflito = colunas.index(conflito)
+    # Remove linhas repetidas: o mesmo comando não pode atualizar uma linha duas vezes
+    por_chave = {str(linha[indice_conflito]): tuple(linha) for linha in linhas}
+    if not por_chave:
+        return {}
+    linhas = list(por_chave.values())
+    # Sem colunas a atualizar, reescreve a própria chave para que RETURNING traga as linhas existentes
+    atualizar = atualizar or [conflito]
+    set_clause = ", ".join([f"{coluna} = EXCLUDED.{coluna}" for coluna in atualizar])
+    valores = ", ".join(["(" + ", ".join(["%s"] * len(colunas)) + ")"] * len(linhas))
+    query = (f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES {valores} "
+             f"ON CONFLICT ({conflito}) DO UPDATE SET {set_clause} RETURNING id, {conflito}")
+    logger.debug("Inserindo/atualizando %s registro(s) em %s", len(linhas), tabela)
+    resultado = await executar_query_async(query, tuple(valor for linha in linhas for valor in linha), f"upsert:{tabela}")
+    if resultado is None:
+        logger.warning(f"Falha ao inserir/atualizar registros em {tabela}")
+        return None
+    notificar_alteracao(tabela, "upsert", [
+        dict(zip(colunas, por_chave[str(chave)]), id=registro_id) for registro_id, chave in resultado
+    ])
+    return {chave: registro_id for registro_id, chave in resultado}
+
+async def fechar_conexoes_async():
+    """
+    Fecha o pool assíncrono, se ele tiver sido criado.
+    """
+    global _pool_async
+    if _pool_async is None:
+        return
+    logger.info("Fechando o pool de conexões assíncrono")
+    await _pool_async.close()
+    _pool_async = None
+    logger.info("Pool assíncrono fechado")
+
 # Exemplos de uso:
 # resultados = query("usuarios", "nome, email", "idade > %s", (18,))
 # add("usuarios", {"nome": "João", "email": "joao@exemplo.com", "idade": 25})
 # edit("usuarios", {"email": "novo_email@exemplo.com"}, "id = %s", (1,))
 # exclude("usuarios", "id = %s", (1,))
 # fechar_conexoes()
+# resultados = await query_async("usuarios", "nome, email", "idade > %s", (18,))
 
 # Resumo do arquivo:
 # Este arquivo implementa uma camada de abstração para operações de banco de dados usando PostgreSQL.
 # Ele utiliza um pool de conexões para gerenciar eficientemente as conexões com o banco de dados.
-# As configurações do banco são carregadas de um arquivo JSON.
+# As configurações do banco são obtidas do serviço de configuração compartilhado (config_manager).
 # O arquivo fornece funções para executar queries genéricas, realizar consultas (SELECT),
 # adicionar novos registros (INSERT), editar registros existentes (UPDATE) e excluir registros (DELETE).
 # Também inclui uma função para fechar todas as conexões do pool.
+# Escritas bem-sucedidas são repassadas a observadores registrados por tabela (registrar_observador),
+# o que permite manter caches em memória atualizados (write-through).
+# A duração de cada query é registrada nas métricas do bot, identificada pela função e tabela de origem.
 # Este módulo simplifica as operações de banco de dados e promove boas práticas de gerenciamento de conexões.
-# Agora, todas as operações de banco de dados são registradas em log para facilitar o rastreamento e depuração.
+# As queries são registradas no log por amostragem (origem, duração, linhas e parâmetros resumidos, sem o resultado);
+# as mais lentas que 'query_lenta_ms' (seção "logs" do config.json) são sempre registradas, como aviso.
+# Os pools são criados no primeiro uso (importar o módulo não conecta ao banco), validam as conexões ao
+# retirá-las e descartam as quebradas. Tamanhos, statement_timeout e o disjuntor são configuráveis na seção
+# "database" do config.json. Após falhas de conexão seguidas o circuito abre e as chamadas levantam
+# BancoIndisponivel imediatamente, até que uma chamada de teste encontre o banco novamente.
+# Há também uma camada assíncrona (query_async, add_async, edit_async, exclude_async, upsert_async) sobre um pool
+# do psycopg 3, usada pelos comandos do bot para não bloquear o event loop do discord.py.
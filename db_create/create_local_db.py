@@ -6,6 +6,8 @@ from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 import os
 # Importa o módulo logging para registrar logs
 import logging
+# Importa o executor de migrações do esquema
+from migrar import aplicar_migracoes
 
 # Configura o logging básico com nível INFO
 logging.basicConfig(level=logging.INFO)
@@ -58,27 +60,17 @@ def criar_tabelas():
             host=DB_HOST,
             port=DB_PORT
         )
-        # Cria um cursor para executar comandos SQL
-        cursor = conn.cursor()
-
-        # Abre e lê o arquivo db.sql
-        with open('db.sql', 'r') as sql_file:
-            sql_script = sql_file.read()
-            # Executa o script SQL lido do arquivo
-            cursor.execute(sql_script)
-
-        # Confirma as alterações no banco de dados
-        conn.commit()
+        # Aplica as migrações pendentes do diretório migrations/
+        aplicar_migracoes(conn)
         # Registra uma mensagem de sucesso
         logger.info("Tabelas criadas com sucesso.")
 
-        # Fecha o cursor e a conexão
-        cursor.close()
+        # Fecha a conexão
         conn.close()
 
     except FileNotFoundError:
-        # Registra um erro se o arquivo db.sql não for encontrado
-        logger.error("Arquivo db.sql não encontrado.")
+        # Registra um erro se o diretório de migrações não for encontrado
+        logger.error("Diretório migrations/ não encontrado.")
     except psycopg2.Error as e:
         # Registra um erro se houver falha ao criar as tabelas
         logger.error(f"Erro ao criar as tabelas: {e}")
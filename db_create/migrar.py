@@ -0,0 +1,169 @@
+# Importa o módulo psycopg2 para interagir com o PostgreSQL
+import psycopg2
+# Importa o módulo os para montar os caminhos dos arquivos
+import os
+# Importa o módulo re para reconhecer os nomes das migrações
+import re
+# Importa o módulo json para ler o arquivo de configuração
+import json
+# Importa o módulo argparse para ler os argumentos da linha de comando
+import argparse
+# Importa o módulo logging para registrar logs
+import logging
+
+# Configura o logging básico com nível INFO
+logging.basicConfig(level=logging.INFO)
+# Cria um logger para este módulo
+logger = logging.getLogger(__name__)
+
+# Diretório com os arquivos de migração (NNNN_descricao.sql)
+DIRETORIO_MIGRACOES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'migrations')
+
+# Padrão do nome dos arquivos de migração
+PADRAO_MIGRACAO = re.compile(r'^(\d+)_(.+)\.sql$')
+
+# Chave arbitrária do advisory lock que impede duas execuções simultâneas
+CHAVE_LOCK = 727274
+
+# Consultas mais frequentes do bot, usadas no modo de simulação (--dry-run)
+CONSULTAS_FREQUENTES = {
+    "clãs de um membro": ("SELECT id FROM cla WHERE members_cla @> ARRAY[%s]", (1,)),
+    "nome duplicado": ("SELECT id FROM cla WHERE name_cla = %s AND servidor_id = %s", ("exemplo", 1)),
+    "TAG duplicada": ("SELECT id FROM cla WHERE tag_cla = %s AND servidor_id = %s", ("EX", 1)),
+    "clãs do servidor": ("SELECT id FROM cla WHERE servidor_id = %s AND id != 1", (1,)),
+    "membro por discord_id": ("SELECT id FROM membros WHERE discord_id = %s", (1,)),
+    "servidor por discord_id": ("SELECT id FROM servidores WHERE discord_id = %s", (1,)),
+    "membros por trecho do nome": ("SELECT id FROM membros WHERE %s <%% nome OR nome ILIKE %s LIMIT 50", ("exemplo", "%exemplo%")),
+    "histórico de um clã": ("SELECT id FROM cla_auditoria WHERE cla_id = %s ORDER BY criado_em DESC, id DESC LIMIT 12", (1,)),
+}
+
+def listar_migracoes():
+    """
+    Retorna a lista ordenada de migrações disponíveis como (versao, nome, caminho).
+    """
+    migracoes = []
+    for arquivo in os.listdir(DIRETORIO_MIGRACOES):
+        correspondencia = PADRAO_MIGRACAO.match(arquivo)
+        if correspondencia:
+            versao = int(correspondencia.group(1))
+            migracoes.append((versao, correspondencia.group(2), os.path.join(DIRETORIO_MIGRACOES, arquivo)))
+    migracoes.sort()
+    versoes = [versao for versao, _, _ in migracoes]
+    if len(versoes) != len(set(versoes)):
+        raise ValueError("Existem migrações com a mesma versão")
+    return migracoes
+
+def conectar():
+    """
+    Abre uma conexão com o banco usando as credenciais do config.json.
+    """
+    with open('config.json', 'r') as config_file:
+        db_config = json.load(config_file)['database']
+    return psycopg2.connect(
+        host=db_config['host'],
+        port=db_config['port'],
+        dbname=db_config['nome'],
+        user=db_config['usuario'],
+        password=db_config['senha']
+    )
+
+def versoes_aplicadas(cursor):
+    """
+    Garante a existência da tabela de controle e retorna as versões já aplicadas.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            versao INTEGER PRIMARY KEY,
+            nome VARCHAR(200) NOT NULL,
+            aplicada_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("SELECT versao FROM schema_migrations")
+    return {linha[0] for linha in cursor.fetchall()}
+
+def explicar_consultas(cursor):
+    """
+    Retorna os planos de execução (EXPLAIN) das consultas frequentes.
+    """
+    planos = {}
+    for descricao, (consulta, params) in CONSULTAS_FREQUENTES.items():
+        # Savepoint: a consulta pode depender de uma tabela criada por uma migração pendente
+        cursor.execute("SAVEPOINT explicar")
+        try:
+            cursor.execute("EXPLAIN " + consulta, params)
+            planos[descricao] = "\n".join(linha[0] for linha in cursor.fetchall())
+            cursor.execute("RELEASE SAVEPOINT explicar")
+        except psycopg2.Error as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT explicar")
+            planos[descricao] = f"(indisponível: {str(e).strip()})"
+    return planos
+
+def aplicar_migracoes(conn, dry_run=False):
+    """
+    Aplica, em ordem, as migrações pendentes. Cada migração roda em sua própria
+    transação junto com o registro em schema_migrations. No modo dry_run tudo é
+    executado em uma única transação desfeita ao final, e os planos das consultas
+    frequentes são impressos antes e depois.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT pg_advisory_lock(%s)", (CHAVE_LOCK,))
+    try:
+        aplicadas = versoes_aplicadas(cursor)
+        pendentes = [m for m in listar_migracoes() if m[0] not in aplicadas]
+        if not dry_run:
+            conn.commit()
+
+        if not pendentes:
+            logger.info("Nenhuma migração pendente.")
+
+        planos_antes = explicar_consultas(cursor) if dry_run else None
+
+        for versao, nome, caminho in pendentes:
+            with open(caminho, 'r') as sql_file:
+                cursor.execute(sql_file.read())
+            cursor.execute("INSERT INTO schema_migrations (versao, nome) VALUES (%s, %s)", (versao, nome))
+            if not dry_run:
+                conn.commit()
+            logger.info(f"Migração {versao:04d}_{nome} {'simulada' if dry_run else 'aplicada'}.")
+
+        if dry_run:
+            planos_depois = explicar_consultas(cursor)
+            for descricao in CONSULTAS_FREQUENTES:
+                print(f"=== {descricao} ===")
+                print("--- antes ---")
+                print(planos_antes[descricao])
+                print("--- depois ---")
+                print(planos_depois[descricao])
+                print()
+            conn.rollback()
+            logger.info("Modo de simulação: nenhuma alteração foi gravada.")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.execute("SELECT pg_advisory_unlock(%s)", (CHAVE_LOCK,))
+        conn.commit()
+        cursor.close()
+    return [versao for versao, _, _ in pendentes]
+
+# Verifica se o script está sendo executado diretamente
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Aplica as migrações do banco de dados do bot")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="executa as migrações pendentes em uma transação desfeita e mostra o EXPLAIN das consultas frequentes")
+    args = parser.parse_args()
+
+    conexao = conectar()
+    try:
+        aplicar_migracoes(conexao, dry_run=args.dry_run)
+    except psycopg2.Error as e:
+        logger.error(f"Erro ao aplicar as migrações: {e}")
+    finally:
+        conexao.close()
+
+# Resumo do arquivo:
+# Este arquivo implementa o executor de migrações do banco de dados do bot.
+# As migrações ficam em migrations/ com nomes no formato NNNN_descricao.sql e são aplicadas em ordem,
+# cada uma registrada na tabela schema_migrations. Um advisory lock impede execuções simultâneas.
+# Com --dry-run, as migrações pendentes são executadas em uma transação desfeita e os planos de execução
+# (EXPLAIN) das consultas mais frequentes do bot são impressos antes e depois, para avaliar os índices.
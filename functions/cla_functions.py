@@ -1,7 +1,17 @@
 # Importa os módulos necessários
 import discord  # Importa o módulo discord para interagir com a API do Discord
 from discord import app_commands  # Importa app_commands para criar comandos de aplicação
-from database import query, add, edit  # Importa funções para interagir com o banco de dados
+from database import executar_query_async, upsert_async, notificar_alteracao, BancoIndisponivel  # Importa funções assíncronas para interagir com o banco de dados
+from indice_membros import indice  # Importa o índice em memória de membros dos clãs
+from indice_prefixos import prefixos  # Importa o índice em memória de nomes e TAGs dos clãs
+from cache_servidores import servidores  # Importa o cache de servidores cadastrados
+from cache_cartoes import cartoes  # Importa o cache de cartões de clã já formatados
+from coalescencia import GrupoChamadas  # Importa a coalescência de chamadas simultâneas
+from functions.cla_views import ListaClasView  # Importa a lista paginada de clãs
+from metricas import adiar  # Importa o defer instrumentado
+from modelos import CartaoCla  # Importa a linha tipada dos cartões de clã
+from limitador import verificar_limite, LimiteExcedido  # Importa o limite de uso por comando
+from config_servidores import configuracoes  # Importa as configurações de cada servidor
 import logging  # Importa o módulo de logging para registrar eventos
 import re  # Importa o módulo de expressões regulares
 from datetime import datetime  # Adicione esta importação no topo do arquivo
@@ -10,54 +20,142 @@ import asyncio
 # Configura o logger para este módulo
 logger = logging.getLogger('bot')  # Cria um logger específico para o bot
 
+# Mensagem exibida quando o banco de dados está fora do ar
+MENSAGEM_BANCO_INDISPONIVEL = "O banco de dados está temporariamente indisponível. Por favor, tente novamente em alguns instantes."
+
+# Consulta única que resolve líder, membros e último modificador de um conjunto de clãs.
+# Cada linha retornada (CartaoCla) já traz tudo o que _formatar_cla_info precisa; as colunas
+# são lidas pelo nome, então a ordem do SELECT não importa.
+CONSULTA_DETALHES_CLAS = """
+    SELECT c.id, c.name_cla, c.tag_cla, c.ativo, c.ult_atualizacao, c.servidor_id,
+           lider.discord_id AS lider_discord_id,
+           modificador.discord_id AS modificador_discord_id,
+           ARRAY(
+               SELECT m.discord_id
+               FROM unnest(c.members_cla) WITH ORDINALITY AS u(membro_id, ordem)
+               JOIN membros m ON m.id = u.membro_id
+               ORDER BY u.ordem
+           ) AS membros_discord_ids
+    FROM cla c
+    LEFT JOIN membros lider ON lider.id = c.lider_id
+    LEFT JOIN membros modificador ON modificador.id = c.last_modified_by
+    WHERE {condicao}
+    ORDER BY c.id
+    {limite}
+"""
+
+# Alteração atômica dos membros de um clã. A linha é travada (FOR UPDATE) e a nova lista é
+# calculada no próprio servidor a partir da versão mais recente, então edições simultâneas
+# não se sobrescrevem; os limites de tamanho são verificados na mesma instrução.
+# O evento correspondente é gravado em cla_auditoria pela trigger da tabela cla.
+# {novos_membros} é a expressão que calcula a nova lista a partir de atual.members_cla.
+# Parâmetros: (cla_id, membros, ult_atualizacao, modificador_id, limite)
+# Retorna (membros antes, membros calculados, aplicado, lider_id, nome) ou nenhuma linha se o clã não existir.
+ATUALIZACAO_MEMBROS_CLA = """
+    WITH atual AS (
+        SELECT id, lider_id, name_cla, members_cla FROM cla WHERE id = %s FOR UPDATE
+    ), novo AS (
+        SELECT atual.*, {novos_membros} AS membros FROM atual
+    ), alterado AS (
+        UPDATE cla c
+        SET members_cla = novo.membros,
+            ult_atualizacao = %s,
+            last_modified_by = %s
+        FROM novo
+        WHERE c.id = novo.id
+          AND novo.membros IS DISTINCT FROM novo.members_cla
+          AND cardinality(novo.membros) BETWEEN 2 AND %s
+        RETURNING c.id
+    )
+    SELECT novo.members_cla, novo.membros, EXISTS (SELECT 1 FROM alterado), novo.lider_id, novo.name_cla
+    FROM novo
+"""
+
+# Acrescenta, na ordem informada, os membros que ainda não estão no clã nem em outro clã.
+# membros_livres (migração 0007) trava cada membro até o fim da transação antes de procurar os outros
+# clãs, então duas edições simultâneas de clãs diferentes não conseguem adicionar o mesmo membro.
+ADICIONAR_MEMBROS = """atual.members_cla || ARRAY(
+            SELECT u.membro_id
+            FROM unnest(membros_livres(atual.id, %s::integer[])) WITH ORDINALITY AS u(membro_id, ordem)
+            WHERE u.membro_id <> ALL(atual.members_cla)
+            ORDER BY u.ordem
+        )"""
+
+# Criação de um clã com os membros que ainda não estão em outro clã do servidor. membros_livres_no_servidor
+# (migração 0008) trava cada membro antes de consultar os clãs, como nas edições, então uma criação e uma
+# edição simultâneas não colocam o mesmo membro em dois clãs. O clã só é criado se o líder (primeiro membro)
+# estiver livre e restarem pelo menos 2 membros.
+# Parâmetros: (servidor_id, membros, nome, tag, ult_atualizacao)
+# Retorna (membros livres, id do clã criado ou NULL).
+CRIACAO_CLA = """
+    WITH livres AS (
+        SELECT membros_livres_no_servidor(%s, %s::integer[]) AS membros
+    ), novo AS (
+        INSERT INTO cla (lider_id, name_cla, tag_cla, members_cla, servidor_id, ativo, ult_atualizacao, last_modified_by)
+        SELECT livres.membros[1], %s, %s, livres.membros, %s, TRUE, %s, livres.membros[1]
+        FROM livres
+        WHERE livres.membros[1] = %s AND cardinality(livres.membros) >= 2
+        RETURNING id
+    )
+    SELECT livres.membros, (SELECT id FROM novo) FROM livres
+"""
+
+# Remove os membros informados, exceto o líder
+REMOVER_MEMBROS = """ARRAY(
+            SELECT u.membro_id
+            FROM unnest(atual.members_cla) WITH ORDINALITY AS u(membro_id, ordem)
+            WHERE u.membro_id <> ALL(%s::integer[]) OR u.membro_id = atual.lider_id
+            ORDER BY u.ordem
+        )"""
+
 # Define a classe ClaCog que herda de app_commands.Group
 class ClaCog(app_commands.Group):
     def __init__(self):
         # Inicializa a classe pai com nome e descrição para o grupo de comandos
         super().__init__(name="cla", description="Comandos relacionados a clãs")
+        # Consultas de detalhes e buscas de membros idênticas e simultâneas compartilham uma única execução
+        self._consultas = GrupoChamadas("cla_detalhes")
+        self._buscas_membros = GrupoChamadas("discord_membros")
         # Registra no log que a classe foi inicializada
         logger.info("ClaCog inicializado")
 
     # Define o comando 'status' para mostrar o status do clã do usuário
     @app_commands.command(name="status", description="Mostra o status do seu clã")
+    @app_commands.check(verificar_limite)
     async def cla_status(self, interaction: discord.Interaction):
         logger.info(f"Solicitação de status de clã para o usuário {interaction.user.id}")
-        await interaction.response.defer(ephemeral=True)
+        await adiar(interaction, ephemeral=True)
 
         try:
-            # Busca todos os clãs do usuário
-            clas_do_usuario = self._buscar_clas_por_membro(str(interaction.user.id))
-            if not clas_do_usuario:
-                await interaction.followup.send("Você não está em nenhum clã.")
+            # Obtém o id do servidor no banco (cadastrando-o se necessário)
+            servidor_id_atual = await servidores.resolver(interaction.guild)
+            if servidor_id_atual is None:
+                await interaction.followup.send("Erro: Não foi possível registrar o servidor.")
                 return
 
-            logger.info(f"Clãs encontrados para o usuário: {clas_do_usuario}")
-            logger.info(f"ID do servidor atual: {interaction.guild.id}")
-
-            # Verifica se o servidor já está cadastrado
-            servidor_id = interaction.guild.id
-            servidor_existente = query("servidores", "id", "discord_id = %s", (servidor_id,))
-            if not servidor_existente:
-                # Adiciona o servidor se ele não existir
-                novo_servidor_id = add("servidores", {"nome": interaction.guild.name, "discord_id": servidor_id})
-                if not novo_servidor_id:
-                    await interaction.followup.send("Erro: Não foi possível registrar o servidor.")
+            if indice.pronto:
+                # Clãs do usuário pelo índice em memória e cartões pelo cache, sem consultar o banco
+                if not await indice.clas_do_discord(interaction.user.id):
+                    await interaction.followup.send("Você não está em nenhum clã.")
                     return
-                servidor_id_atual = novo_servidor_id
-                logger.info(f"Novo servidor registrado com ID: {servidor_id_atual}")
+                ids = await indice.clas_do_discord(interaction.user.id, servidor_id_atual, apenas_ativos=True)
+                clas_ativos_servidor = await self._detalhes_em_cache(ids)
             else:
-                servidor_id_atual = servidor_existente[0][0]
-            
-            logger.info(f"ID do servidor atual no banco de dados: {servidor_id_atual}")
+                # Busca todos os clãs do usuário
+                clas_do_usuario = await self._buscar_clas_por_membro(str(interaction.user.id))
+                if not clas_do_usuario:
+                    await interaction.followup.send("Você não está em nenhum clã.")
+                    return
 
-            # Filtra os clãs ativos do servidor atual
-            clas_ativos_servidor = []
-            for cla in clas_do_usuario:
-                cla_id, lider_id, nome_cla, tag_cla, membros_ids, ult_atualizacao, id_modificou, servidor_id, ativo = cla
-                logger.info(f"Verificando clã: {nome_cla}, servidor_id: {servidor_id}, ativo: {ativo}")
-                if ativo and servidor_id == servidor_id_atual:
-                    clas_ativos_servidor.append(cla)
-                    logger.info(f"Clã adicionado: {nome_cla}")
+                logger.info(f"Clãs encontrados para o usuário: {clas_do_usuario}")
+
+                # Filtra os clãs ativos do servidor atual
+                clas_ativos_servidor = []
+                for cla in clas_do_usuario:
+                    logger.info(f"Verificando clã: {cla.name_cla}, servidor_id: {cla.servidor_id}, ativo: {cla.ativo}")
+                    if cla.ativo and cla.servidor_id == servidor_id_atual:
+                        clas_ativos_servidor.append(cla)
+                        logger.info(f"Clã adicionado: {cla.name_cla}")
 
             if not clas_ativos_servidor:
                 await interaction.followup.send("Você não está em nenhum clã ativo neste servidor.")
@@ -66,147 +164,154 @@ class ClaCog(app_commands.Group):
             if len(clas_ativos_servidor) > 1:
                 mensagem = "Você está em múltiplos clãs ativos neste servidor:\n\n"
                 for cla in clas_ativos_servidor:
-                    mensagem += self._formatar_cla_info(cla, interaction.guild) + "\n\n"
+                    mensagem += self._cartao(cla, interaction.guild) + "\n\n"
                 await interaction.followup.send(mensagem)
             else:
-                mensagem = self._formatar_cla_info(clas_ativos_servidor[0], interaction.guild)
+                mensagem = self._cartao(clas_ativos_servidor[0], interaction.guild)
                 await interaction.followup.send(mensagem)
 
+        except BancoIndisponivel:
+            await interaction.followup.send(MENSAGEM_BANCO_INDISPONIVEL)
         except Exception as e:
             logger.error(f"Erro ao buscar status do clã: {str(e)}", exc_info=True)
             await interaction.followup.send("Ocorreu um erro ao buscar as informações do clã.")
 
-    def _buscar_clas_por_membro(self, discord_id):
-        membro_query = query("membros", "id", "discord_id = %s", (discord_id,))
-        if not membro_query:
-            return None
-
-        membro_id = membro_query[0][0]
-
-        cla_query = query("cla", "*", "members_cla @> ARRAY[%s]", (membro_id,))
+    async def _buscar_detalhes_clas(self, condicao, params, limite=None):
+        # Busca os clãs que atendem à condição já com líder, membros e modificador resolvidos.
+        # Buscas idênticas simultâneas (por exemplo vários /cla status do mesmo clã) compartilham a consulta.
+        if limite is not None:
+            consulta, params = CONSULTA_DETALHES_CLAS.format(condicao=condicao, limite="LIMIT %s"), params + (limite,)
+        else:
+            consulta = CONSULTA_DETALHES_CLAS.format(condicao=condicao, limite="")
+        return await self._consultas.executar((condicao, repr(params)), executar_query_async, consulta, params, "_buscar_detalhes_clas", CartaoCla)
+
+    async def _detalhes_em_cache(self, cla_ids):
+        # Retorna as linhas de detalhes dos clãs, na ordem informada, usando o cache de cartões
+        # para as versões conhecidas pelo índice e uma única consulta para o que faltar
+        linhas = {}
+        faltando = []
+        for cla_id in cla_ids:
+            em_cache = cartoes.obter(cla_id, indice.versao_do_cla(cla_id))
+            if em_cache is None:
+                faltando.append(cla_id)
+            else:
+                linhas[cla_id] = em_cache[0]
+        if faltando:
+            for linha in await self._buscar_detalhes_clas("c.id = ANY(%s)", (faltando,)) or []:
+                cartoes.guardar(linha.id, linha.ult_atualizacao, linha, self._formatar_cla_info(linha))
+                linhas[linha.id] = linha
+        return [linhas[cla_id] for cla_id in cla_ids if cla_id in linhas]
+
+    def _cartao(self, cla_info, guild):
+        # Texto do clã, reaproveitado do cache quando a versão não mudou
+        em_cache = cartoes.obter(cla_info.id, cla_info.ult_atualizacao, contar=False)
+        if em_cache is not None:
+            return em_cache[1]
+        texto = self._formatar_cla_info(cla_info)
+        cartoes.guardar(cla_info.id, cla_info.ult_atualizacao, cla_info, texto)
+        return texto
+
+    async def _buscar_clas_por_membro(self, discord_id):
+        cla_query = await self._buscar_detalhes_clas(
+            "c.members_cla @> ARRAY[(SELECT id FROM membros WHERE discord_id = %s)]", (discord_id,)
+        )
         if not cla_query:
             return None
 
         return cla_query
 
-    def _formatar_cla_info(self, cla_info, guild):
-        cla_id, lider_id, nome_cla, tag_cla, membros_ids, ult_atualizacao, id_modificou, servidor_id, ativo = cla_info
-
-        lider_query = query("membros", "discord_id", "id = %s", (lider_id,))
-        lider_discord_id = lider_query[0][0] if lider_query else "Desconhecido"
-
-        membros_query = query("membros", "discord_id", f"id = ANY(ARRAY{membros_ids})")
-        membros_discord_ids = [membro[0] for membro in membros_query]
-
-        ultimo_modificador_id = id_modificou[-1] if id_modificou and isinstance(id_modificou, list) else None
-        ultimo_modificador_query = query("membros", "discord_id", "id = %s", (ultimo_modificador_id,)) if ultimo_modificador_id else None
-        ultimo_modificador_discord_id = ultimo_modificador_query[0][0] if ultimo_modificador_query else "Desconhecido"
-
-        mensagem = f"**Nome do Clã:** {nome_cla}\n"
-        mensagem += f"**TAG:** {tag_cla}\n"
-        mensagem += f"**Líder:** <@{lider_discord_id}>\n"
-        mensagem += f"**Ativo:** {'Sim' if ativo else 'Não'}\n"
-        mensagem += f"**Última Atualização:** {ult_atualizacao}\n"
-        mensagem += f"**Última Modificação por:** <@{ultimo_modificador_discord_id}>\n"
-        mensagem += f"**Servidor ID:** {servidor_id}\n"
-        mensagem += "**Membros:**\n"
-
-        for discord_id in membros_discord_ids:
-            membro = guild.get_member(int(discord_id))
-            if membro:
-                mensagem += f"- {membro.mention}\n"
+    async def _resolver_membros(self, guild, discord_ids):
+        # Retorna {discord_id: id interno} para todos os membros informados que puderam ser
+        # resolvidos, cadastrando os ausentes com um único upsert
+        ids = await indice.ids_dos_membros(discord_ids)
+        ausentes = {int(d) for d in discord_ids} - set(ids)
+        if not ausentes:
+            return ids
+
+        # Usa primeiro o cache de membros do servidor e busca via HTTP apenas o que faltar, em paralelo
+        encontrados = {d: guild.get_member(d) for d in ausentes}
+        buscar = [d for d, membro in encontrados.items() if membro is None]
+        if buscar:
+            buscados = await asyncio.gather(
+                *(self._buscas_membros.executar((guild.id, d), guild.fetch_member, d) for d in buscar),
+                return_exceptions=True
+            )
+            for d, membro in zip(buscar, buscados):
+                if isinstance(membro, Exception):
+                    logger.error(f"Erro ao buscar membro {d}: {str(membro)}")
+                    membro = None
+                encontrados[d] = membro
+
+        linhas = [(d, membro.name) for d, membro in encontrados.items() if membro is not None]
+        if linhas:
+            novos = await upsert_async("membros", ["discord_id", "nome"], linhas, conflito="discord_id", atualizar=["nome"])
+            if novos is None:
+                logger.error(f"Falha ao cadastrar membros: {[d for d, _ in linhas]}")
             else:
-                mensagem += f"- <@{discord_id}>\n"
-
-        return mensagem
-
-    def _buscar_clas_por_membro(self, discord_id):
-        membro_query = query("membros", "id", "discord_id = %s", (discord_id,))
-        if not membro_query:
-            return None
-
-        membro_id = membro_query[0][0]
-
-        cla_query = query("cla", "*", "members_cla @> ARRAY[%s]", (membro_id,))
-        if not cla_query:
-            return None
-
-        return cla_query
+                ids.update({int(d): membro_id for d, membro_id in novos.items()})
+                logger.info(f"Membros cadastrados: {list(novos)}")
+        return ids
 
     # Comando para criar um novo clã
     @app_commands.command(name="criar", description="Cria um novo clã")
+    @app_commands.check(verificar_limite)
     async def criar_cla(self, interaction: discord.Interaction, nome: str, tag: str, membros: str):
         logger.info(f"Solicitação de criação de clã para o usuário {interaction.user.id}")
-        await interaction.response.defer(ephemeral=True)
+        await adiar(interaction, ephemeral=True)
 
         try:
+            # Obtém o id do servidor no banco (cadastrando-o se necessário)
+            servidor_id_db = await servidores.resolver(interaction.guild)
+            if servidor_id_db is None:
+                await interaction.followup.send("Erro: Não foi possível registrar o servidor.")
+                return
+
             # Verifica se o usuário já é membro de algum clã no servidor atual
-            usuario_em_cla = query("cla", "id", "members_cla @> ARRAY[(SELECT id FROM membros WHERE discord_id = %s)] AND servidor_id = %s", (str(interaction.user.id), interaction.guild.id))
-            if usuario_em_cla:
+            if await indice.clas_do_discord(interaction.user.id, servidor_id_db):
                 await interaction.followup.send("Erro: Você já é membro de um clã neste servidor e não pode criar ou participar de outro.")
                 return
 
             # Verifica se o nome do clã já existe
-            if query("cla", "id", "name_cla = %s AND servidor_id = %s", (nome, interaction.guild.id)):
+            if not await prefixos.disponivel(servidor_id_db, "nome", nome):
                 await interaction.followup.send("Erro: Já existe um clã com esse nome neste servidor.")
                 return
 
             # Verifica se a TAG já existe
-            if query("cla", "id", "tag_cla = %s AND servidor_id = %s", (tag, interaction.guild.id)):
+            if not await prefixos.disponivel(servidor_id_db, "tag", tag):
                 await interaction.followup.send("Erro: Já existe um clã com essa TAG neste servidor.")
                 return
 
-            # Verifica se o servidor já está cadastrado
-            servidor_id = interaction.guild.id
-            servidor_existente = query("servidores", "id", "discord_id = %s", (servidor_id,))
-            if not servidor_existente:
-                # Adiciona o servidor se ele não existir
-                novo_servidor_id = add("servidores", {"nome": interaction.guild.name, "discord_id": servidor_id})
-                if not novo_servidor_id:
-                    await interaction.followup.send("Erro: Não foi possível registrar o servidor.")
-                    return
-                servidor_id_db = novo_servidor_id
-            else:
-                servidor_id_db = servidor_existente[0][0]
-
             # Processa a lista de membros
             membros_lista = re.findall(r'<@!?(\d+)>', membros)
             membros_lista = [str(interaction.user.id)] + membros_lista  # Adiciona o criador como primeiro membro
             
             logger.info(f"Lista de membros processada: {membros_lista}")
 
-            # Verifica e cadastra os membros
+            # Resolve (e cadastra, se necessário) todos os membros de uma só vez
+            mapa_membros = await self._resolver_membros(interaction.guild, membros_lista)
+
+            # Verifica os membros
             membros_ids = []
             membros_ja_em_cla = []
+            discord_por_id = {}  # id interno -> discord_id, para informar os membros recusados pelo banco
             for membro_id in membros_lista:
                 logger.info(f"Processando membro: {membro_id}")
-                
+
+                membro_id_db = mapa_membros.get(int(membro_id))
+                if membro_id_db is None:
+                    logger.error(f"Membro não encontrado: {membro_id}")
+                    continue
+                if membro_id_db in membros_ids:
+                    continue
+
                 # Verifica se o membro já está em um clã no servidor atual
-                membro_em_cla = query("cla", "id", "members_cla @> ARRAY[(SELECT id FROM membros WHERE discord_id = %s)] AND servidor_id = %s", (membro_id, servidor_id_db))
-                if membro_em_cla:
+                if await indice.clas_do_membro(membro_id_db, servidor_id_db):
                     membros_ja_em_cla.append(membro_id)
                     logger.info(f"Membro {membro_id} já está em um clã neste servidor")
                     continue
 
-                membro_query = query("membros", "id", "discord_id = %s", (membro_id,))
-                if membro_query:
-                    membros_ids.append(membro_query[0][0])
-                    logger.info(f"Membro {membro_id} já cadastrado no banco de dados")
-                else:
-                    try:
-                        membro = await interaction.guild.fetch_member(int(membro_id))
-                        if membro:
-                            novo_membro = add("membros", {"discord_id": membro_id, "nome": membro.name})
-                            if novo_membro:
-                                membros_ids.append(novo_membro[0])
-                                logger.info(f"Novo membro adicionado: {membro.name} ({membro_id})")
-                            else:
-                                logger.error(f"Falha ao adicionar novo membro: {membro_id}")
-                        else:
-                            logger.error(f"Membro não encontrado: {membro_id}")
-                    except Exception as e:
-                        logger.error(f"Erro ao adicionar novo membro {membro_id}: {str(e)}")
-                        continue
+                membros_ids.append(membro_id_db)
+                discord_por_id[membro_id_db] = membro_id
 
             # Verifica se há membros suficientes para criar o clã
             if len(membros_ids) < 2:
@@ -217,32 +322,62 @@ class ClaCog(app_commands.Group):
                 await interaction.followup.send(mensagem)
                 return
 
+            # Verifica o limite de membros por clã configurado para o servidor
+            limite_membros = (await configuracoes.obter(interaction.guild_id))["limite_membros"]
+            if len(membros_ids) > limite_membros:
+                await interaction.followup.send(f"Erro: O clã não pode ter mais de {limite_membros} membros.")
+                return
+
             # Obtém o timestamp atual no formato 'aaaa-mm-dd hh:mm:ss'
             timestamp_atual = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-            # Cria o clã
-            novo_cla = add("cla", {
-                "lider_id": membros_ids[0],
+            # Cria o clã, conferindo no banco (com trava por membro) quem ainda está livre
+            resultado = await executar_query_async(
+                CRIACAO_CLA,
+                (servidor_id_db, membros_ids, nome, tag, servidor_id_db, timestamp_atual, membros_ids[0])
+            )
+            if not resultado:
+                await interaction.followup.send("Erro ao criar o clã. Por favor, tente novamente.")
+                logger.error(f"Falha ao criar o clã '{nome}'")
+                return
+            livres, cla_id = resultado[0]
+
+            # Membros que entraram em outro clã do servidor depois da verificação no índice
+            membros_ja_em_cla += [discord_por_id[membro_id_db] for membro_id_db in membros_ids if membro_id_db not in livres]
+
+            if cla_id is None:
+                if membros_ids[0] not in livres:
+                    await interaction.followup.send("Erro: Você já é membro de um clã neste servidor e não pode criar ou participar de outro.")
+                    return
+                mensagem = "Não foi possível criar um clã com apenas uma pessoa.\n"
+                mensagem += "Os seguintes membros já estão em outros clãs:\n"
+                mensagem += "\n".join([f"- <@{membro_id}>" for membro_id in membros_ja_em_cla])
+                await interaction.followup.send(mensagem)
+                return
+
+            novo_cla = {
+                "id": cla_id,
+                "lider_id": livres[0],
                 "name_cla": nome,
                 "tag_cla": tag,
-                "members_cla": membros_ids,
+                "members_cla": livres,
                 "servidor_id": servidor_id_db,
                 "ativo": True,
                 "ult_atualizacao": timestamp_atual,
-                "id_modificou": [membros_ids[0]]
-            })
+                "last_modified_by": livres[0]
+            }
+            # Mantém índices e caches atualizados, como faria add_async
+            notificar_alteracao("cla", "add", [novo_cla])
 
-            if novo_cla:
-                mensagem = f"Clã '{nome}' criado com sucesso com {len(membros_ids)} membros!"
-                if membros_ja_em_cla:
-                    mensagem += "\nOs seguintes membros não foram adicionados pois já estão em outros clãs:\n"
-                    mensagem += "\n".join([f"- <@{membro_id}>" for membro_id in membros_ja_em_cla])
-                await interaction.followup.send(mensagem)
-                logger.info(f"Clã '{nome}' criado com sucesso")
-            else:
-                await interaction.followup.send("Erro ao criar o clã. Por favor, tente novamente.")
-                logger.error(f"Falha ao criar o clã '{nome}'")
+            mensagem = f"Clã '{nome}' criado com sucesso com {len(livres)} membros!"
+            if membros_ja_em_cla:
+                mensagem += "\nOs seguintes membros não foram adicionados pois já estão em outros clãs:\n"
+                mensagem += "\n".join([f"- <@{membro_id}>" for membro_id in membros_ja_em_cla])
+            await interaction.followup.send(mensagem)
+            logger.info(f"Clã '{nome}' criado com sucesso")
 
+        except BancoIndisponivel:
+            await interaction.followup.send(MENSAGEM_BANCO_INDISPONIVEL)
         except Exception as e:
             logger.error(f"Erro ao criar clã: {str(e)}", exc_info=True)
             await interaction.followup.send("Ocorreu um erro ao criar o clã. Por favor, tente novamente mais tarde.")
@@ -252,84 +387,87 @@ class ClaCog(app_commands.Group):
         app_commands.Choice(name="Adicionar", value="adicionar"),
         app_commands.Choice(name="Remover", value="remover")
     ])
+    @app_commands.check(verificar_limite)
     async def editar_membros_cla(self, interaction: discord.Interaction, acao: app_commands.Choice[str], membros: str):
         logger.info(f"Solicitação de edição de membros do clã para o usuário {interaction.user.id}")
-        await interaction.response.defer(ephemeral=True)
+        await adiar(interaction, ephemeral=True)
 
         try:
             # Verifica se o usuário é membro de algum clã
-            cla_info = query("cla", "*", "members_cla @> ARRAY[(SELECT id FROM membros WHERE discord_id = %s)]", (str(interaction.user.id),))
-            if not cla_info:
+            clas_usuario = await indice.clas_do_discord(interaction.user.id)
+            if not clas_usuario:
                 await interaction.followup.send("Erro: Você não é membro de nenhum clã.")
                 return
-
-            # Desempacota os 8 valores retornados pela consulta
-            cla_id, lider_id, nome_cla, tag_cla, membros_atuais, servidor_id, ativo, ult_atualizacao, id_modificou = cla_info[0]
+            cla_id = clas_usuario[0]
 
             # Processa a lista de membros
             novos_membros = re.findall(r'<@!?(\d+)>', membros)
-            
-            membros_atualizados = membros_atuais.copy()
+
             membros_processados = []
             membros_nao_processados = []
             membros_ja_em_cla = []
 
-            for membro_id in novos_membros:
-                membro_query = query("membros", "id", "discord_id = %s", (membro_id,))
-                if not membro_query:
-                    # Tenta adicionar o novo membro ao banco de dados
-                    membro = await interaction.guild.fetch_member(int(membro_id))
-                    if membro:
-                        novo_membro = add("membros", {"discord_id": membro_id, "nome": membro.name})
-                        if novo_membro:
-                            membro_query = [(novo_membro[0],)]
-                        else:
-                            membros_nao_processados.append(membro_id)
-                            continue
-                    else:
-                        membros_nao_processados.append(membro_id)
-                        continue
-
-                membro_id_db = membro_query[0][0]
+            # Resolve (e cadastra, se necessário) todos os membros de uma só vez
+            mapa_membros = await self._resolver_membros(interaction.guild, novos_membros)
 
-                # Verifica se o membro a ser removido é o líder
-                if acao.value == 'remover' and membro_id_db == lider_id:
+            # Membros a enviar ao banco, na ordem informada: {id interno: discord_id}
+            solicitados = {}
+            for membro_id in novos_membros:
+                membro_id_db = mapa_membros.get(int(membro_id))
+                if membro_id_db is None:
                     membros_nao_processados.append(membro_id)
                     continue
 
-                # Verifica se o membro já está em um clã (para adição)
+                # Verifica se o membro já está em outro clã (para adição)
                 if acao.value == 'adicionar':
-                    membro_em_cla = query("cla", "name_cla", "members_cla @> ARRAY[%s]", (membro_id_db,))
+                    membro_em_cla = [c for c in await indice.clas_do_membro(membro_id_db) if c != cla_id]
                     if membro_em_cla:
-                        membros_ja_em_cla.append((membro_id, membro_em_cla[0][0]))
+                        membros_ja_em_cla.append((membro_id, await indice.nome_do_cla(membro_em_cla[0])))
                         continue
 
-                if acao.value == 'adicionar':
-                    if membro_id_db not in membros_atualizados:
-                        membros_atualizados.append(membro_id_db)
-                        membros_processados.append(membro_id)
-                elif acao.value == 'remover':
-                    if membro_id_db in membros_atualizados:
-                        membros_atualizados.remove(membro_id_db)
-                        membros_processados.append(membro_id)
+                solicitados.setdefault(membro_id_db, membro_id)
+
+            # Atualiza o clã no banco de dados em uma única instrução atômica
+            timestamp_atual = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            usuario_id = await indice.id_do_membro(interaction.user.id)
+            limite_membros = (await configuracoes.obter(interaction.guild_id))["limite_membros"]
+            expressao = ADICIONAR_MEMBROS if acao.value == 'adicionar' else REMOVER_MEMBROS
+            resultado = await executar_query_async(
+                ATUALIZACAO_MEMBROS_CLA.format(novos_membros=expressao),
+                (cla_id, list(solicitados), timestamp_atual, usuario_id, limite_membros)
+            )
+            if not resultado:
+                await interaction.followup.send("Erro ao editar os membros do clã. Por favor, tente novamente.")
+                return
+            membros_antes, membros_depois, aplicado, lider_id, nome_cla = resultado[0]
 
             # Verifica se o número de membros está dentro do limite
-            if len(membros_atualizados) > 13:
-                await interaction.followup.send("Erro: O clã não pode ter mais de 13 membros.")
+            if len(membros_depois) > limite_membros:
+                await interaction.followup.send(f"Erro: O clã não pode ter mais de {limite_membros} membros.")
                 return
 
-            if len(membros_atualizados) < 2:
+            if len(membros_depois) < 2:
                 await interaction.followup.send("Erro: O clã deve ter pelo menos 2 membros.")
                 return
 
-            # Atualiza o clã no banco de dados
-            timestamp_atual = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            usuario_id = query("membros", "id", "discord_id = %s", (str(interaction.user.id),))[0][0]
-            edit("cla", {
-                "members_cla": membros_atualizados,
-                "ult_atualizacao": timestamp_atual,
-                "id_modificou": id_modificou + [usuario_id]
-            }, "id = %s", (cla_id,))
+            # Separa os membros efetivamente alterados dos que não puderam ser processados
+            # (líder, membros que não estavam no clã ou que entraram em outro clã nesse meio-tempo)
+            antes, depois = set(membros_antes), set(membros_depois)
+            for membro_id_db, membro_id in solicitados.items():
+                if acao.value == 'adicionar':
+                    alterado = membro_id_db in depois and membro_id_db not in antes
+                    ignorado = membro_id_db in antes
+                else:
+                    alterado = membro_id_db in antes and membro_id_db not in depois
+                    ignorado = membro_id_db not in antes
+                if alterado:
+                    membros_processados.append(membro_id)
+                elif not ignorado:
+                    membros_nao_processados.append(membro_id)
+
+            if aplicado:
+                # A escrita não passou por edit_async: avisa os caches diretamente
+                notificar_alteracao("cla", "edit", [{"id": cla_id, "members_cla": membros_depois, "ult_atualizacao": timestamp_atual}])
 
             # Prepara a mensagem de resposta
             acao_passado = "adicionados" if acao.value == 'adicionar' else "removidos"
@@ -344,6 +482,8 @@ class ClaCog(app_commands.Group):
             await interaction.followup.send(mensagem)
             logger.info(f"Membros do clã '{nome_cla}' atualizados com sucesso por {interaction.user.id}")
 
+        except BancoIndisponivel:
+            await interaction.followup.send(MENSAGEM_BANCO_INDISPONIVEL)
         except Exception as e:
             logger.error(f"Erro ao editar membros do clã: {str(e)}", exc_info=True)
             await interaction.followup.send("Ocorreu um erro ao editar os membros do clã. Por favor, tente novamente mais tarde.")
@@ -351,69 +491,55 @@ class ClaCog(app_commands.Group):
     
 
     @app_commands.command(name="list", description="Lista todos os clãs cadastrados neste servidor")
+    @app_commands.check(verificar_limite)
     @app_commands.checks.has_permissions(administrator=True)
     async def listar_clas(self, interaction: discord.Interaction):
         logger.info(f"Solicitação de listagem de clãs pelo usuário {interaction.user.id} no servidor {interaction.guild.id}")
-        await interaction.response.defer(ephemeral=False)
+        await adiar(interaction, ephemeral=False)
 
         try:
-            # Obtém o discord_id do servidor
-            discord_id_servidor = interaction.guild.id
-
             # Obtém o id do banco de dados do servidor em questão
-            servidor_query = query("servidores", "id", "discord_id = %s", (discord_id_servidor,))
-            if not servidor_query:
+            servidor_id_db = await servidores.resolver(interaction.guild)
+            if servidor_id_db is None:
                 await interaction.followup.send("Este servidor não está cadastrado no banco de dados.")
                 return
 
-            servidor_id_db = servidor_query[0][0]
-
-            # Busca os clãs do servidor atual, exceto o clã com id 1
-            clas = query("cla", "*", "servidor_id = %s AND id != 1", (servidor_id_db,))
-            if not clas:
+            # Busca os clãs do servidor atual (exceto o clã com id 1) página a página, a partir do id do último clã exibido
+            async def buscar_lote(cursor, limite):
+                if indice.pronto:
+                    # Ids da página pelo índice em memória e cartões pelo cache
+                    ids = [cla_id for cla_id in indice.clas_do_servidor(servidor_id_db) if cla_id != 1 and cla_id > cursor]
+                    return await self._detalhes_em_cache(ids[:limite])
+                return await self._buscar_detalhes_clas("c.servidor_id = %s AND c.id != 1 AND c.id > %s", (servidor_id_db, cursor), limite)
+
+            view = ListaClasView(buscar_lote, self._cartao, interaction.guild, interaction.user.id,
+                                 "Lista de Clãs Cadastrados neste Servidor")
+            if not await view.iniciar(interaction):
                 await interaction.followup.send("Não há clãs cadastrados neste servidor.")
                 return
 
-            await interaction.followup.send("**Lista de Clãs Cadastrados neste Servidor:**")
-
-            for cla in clas:
-                cla_info = self._formatar_cla_info(cla, interaction.guild)
-                await interaction.channel.send(f"­\n{cla_info}\n{'='*40}")
-                await asyncio.sleep(1)  # Aguarda 1 segundo antes de enviar a próxima mensagem
-
             logger.info(f"Listagem de clãs concluída pelo usuário {interaction.user.id} no servidor {interaction.guild.id}")
 
+        except BancoIndisponivel:
+            await interaction.followup.send(MENSAGEM_BANCO_INDISPONIVEL)
         except Exception as e:
             logger.error(f"Erro ao listar clãs: {str(e)}", exc_info=True)
             await interaction.followup.send("Ocorreu um erro ao listar os clãs. Por favor, tente novamente mais tarde.")
 
-    def _formatar_cla_info(self, cla_info, guild):
-        cla_id, lider_id, nome_cla, tag_cla, membros_ids, ult_atualizacao, id_modificou, servidor_id, ativo = cla_info
+    def _formatar_cla_info(self, cla_info):
+        # Apenas monta a mensagem; os dados já vêm resolvidos por _buscar_detalhes_clas.
+        # As menções (<@id>) não dependem do servidor, então o texto pode ser reaproveitado pelo cache.
+        lider_discord_id = cla_info.lider_discord_id or "Desconhecido"
+        ultimo_modificador_discord_id = cla_info.modificador_discord_id or "Desconhecido"
 
-        lider_query = query("membros", "discord_id", "id = %s", (lider_id,))
-        lider_discord_id = lider_query[0][0] if lider_query else "Desconhecido"
-
-        membros_query = query("membros", "discord_id", f"id = ANY(ARRAY{membros_ids})")
-        membros_discord_ids = [membro[0] for membro in membros_query]
-
-        ultimo_modificador_id = id_modificou[-1] if id_modificou and isinstance(id_modificou, list) else None
-        ultimo_modificador_query = query("membros", "discord_id", "id = %s", (ultimo_modificador_id,)) if ultimo_modificador_id else None
-        ultimo_modificador_discord_id = ultimo_modificador_query[0][0] if ultimo_modificador_query else "Desconhecido"
-
-        mensagem = f"**Nome do Clã:** {nome_cla}\n"
-        mensagem += f"**TAG:** {tag_cla}\n"
+        mensagem = f"**Nome do Clã:** {cla_info.name_cla}\n"
+        mensagem += f"**TAG:** {cla_info.tag_cla}\n"
         mensagem += f"**Líder:** <@{lider_discord_id}>\n"
-        mensagem += f"**QTD Membros:** **{len(membros_discord_ids)}**\n"
-        mensagem += f"**Última Atualização:** {ult_atualizacao}\n"
+        mensagem += f"**QTD Membros:** **{len(cla_info.membros_discord_ids)}**\n"
+        mensagem += f"**Última Atualização:** {cla_info.ult_atualizacao}\n"
         mensagem += f"**Última Modificação por:** <@{ultimo_modificador_discord_id}>\n"
         mensagem += "**Membros:**\n"
-
-        for discord_id in membros_discord_ids:
-            membro = guild.get_member(int(discord_id))
-            if membro:
-                mensagem += f"- {membro.mention}\n"
-            else:
-                mensagem += f"- <@{discord_id}>\n"
+        mensagem += "".join(f"- <@{discord_id}>\n" for discord_id in cla_info.membros_discord_ids)
 
         return mensagem
 
@@ -421,6 +547,9 @@ class ClaCog(app_commands.Group):
     async def listar_clas_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
         if isinstance(error, app_commands.errors.MissingPermissions):
             await interaction.response.send_message("Você não tem permissão para usar este comando. Apenas administradores podem listar todos os clãs.", ephemeral=True)
+        elif isinstance(error, LimiteExcedido):
+            # A resposta com o tempo de espera é enviada pela árvore de comandos
+            return
         else:
             logger.error(f"Erro não tratado no comando listar_clas: {str(error)}", exc_info=True)
             await interaction.response.send_message("Ocorreu um erro ao executar o comando. Por favor, tente novamente mais tarde.", ephemeral=True)
@@ -444,9 +573,14 @@ def setup_cla_commands(tree: app_commands.CommandTree):
 # Este arquivo define uma classe ClaCog que gerencia comandos relacionados a clãs em um bot do Discord.
 # Ele inclui funcionalidades para:
 # 1. Mostrar o status de um clã (comando 'status')
-# 2. Criar um novo clã (comando 'criar')
-# 3. Editar membros do clã (comando 'editar')
+# 2. Criar um novo clã (comando 'criar'), verificando nome e TAG no índice em memória de prefixos
+# 3. Editar membros do clã (comando 'editar'), com uma única instrução atômica no banco para que edições
+#    simultâneas não se percam e o limite de membros do servidor (config_servidores.py) seja sempre respeitado
 # A classe utiliza um sistema de logging para registrar eventos e erros.
+# Quando o banco está indisponível (BancoIndisponivel), os comandos respondem imediatamente com uma mensagem amigável.
 # Também interage com um banco de dados para armazenar e recuperar informações sobre clãs e membros.
 # O arquivo inclui métodos auxiliares para buscar informações de clãs e formatar mensagens.
+# Os cartões formatados ficam no cache de cartões (por id e versão); com o índice de membros carregado,
+# /cla status e /cla list repetidos não consultam o banco. Consultas e buscas de membros idênticas e
+# simultâneas são coalescidas (uma única execução compartilhada).
 # Por fim, há uma função setup_cla_commands para adicionar os comandos de clã à árvore de comandos do bot.
\ No newline at end of file
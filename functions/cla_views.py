@@ -0,0 +1,170 @@
+# Importa o módulo discord para interagir com a API do Discord
+import discord
+# Importa o módulo logging para registrar eventos e erros
+import logging
+# Importa o serviço de configuração para obter a cor dos embeds
+from config_manager import config_manager
+# Importa a exceção de banco de dados indisponível
+from database import BancoIndisponivel
+
+# Configura o logger para este módulo
+logger = logging.getLogger('bot')
+
+# Limites do Discord para embeds
+LIMITE_CAMPOS = 25  # Máximo de campos por embed
+LIMITE_NOME_CAMPO = 256  # Máximo de caracteres no nome de um campo
+LIMITE_VALOR_CAMPO = 1024  # Máximo de caracteres no valor de um campo
+LIMITE_TOTAL_EMBED = 6000  # Máximo de caracteres somados em um embed
+
+# Quantidade de itens buscada por página (um pouco acima do que costuma caber em um embed)
+ITENS_POR_LOTE = 12
+
+def cor_embed():
+    # Cor padrão dos embeds, definida em config.json
+    try:
+        return discord.Color.from_str(config_manager.obter().get('cor_embed', '#00ff00'))
+    except ValueError:
+        return discord.Color.green()
+
+class ListaPaginadaView(discord.ui.View):
+    """
+    Lista paginada em uma única mensagem. Cada página é buscada sob demanda a partir
+    do cursor do último item da página anterior (paginação por cursor), então o custo
+    de cada página não depende da quantidade total de itens.
+    """
+
+    def __init__(self, buscar_lote, formatar, guild, autor_id, titulo, titulo_campo, cursor=None,
+                 cursor_inicial=None, timeout=300):
+        super().__init__(timeout=timeout)
+        self.buscar_lote = buscar_lote  # Corrotina (cursor, limite) -> linhas
+        self.formatar = formatar  # Função (linha, guild) -> texto do campo
+        self.titulo_campo = titulo_campo  # Função (linha) -> nome do campo
+        self.cursor = cursor or (lambda linha: linha[0])  # Função (linha) -> cursor da página seguinte
+        self.guild = guild
+        self.autor_id = autor_id
+        self.titulo = titulo
+        self.mensagem = None
+        self.pagina_atual = 0
+        # Cursor (posição do último item da página anterior) de cada página já visitada
+        self._cursores = [cursor_inicial]
+        # Páginas já renderizadas, para navegar para trás sem consultar o banco
+        self._paginas = {}
+        # Índice da última página, quando já conhecido
+        self._ultima_pagina = None
+
+    async def carregar_pagina(self, numero):
+        """
+        Retorna o embed da página informada, buscando-a no banco se necessário.
+        Retorna None se a página estiver vazia.
+        """
+        if numero in self._paginas:
+            return self._paginas[numero]
+
+        linhas = await self.buscar_lote(self._cursores[numero], ITENS_POR_LOTE)
+        if not linhas:
+            self._ultima_pagina = max(numero - 1, 0)
+            return None
+
+        embed, usados = self._montar_embed(linhas, numero)
+        self._paginas[numero] = embed
+        if usados == len(linhas) and len(linhas) < ITENS_POR_LOTE:
+            self._ultima_pagina = numero
+        elif len(self._cursores) == numero + 1:
+            self._cursores.append(self.cursor(linhas[usados - 1]))
+        return embed
+
+    def _montar_embed(self, linhas, numero):
+        # Empacota o máximo de itens que couber nos limites de um embed
+        embed = discord.Embed(title=self.titulo, color=cor_embed())
+        total = len(self.titulo) + 50  # Reserva para o rodapé
+        usados = 0
+        for linha in linhas:
+            nome = self.titulo_campo(linha)[:LIMITE_NOME_CAMPO]
+            valor = self.formatar(linha, self.guild)
+            if len(valor) > LIMITE_VALOR_CAMPO:
+                valor = valor[:LIMITE_VALOR_CAMPO - 3] + "..."
+            if usados and (usados >= LIMITE_CAMPOS or total + len(nome) + len(valor) > LIMITE_TOTAL_EMBED):
+                break
+            embed.add_field(name=nome, value=valor, inline=False)
+            total += len(nome) + len(valor)
+            usados += 1
+        embed.set_footer(text=f"Página {numero + 1}")
+        return embed, usados
+
+    def _atualizar_botoes(self):
+        self.anterior.disabled = self.pagina_atual == 0
+        self.proxima.disabled = self._ultima_pagina is not None and self.pagina_atual >= self._ultima_pagina
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        # Apenas quem executou o comando pode navegar pelas páginas
+        if interaction.user.id != self.autor_id:
+            await interaction.response.send_message("Apenas quem executou o comando pode navegar pela lista.", ephemeral=True)
+            return False
+        return True
+
+    async def _mostrar(self, interaction, numero):
+        embed = await self.carregar_pagina(numero)
+        if embed is None:
+            # A página seguinte não existe (itens removidos, por exemplo): permanece na atual
+            embed = self._paginas.get(self.pagina_atual)
+        else:
+            self.pagina_atual = numero
+        self._atualizar_botoes()
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    @discord.ui.button(label="◀ Anterior", style=discord.ButtonStyle.secondary)
+    async def anterior(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._mostrar(interaction, max(self.pagina_atual - 1, 0))
+
+    @discord.ui.button(label="Próxima ▶", style=discord.ButtonStyle.secondary)
+    async def proxima(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._mostrar(interaction, self.pagina_atual + 1)
+
+    async def iniciar(self, interaction: discord.Interaction):
+        """
+        Envia a primeira página como resposta à interação. Retorna False se a lista estiver vazia.
+        """
+        embed = await self.carregar_pagina(0)
+        if embed is None:
+            return False
+        self._atualizar_botoes()
+        self.mensagem = await interaction.followup.send(embed=embed, view=self, wait=True)
+        return True
+
+    async def on_error(self, interaction: discord.Interaction, error: Exception, item: discord.ui.Item):
+        # Falhas ao buscar uma página não derrubam a lista: o usuário pode tentar novamente
+        if isinstance(error, BancoIndisponivel):
+            mensagem = "O banco de dados está temporariamente indisponível. Tente novamente em alguns instantes."
+        else:
+            logger.error(f"Erro na navegação da lista '{self.titulo}': {error}", exc_info=error)
+            mensagem = "Ocorreu um erro ao carregar a página. Por favor, tente novamente."
+        if interaction.response.is_done():
+            await interaction.followup.send(mensagem, ephemeral=True)
+        else:
+            await interaction.response.send_message(mensagem, ephemeral=True)
+
+    async def on_timeout(self):
+        # Desativa os botões quando a lista expira
+        for item in self.children:
+            item.disabled = True
+        if self.mensagem:
+            try:
+                await self.mensagem.edit(view=self)
+            except discord.HTTPException as e:
+                logger.error(f"Erro ao desativar a navegação da lista '{self.titulo}': {e}")
+
+class ListaClasView(ListaPaginadaView):
+    """
+    Lista paginada de clãs (linhas CartaoCla), usada pelo comando /cla list. O cursor é o id do último clã exibido.
+    """
+
+    def __init__(self, buscar_lote, formatar, guild, autor_id, titulo, timeout=300):
+        super().__init__(buscar_lote, formatar, guild, autor_id, titulo,
+                         titulo_campo=lambda cla: f"{cla.name_cla} [{cla.tag_cla}]",
+                         cursor=lambda cla: cla.id, cursor_inicial=0, timeout=timeout)
+
+# Resumo do arquivo:
+# Este arquivo define a ListaPaginadaView, uma lista exibida em uma única mensagem com navegação por botões,
+# e a ListaClasView, usada pelo comando /cla list. Os itens são agrupados em campos de embed respeitando
+# os limites do Discord, e cada página é buscada sob demanda a partir de um cursor (por exemplo o id do último
+# clã exibido). A mesma lista é usada pelo histórico de alterações dos clãs (/historico_cla).
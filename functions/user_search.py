@@ -4,28 +4,143 @@ import discord
 from discord import app_commands
 # Importa o módulo logging para registrar eventos e erros
 import logging
+# Importa o módulo re para reconhecer menções e IDs numéricos
+import re
+# Importa o acesso assíncrono ao banco de dados
+from database import executar_query_async, BancoIndisponivel
+# Importa a linha tipada dos membros encontrados
+from modelos import MembroBusca
+# Importa o índice em memória de membros dos clãs
+from indice_membros import indice
+# Importa a lista paginada usada pelos comandos
+from functions.cla_views import ListaPaginadaView
+# Importa o limite de uso por comando
+from limitador import verificar_limite
+# Importa o defer instrumentado
+from metricas import adiar
 
 # Configura o logger para este módulo
 logger = logging.getLogger('bot')
 
+# Quantidade máxima de resultados de uma busca (paginados em memória)
+LIMITE_RESULTADOS = 50
+
+# Tamanho mínimo do termo de busca por nome
+TAMANHO_MINIMO_TERMO = 2
+
+# IDs do Discord e da Steam são números de 15 a 20 dígitos (ou uma menção <@id>)
+PADRAO_ID = re.compile(r'^<@!?(\d{15,20})>$|^(\d{15,20})$')
+
+# Busca exata por discord_id ou steam_id (ambos com índice único)
+# Cada linha é um MembroBusca (id, discord_id, nome, steam_id, semelhanca)
+CONSULTA_POR_ID = """
+    SELECT id, discord_id, nome, steam_id, 1.0 AS semelhanca
+    FROM membros
+    WHERE discord_id = %s OR steam_id = %s
+    ORDER BY id
+"""
+
+# Busca por trecho do nome, tolerante a erros de digitação (índice GIN de trigramas em membros.nome).
+# Os nomes que contêm o termo exatamente vêm primeiro; depois, os mais parecidos.
+CONSULTA_POR_NOME = """
+    SELECT id, discord_id, nome, steam_id, word_similarity(%s, nome) AS semelhanca
+    FROM membros
+    WHERE %s <%% nome OR nome ILIKE %s
+    ORDER BY nome ILIKE %s DESC, semelhanca DESC, id
+    LIMIT %s
+"""
+
+def _padrao_ilike(termo):
+    # Escapa os curingas do ILIKE para buscar o termo literalmente
+    return "%" + re.sub(r'([\\%_])', r'\\\1', termo) + "%"
+
+async def buscar_membros(termo):
+    """
+    Retorna os membros que correspondem ao termo (trecho do nome, menção, discord_id ou steam_id),
+    do mais para o menos relevante.
+    """
+    correspondencia = PADRAO_ID.match(termo)
+    if correspondencia:
+        numero = correspondencia.group(1) or correspondencia.group(2)
+        discord_id = int(numero) if int(numero) < 2 ** 63 else None
+        resultado = await executar_query_async(CONSULTA_POR_ID, (discord_id, numero), modelo=MembroBusca)
+        if resultado:
+            return resultado
+    padrao = _padrao_ilike(termo)
+    return await executar_query_async(CONSULTA_POR_NOME, (termo, termo, padrao, padrao, LIMITE_RESULTADOS), modelo=MembroBusca) or []
+
+# Define o grupo de comandos /usuario
+class UsuarioCog(app_commands.Group):
+    def __init__(self):
+        # Inicializa a classe pai com nome e descrição para o grupo de comandos
+        super().__init__(name="usuario", description="Comandos relacionados a usuários")
+        logger.info("UsuarioCog inicializado")
+
+    @app_commands.command(name="buscar", description="Busca usuários pelo nome, ID do Discord ou Steam ID")
+    @app_commands.describe(termo="Trecho do nome, menção, ID do Discord ou Steam ID")
+    @app_commands.check(verificar_limite)
+    async def buscar_usuario(self, interaction: discord.Interaction, termo: str):
+        logger.info(f"Busca de usuários pelo usuário {interaction.user.id}: {termo!r}")
+        termo = termo.strip()
+        if len(termo) < TAMANHO_MINIMO_TERMO:
+            await interaction.response.send_message(
+                f"Informe pelo menos {TAMANHO_MINIMO_TERMO} caracteres para a busca.", ephemeral=True)
+            return
+        await adiar(interaction, ephemeral=True)
+
+        try:
+            membros = await buscar_membros(termo)
+            if not membros:
+                await interaction.followup.send("Nenhum usuário encontrado.")
+                return
+
+            # Clãs de cada membro encontrado, se o índice em memória estiver carregado
+            clas = {}
+            if indice.pronto:
+                for membro in membros:
+                    clas[membro.id] = [await indice.nome_do_cla(cla_id) for cla_id in await indice.clas_do_membro(membro.id)]
+
+            def formatar(linha, guild):
+                posicao, membro = linha
+                mensagem = f"**Discord:** <@{membro.discord_id}> (`{membro.discord_id}`)\n"
+                if membro.steam_id:
+                    mensagem += f"**Steam ID:** `{membro.steam_id}`\n"
+                if clas.get(membro.id):
+                    mensagem += f"**Clãs:** {', '.join(clas[membro.id])}\n"
+                return mensagem
+
+            async def buscar_lote(cursor, limite):
+                # Os resultados já estão em memória: o cursor é a posição do próximo item
+                return list(enumerate(membros[cursor:cursor + limite], cursor))
+
+            view = ListaPaginadaView(
+                buscar_lote, formatar, interaction.guild, interaction.user.id,
+                f"Usuários encontrados para \"{termo[:100]}\" ({len(membros)})",
+                titulo_campo=lambda linha: linha[1].nome,
+                cursor=lambda linha: linha[0] + 1,
+                cursor_inicial=0,
+            )
+            await view.iniciar(interaction)
+        except BancoIndisponivel:
+            await interaction.followup.send("O banco de dados está temporariamente indisponível. Por favor, tente novamente em alguns instantes.")
+        except Exception as e:
+            logger.error(f"Erro ao buscar usuários: {str(e)}", exc_info=True)
+            await interaction.followup.send("Ocorreu um erro ao buscar usuários. Por favor, tente novamente mais tarde.")
+
 # Função para configurar os comandos de pesquisa de usuário na árvore de comandos
 def setup_user_search_commands(tree: app_commands.CommandTree):
     # Registra no log o início da configuração dos comandos
     logger.info("Configurando comandos de usuário...")
     try:
-        # Aqui você pode adicionar comandos diretamente à árvore, se necessário
-        # Por exemplo:
-        # @tree.command(name="exemplo", description="Um comando de exemplo")
-        # async def exemplo_comando(interaction: discord.Interaction):
-        #     await interaction.response.send_message("Este é um comando de exemplo.")
-
+        # Adiciona o grupo /usuario à árvore
+        tree.add_command(UsuarioCog())
         logger.info("Comandos de usuário configurados com sucesso")
     except Exception as e:
         # Em caso de erro, registra o erro no log
         logger.error(f"Erro ao configurar comandos de usuário: {e}", exc_info=True)
 
 # Resumo do arquivo:
-# Este arquivo define uma estrutura para comandos de pesquisa de usuário em um bot do Discord.
-# Ele importa módulos necessários, configura um logger, e fornece uma função para configurar
-# esses comandos na árvore de comandos do bot. O código inclui tratamento de erros e logging
-# para facilitar a depuração e monitoramento do funcionamento do bot.
+# Este arquivo define o grupo de comandos /usuario, com o comando 'buscar', que procura membros cadastrados
+# pelo trecho do nome (tolerante a erros de digitação), por menção, pelo ID do Discord ou pelo Steam ID.
+# A busca por nome usa o índice GIN de trigramas (pg_trgm) criado pela migração 0004 e retorna no máximo
+# LIMITE_RESULTADOS membros, ordenados por relevância e exibidos em uma lista paginada em memória.
@@ -0,0 +1,271 @@
+# Importa os módulos necessários
+import asyncio  # Importa o módulo asyncio para agendar recargas pontuais
+import logging  # Importa o módulo logging para registrar eventos
+from datetime import datetime  # Importa datetime para normalizar a versão (ult_atualizacao) dos clãs
+from database import executar_query_async, registrar_observador, BancoIndisponivel  # Importa o acesso assíncrono ao banco e o registro de observadores
+from modelos import ClaResumo, ClaMembros, Membro  # Importa as linhas tipadas das tabelas cla e membros
+
+# Configura o logger para este módulo
+logger = logging.getLogger('bot')
+
+def _versao(valor):
+    # ult_atualizacao chega como datetime do banco ou como texto gravado pelos comandos
+    if isinstance(valor, str):
+        return datetime.fromisoformat(valor)
+    return valor
+
+class IndiceMembros:
+    """
+    Índice em memória de quais clãs cada membro integra, por servidor.
+    """
+
+    def __init__(self):
+        # cla_id -> {"servidor_id": int, "nome": str, "membros": set(membro_id), "ativo": bool, "versao": datetime}
+        self._clas = {}
+        # membro_id -> set(cla_id)
+        self._por_membro = {}
+        # discord_id -> membro_id (id interno da tabela membros)
+        self._membros_discord = {}
+        # Indica se o índice foi carregado do banco
+        self.pronto = False
+
+    async def carregar(self):
+        """
+        Carrega (ou recarrega) o índice a partir das tabelas cla e membros.
+        """
+        clas = await executar_query_async(f"SELECT {ClaResumo.colunas()} FROM cla", modelo=ClaResumo)
+        membros = await executar_query_async(f"SELECT {Membro.colunas()} FROM membros", modelo=Membro)
+        if clas is None or membros is None:
+            logger.error("Não foi possível carregar o índice de membros; usando o banco diretamente")
+            self.pronto = False
+            return
+
+        self._clas = {}
+        self._por_membro = {}
+        for cla in clas:
+            self._definir_linha(cla)
+        self._membros_discord = {int(membro.discord_id): membro.id for membro in membros}
+        self.pronto = True
+        logger.info(f"Índice de membros carregado: {len(self._clas)} clãs, {len(self._membros_discord)} membros")
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    async def id_do_membro(self, discord_id):
+        """
+        Retorna o id interno do membro com o discord_id informado, ou None.
+        """
+        if self.pronto:
+            return self._membros_discord.get(int(discord_id))
+        resultado = await executar_query_async("SELECT id FROM membros WHERE discord_id = %s", (int(discord_id),))
+        return resultado[0][0] if resultado else None
+
+    async def ids_dos_membros(self, discord_ids):
+        """
+        Retorna {discord_id: id interno} para os membros já cadastrados entre os informados.
+        """
+        discord_ids = {int(discord_id) for discord_id in discord_ids}
+        if self.pronto:
+            return {d: self._membros_discord[d] for d in discord_ids if d in self._membros_discord}
+        resultado = await executar_query_async(
+            f"SELECT {Membro.colunas()} FROM membros WHERE discord_id = ANY(%s)", (list(discord_ids),), modelo=Membro
+        )
+        return {int(membro.discord_id): membro.id for membro in resultado or []}
+
+    async def clas_do_membro(self, membro_id, servidor_id=None, apenas_ativos=False):
+        """
+        Retorna os ids dos clãs do membro, opcionalmente filtrando pelo servidor e pelos clãs ativos.
+        """
+        if self.pronto:
+            return sorted(
+                cla_id for cla_id in self._por_membro.get(membro_id, ())
+                if (servidor_id is None or self._clas[cla_id]["servidor_id"] == servidor_id)
+                and (not apenas_ativos or self._clas[cla_id]["ativo"])
+            )
+        condicao = "members_cla @> ARRAY[%s]"
+        params = (membro_id,)
+        if servidor_id is not None:
+            condicao += " AND servidor_id = %s"
+            params += (servidor_id,)
+        if apenas_ativos:
+            condicao += " AND ativo"
+        resultado = await executar_query_async(f"SELECT id FROM cla WHERE {condicao} ORDER BY id", params)
+        return [linha[0] for linha in resultado or []]
+
+    async def clas_do_discord(self, discord_id, servidor_id=None, apenas_ativos=False):
+        """
+        Atalho para clas_do_membro a partir do discord_id.
+        """
+        membro_id = await self.id_do_membro(discord_id)
+        if membro_id is None:
+            return []
+        return await self.clas_do_membro(membro_id, servidor_id, apenas_ativos)
+
+    def clas_do_servidor(self, servidor_id):
+        """
+        Retorna os ids (ordenados) dos clãs do servidor. Exige o índice carregado.
+        """
+        return sorted(cla_id for cla_id, cla in self._clas.items() if cla["servidor_id"] == servidor_id)
+
+    def versao_do_cla(self, cla_id):
+        """
+        Retorna a versão (ult_atualizacao) do clã conhecida pelo índice, ou None.
+        """
+        cla = self._clas.get(cla_id)
+        return cla["versao"] if cla else None
+
+    async def nome_do_cla(self, cla_id):
+        """
+        Retorna o nome do clã, ou None se ele não existir.
+        """
+        if self.pronto:
+            cla = self._clas.get(cla_id)
+            return cla["nome"] if cla else None
+        resultado = await executar_query_async("SELECT name_cla FROM cla WHERE id = %s", (cla_id,))
+        return resultado[0][0] if resultado else None
+
+    # ------------------------------------------------------------------
+    # Atualização (write-through)
+    # ------------------------------------------------------------------
+
+    def _definir_linha(self, cla):
+        # Grava um clã lido do banco (ClaResumo)
+        self._definir_cla(cla.id, cla.servidor_id, cla.name_cla, cla.members_cla, cla.ativo, cla.ult_atualizacao)
+
+    def _definir_cla(self, cla_id, servidor_id, nome, membros, ativo=True, versao=None):
+        # Remove as associações antigas antes de gravar as novas
+        self._remover_cla(cla_id)
+        membros = membros or []
+        self._clas[cla_id] = {"servidor_id": servidor_id, "nome": nome, "membros": set(membros),
+                              "ativo": ativo, "versao": _versao(versao)}
+        for membro_id in membros:
+            self._por_membro.setdefault(membro_id, set()).add(cla_id)
+
+    def _remover_cla(self, cla_id):
+        cla = self._clas.pop(cla_id, None)
+        if not cla:
+            return
+        for membro_id in cla["membros"]:
+            clas = self._por_membro.get(membro_id)
+            if clas:
+                clas.discard(cla_id)
+                if not clas:
+                    del self._por_membro[membro_id]
+
+    def _ao_alterar_cla(self, operacao, registros):
+        # Observador da tabela cla, chamado por database.py após cada escrita
+        desconhecidos = []
+        for registro in registros:
+            cla_id = registro["id"]
+            if operacao == "exclude":
+                self._remover_cla(cla_id)
+                continue
+            atual = self._clas.get(cla_id)
+            if atual is None and operacao != "add":
+                # Clã fora do índice: recarrega a linha do banco
+                desconhecidos.append(cla_id)
+                continue
+            atual = atual or {"servidor_id": None, "nome": None, "membros": set(), "ativo": True, "versao": None}
+            self._definir_cla(
+                cla_id,
+                registro.get("servidor_id", atual["servidor_id"]),
+                registro.get("name_cla", atual["nome"]),
+                registro.get("members_cla", atual["membros"]),
+                registro.get("ativo", atual["ativo"]),
+                registro.get("ult_atualizacao", atual["versao"]),
+            )
+        if desconhecidos:
+            self._agendar_recarga(desconhecidos)
+
+    def _ao_alterar_membro(self, operacao, registros):
+        # Observador da tabela membros, mantém o mapa discord_id -> id
+        for registro in registros:
+            if operacao == "exclude":
+                for discord_id, membro_id in list(self._membros_discord.items()):
+                    if membro_id == registro["id"]:
+                        del self._membros_discord[discord_id]
+            elif "discord_id" in registro:
+                self._membros_discord[int(registro["discord_id"])] = registro["id"]
+
+    def _agendar_recarga(self, cla_ids):
+        try:
+            asyncio.get_running_loop().create_task(self._recarregar_em_segundo_plano(cla_ids))
+        except RuntimeError:
+            # Sem event loop (uso síncrono): o índice deixa de ser confiável até a próxima carga
+            logger.warning("Índice de membros desatualizado; será recarregado no próximo carregamento")
+            self.pronto = False
+
+    async def _recarregar_em_segundo_plano(self, cla_ids):
+        try:
+            await self.recarregar_clas(cla_ids)
+        except BancoIndisponivel:
+            # Sem o banco não há como conferir os clãs alterados: volta a consultar o banco até a próxima carga
+            logger.warning("Índice de membros desatualizado (banco indisponível); usando o banco diretamente")
+            self.pronto = False
+
+    async def recarregar_clas(self, cla_ids):
+        """
+        Relê do banco apenas os clãs informados.
+        """
+        resultado = await executar_query_async(
+            f"SELECT {ClaResumo.colunas()} FROM cla WHERE id = ANY(%s)", (list(cla_ids),), modelo=ClaResumo
+        )
+        if resultado is None:
+            return
+        encontrados = set()
+        for cla in resultado:
+            self._definir_linha(cla)
+            encontrados.add(cla.id)
+        for cla_id in set(cla_ids) - encontrados:
+            self._remover_cla(cla_id)
+
+    # ------------------------------------------------------------------
+    # Verificação de consistência
+    # ------------------------------------------------------------------
+
+    async def verificar_consistencia(self):
+        """
+        Compara o índice com o banco e retorna a lista de divergências encontradas.
+        """
+        clas = await executar_query_async(f"SELECT {ClaMembros.colunas()} FROM cla", modelo=ClaMembros)
+        membros = await executar_query_async(f"SELECT {Membro.colunas()} FROM membros", modelo=Membro)
+        if clas is None or membros is None:
+            return ["Não foi possível ler o banco de dados."]
+
+        divergencias = []
+        ids_banco = set()
+        for linha in clas:
+            ids_banco.add(linha.id)
+            cla = self._clas.get(linha.id)
+            if cla is None:
+                divergencias.append(f"Clã {linha.id} ausente do índice")
+                continue
+            if cla["servidor_id"] != linha.servidor_id:
+                divergencias.append(f"Clã {linha.id}: servidor {cla['servidor_id']} no índice, {linha.servidor_id} no banco")
+            membros_banco = set(linha.members_cla or [])
+            if cla["membros"] != membros_banco:
+                faltando = sorted(membros_banco - cla["membros"])
+                sobrando = sorted(cla["membros"] - membros_banco)
+                divergencias.append(f"Clã {linha.id}: faltando {faltando}, sobrando {sobrando}")
+        for cla_id in sorted(set(self._clas) - ids_banco):
+            divergencias.append(f"Clã {cla_id} existe no índice mas não no banco")
+
+        mapa_banco = {int(membro.discord_id): membro.id for membro in membros}
+        if mapa_banco != self._membros_discord:
+            diferentes = set(mapa_banco.items()) ^ set(self._membros_discord.items())
+            divergencias.append(f"Mapa de membros com {len(diferentes)} entrada(s) divergente(s)")
+        return divergencias
+
+# Instância única do índice, compartilhada pelos comandos
+indice = IndiceMembros()
+registrar_observador("cla", indice._ao_alterar_cla)
+registrar_observador("membros", indice._ao_alterar_membro)
+
+# Resumo do arquivo:
+# Este arquivo define o IndiceMembros, um índice em memória que mapeia cada membro aos seus clãs por servidor.
+# O índice é carregado da tabela cla na inicialização do bot e mantido atualizado pelos observadores
+# registrados em database.py, de modo que as verificações de participação em clãs viram consultas a dicionários.
+# O índice também guarda se cada clã está ativo e sua versão (ult_atualizacao), usada pelo cache de cartões.
+# Enquanto o índice não estiver carregado, as consultas recorrem ao banco de dados.
+# Também oferece uma verificação de consistência que compara o índice com o PostgreSQL.
@@ -0,0 +1,183 @@
+# Importa os módulos necessários
+import asyncio  # Importa o módulo asyncio para o carregamento em segundo plano
+import bisect  # Importa o módulo bisect para buscar nas listas ordenadas
+import logging  # Importa o módulo logging para registrar eventos
+from database import executar_query_async, registrar_observador, BancoIndisponivel  # Importa o acesso assíncrono ao banco
+from modelos import ClaNome  # Importa a linha tipada com o nome e a TAG dos clãs
+
+# Configura o logger para este módulo
+logger = logging.getLogger('bot')
+
+# Quantidade de clãs lidos por consulta no carregamento
+LOTE_CARREGAMENTO = 1000
+
+# Quantidade máxima de sugestões aceitas pelo autocomplete do Discord
+LIMITE_SUGESTOES = 25
+
+# Campos indexados: nome no índice -> coluna da tabela cla
+CAMPOS = {"nome": "name_cla", "tag": "tag_cla"}
+
+def _chave(texto):
+    # Chave de ordenação e de busca: sem diferença entre maiúsculas e minúsculas
+    return texto.casefold()
+
+class IndicePrefixos:
+    """
+    Índice em memória dos nomes e TAGs dos clãs de cada servidor, em listas ordenadas
+    (chave, texto original, cla_id), para autocomplete por prefixo e verificação de
+    disponibilidade sem consultar o banco.
+    """
+
+    def __init__(self):
+        # servidor_id -> {"nome": [(chave, nome, cla_id)], "tag": [(chave, tag, cla_id)]}
+        self._servidores = {}
+        # cla_id -> (servidor_id, nome, tag)
+        self._clas = {}
+        # Indica se todos os clãs já foram carregados do banco
+        self.pronto = False
+        # Carregamento em segundo plano em andamento
+        self._tarefa = None
+
+    def aquecer(self):
+        """
+        Inicia o carregamento em segundo plano, se o índice não estiver pronto nem carregando.
+        """
+        if self.pronto or (self._tarefa is not None and not self._tarefa.done()):
+            return
+        self._tarefa = asyncio.get_running_loop().create_task(self.carregar())
+
+    def reiniciar(self):
+        """
+        Descarta o índice e o carrega novamente em segundo plano (por exemplo após perder notificações de alteração).
+        """
+        if self._tarefa is not None and not self._tarefa.done():
+            self._tarefa.cancel()
+        self.pronto = False
+        self.aquecer()
+
+    async def carregar(self):
+        """
+        Carrega todos os clãs em lotes (paginação por id), sem bloquear o event loop entre os lotes.
+        Os comandos continuam consultando o banco até o fim do carregamento.
+        """
+        self.pronto = False
+        self._servidores = {}
+        self._clas = {}
+        ultimo_id = 0
+        total = 0
+        try:
+            while True:
+                lote = await executar_query_async(
+                    f"SELECT {ClaNome.colunas()} FROM cla WHERE id > %s ORDER BY id LIMIT %s",
+                    (ultimo_id, LOTE_CARREGAMENTO), modelo=ClaNome
+                )
+                if lote is None:
+                    logger.error("Não foi possível carregar o índice de nomes e TAGs de clãs")
+                    return
+                for cla in lote:
+                    self._definir(cla.id, cla.servidor_id, cla.name_cla, cla.tag_cla)
+                total += len(lote)
+                if len(lote) < LOTE_CARREGAMENTO:
+                    break
+                ultimo_id = lote[-1].id
+                await asyncio.sleep(0)
+        except BancoIndisponivel as e:
+            logger.error(f"Banco indisponível ao carregar o índice de nomes e TAGs de clãs: {e}")
+            return
+        self.pronto = True
+        logger.info(f"Índice de nomes e TAGs carregado: {total} clãs")
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def sugerir(self, servidor_id, prefixo, limite=LIMITE_SUGESTOES):
+        """
+        Retorna [(cla_id, nome, tag)] dos clãs do servidor cujo nome ou TAG começa com o prefixo
+        (sem diferenciar maiúsculas e minúsculas), em ordem alfabética.
+        """
+        listas = self._servidores.get(servidor_id)
+        if not listas:
+            return []
+        prefixo = _chave(prefixo)
+        encontrados = {}
+        for campo in CAMPOS:
+            lista = listas[campo]
+            posicao = bisect.bisect_left(lista, (prefixo,))
+            while posicao < len(lista) and lista[posicao][0].startswith(prefixo) and len(encontrados) < limite:
+                encontrados.setdefault(lista[posicao][2], None)
+                posicao += 1
+        sugestoes = [(cla_id, *self._clas[cla_id][1:]) for cla_id in encontrados]
+        return sorted(sugestoes, key=lambda sugestao: _chave(sugestao[1]))[:limite]
+
+    def em_uso(self, servidor_id, campo, texto):
+        """
+        Indica se algum clã do servidor já usa exatamente esse nome ('nome') ou TAG ('tag').
+        """
+        lista = self._servidores.get(servidor_id, {}).get(campo, [])
+        chave = _chave(texto)
+        posicao = bisect.bisect_left(lista, (chave,))
+        while posicao < len(lista) and lista[posicao][0] == chave:
+            if lista[posicao][1] == texto:
+                return True
+            posicao += 1
+        return False
+
+    async def disponivel(self, servidor_id, campo, texto):
+        """
+        Indica se o nome ou TAG está livre no servidor, consultando o banco apenas
+        enquanto o índice não estiver carregado.
+        """
+        if self.pronto:
+            return not self.em_uso(servidor_id, campo, texto)
+        resultado = await executar_query_async(
+            f"SELECT 1 FROM cla WHERE {CAMPOS[campo]} = %s AND servidor_id = %s LIMIT 1", (texto, servidor_id)
+        )
+        return not resultado
+
+    # ------------------------------------------------------------------
+    # Atualização (write-through)
+    # ------------------------------------------------------------------
+
+    def _definir(self, cla_id, servidor_id, nome, tag):
+        self._remover(cla_id)
+        self._clas[cla_id] = (servidor_id, nome, tag)
+        listas = self._servidores.setdefault(servidor_id, {campo: [] for campo in CAMPOS})
+        bisect.insort(listas["nome"], (_chave(nome), nome, cla_id))
+        bisect.insort(listas["tag"], (_chave(tag), tag, cla_id))
+
+    def _remover(self, cla_id):
+        cla = self._clas.pop(cla_id, None)
+        if cla is None:
+            return
+        servidor_id, nome, tag = cla
+        listas = self._servidores[servidor_id]
+        for campo, texto in (("nome", nome), ("tag", tag)):
+            lista = listas[campo]
+            posicao = bisect.bisect_left(lista, (_chave(texto), texto, cla_id))
+            if posicao < len(lista) and lista[posicao][2] == cla_id:
+                del lista[posicao]
+
+    def _ao_alterar_cla(self, operacao, registros):
+        # Observador da tabela cla: mantém os nomes e TAGs atualizados a cada criação, edição e exclusão
+        for registro in registros:
+            cla_id = registro["id"]
+            if operacao == "exclude":
+                self._remover(cla_id)
+                continue
+            servidor_id, nome, tag = self._clas.get(cla_id, (None, None, None))
+            servidor_id = registro.get("servidor_id", servidor_id)
+            nome = registro.get("name_cla", nome)
+            tag = registro.get("tag_cla", tag)
+            if nome is not None and tag is not None:
+                self._definir(cla_id, servidor_id, nome, tag)
+
+# Instância única do índice, compartilhada pelos comandos
+prefixos = IndicePrefixos()
+registrar_observador("cla", prefixos._ao_alterar_cla)
+
+# Resumo do arquivo:
+# Este arquivo define o IndicePrefixos, um índice em memória dos nomes e TAGs dos clãs de cada servidor,
+# mantido em listas ordenadas e consultado com busca binária (bisect). Ele atende o autocomplete de clãs
+# e a verificação de nome/TAG já em uso na criação de clãs sem consultar o banco. O índice é carregado em
+# lotes, em segundo plano, na inicialização (até lá o banco é consultado) e atualizado a cada escrita na tabela cla.
@@ -0,0 +1,120 @@
+# Importa os módulos necessários
+import logging  # Importa o módulo logging para registrar eventos
+import math  # Importa o módulo math para arredondar o tempo de espera
+import time  # Importa o módulo time para o relógio dos baldes
+from collections import OrderedDict  # Importa o OrderedDict para descartar os baldes menos usados (LRU)
+import discord  # Importa o módulo discord para responder à interação
+from discord import app_commands  # Importa app_commands para a exceção de verificação
+from config_servidores import configuracoes  # Importa as configurações de cada servidor
+from metricas import metricas  # Importa o registro de métricas do bot
+
+# Configura o logger para este módulo
+logger = logging.getLogger('bot')
+
+# Quantidade máxima de baldes mantidos em memória
+MAX_BALDES = 10000
+
+# Escopos de limite aceitos na configuração
+ESCOPOS = ("usuario", "servidor", "global")
+
+class LimiteExcedido(app_commands.CheckFailure):
+    """
+    O comando foi usado mais vezes do que o limite configurado permite.
+    """
+
+    def __init__(self, comando, escopo, retry_after):
+        self.comando = comando
+        self.escopo = escopo
+        self.retry_after = retry_after
+        super().__init__(f"Limite de uso de /{comando} excedido ({escopo}); tente novamente em {retry_after:.1f}s")
+
+class Limitador:
+    """
+    Limites de uso por comando no modelo de balde de fichas (token bucket), por usuário,
+    por servidor ou global. Cada balde guarda apenas (fichas, instante da última recarga);
+    a verificação é O(1) e os baldes menos usados são descartados acima de MAX_BALDES.
+    """
+
+    def __init__(self, max_baldes=MAX_BALDES):
+        # (comando, escopo, chave) -> [fichas, instante]
+        self._baldes = OrderedDict()
+        self.max_baldes = max_baldes
+
+    def _chave(self, escopo, interaction):
+        if escopo == "usuario":
+            return interaction.user.id
+        if escopo == "servidor":
+            return interaction.guild_id or interaction.user.id
+        return None
+
+    def consumir(self, comando, interaction, limites):
+        """
+        Consome uma ficha de cada escopo configurado para o comando em 'limites'
+        ({"comando": {"escopo": {"capacidade": n, "periodo": segundos}}}). Se algum balde
+        estiver vazio, nada é consumido e LimiteExcedido é levantada com o tempo de espera.
+        """
+        regras = limites.get(comando)
+        if not regras:
+            return
+        agora = time.monotonic()
+        baldes = []
+        for escopo, regra in regras.items():
+            if escopo not in ESCOPOS:
+                continue
+            capacidade = regra['capacidade']
+            if capacidade <= 0:
+                # Capacidade zero bloqueia o comando no escopo
+                metricas.incrementar("bot_limite_excedido_total", comando=comando, escopo=escopo)
+                raise LimiteExcedido(comando, escopo, max(regra['periodo'], 0))
+            if regra['periodo'] <= 0:
+                # Período inválido: regra ignorada
+                continue
+            taxa = capacidade / regra['periodo']
+            chave = (comando, escopo, self._chave(escopo, interaction))
+            balde = self._baldes.get(chave)
+            if balde is None:
+                balde = self._baldes[chave] = [capacidade, agora]
+            else:
+                self._baldes.move_to_end(chave)
+                balde[0] = min(capacidade, balde[0] + (agora - balde[1]) * taxa)
+                balde[1] = agora
+            if balde[0] < 1:
+                metricas.incrementar("bot_limite_excedido_total", comando=comando, escopo=escopo)
+                raise LimiteExcedido(comando, escopo, (1 - balde[0]) / taxa)
+            baldes.append(balde)
+        for balde in baldes:
+            balde[0] -= 1
+        while len(self._baldes) > self.max_baldes:
+            self._baldes.popitem(last=False)
+
+# Instância única do limitador, compartilhada pelos comandos
+limitador = Limitador()
+
+async def verificar_limite(interaction: discord.Interaction) -> bool:
+    """
+    Verificação (app_commands.check) que aplica os limites configurados para o comando
+    no servidor da interação, antes de o comando executar o defer.
+    """
+    config = await configuracoes.obter(interaction.guild_id)
+    limitador.consumir(interaction.command.qualified_name, interaction, config["limites"])
+    return True
+
+async def responder_limite(interaction: discord.Interaction, erro: LimiteExcedido):
+    """
+    Informa ao usuário quanto tempo falta para poder usar o comando novamente.
+    """
+    mensagem = f"Você está usando /{erro.comando} muito rápido. Tente novamente em {math.ceil(erro.retry_after)} segundo(s)."
+    if erro.escopo != "usuario":
+        mensagem = f"/{erro.comando} está sendo muito usado no momento. Tente novamente em {math.ceil(erro.retry_after)} segundo(s)."
+    if interaction.response.is_done():
+        await interaction.followup.send(mensagem, ephemeral=True)
+    else:
+        await interaction.response.send_message(mensagem, ephemeral=True)
+
+# Resumo do arquivo:
+# Este arquivo implementa o limitador de uso dos comandos (token bucket), configurado na seção "limites"
+# do config.json por comando e por escopo (usuário, servidor ou global), e que cada servidor pode substituir
+# por comando (tabela servidor_config, ver config_servidores.py). A verificação roda como um
+# app_commands.check, antes do defer; ao exceder o limite, LimiteExcedido informa o tempo de espera.
+# O estado fica em memória, com verificação O(1) e quantidade máxima de baldes (os menos usados são descartados),
+# de modo que um único usuário ou servidor não consegue esgotar o pool de conexões do banco.
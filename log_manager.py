@@ -1,48 +1,200 @@
 import discord
 from discord.ext import commands
-import json
+import asyncio
 import logging
 from datetime import datetime
+from config_servidores import configuracoes
 
-# Configuração do logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# Configuração do logging (handlers e níveis definidos em configuracao_logs.py)
 logger = logging.getLogger('log_manager')
 
+# Parâmetros da fila de envio de logs
+TAMANHO_MAXIMO_FILA = 1000  # Eventos aguardando envio; acima disso são descartados e contabilizados
+INTERVALO_ENVIO = 2.0  # Segundos máximos que um evento espera para ser agrupado com outros
+EVENTOS_POR_LOTE = 250  # 10 embeds x 25 campos
+EMBEDS_POR_MENSAGEM = 10
+CAMPOS_POR_EMBED = 25
+LIMITE_VALOR_CAMPO = 1024
+LIMITE_CARACTERES_MENSAGEM = 6000  # Limite do Discord somando todos os embeds de uma mensagem
+TENTATIVAS_ENVIO = 5
+TITULO_EMBED = "Log do Servidor"
+
+# Marcador colocado na fila por encerrar(): a tarefa envia o lote em andamento e termina
+_PARAR = object()
+
 class LogManager:
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.config = self.carregar_config()
-        self.canal_logs_id = self.config['canais']['logs']
+        # Fila limitada de eventos; o envio é feito por uma tarefa em segundo plano
+        self.fila = asyncio.Queue(maxsize=TAMANHO_MAXIMO_FILA)
+        self._tarefa = None
+        self._descartados_pendentes = 0
+        # Contadores expostos em estatisticas()
+        self.eventos_enviados = 0
+        self.eventos_descartados = 0
+        self.mensagens_enviadas = 0
+        self.limites_atingidos = 0
+        self.falhas_envio = 0
 
-    def carregar_config(self):
+    def registrar(self, mensagem: str, cor: discord.Color = discord.Color.blue(), guild_id: int = None) -> bool:
+        """
+        Coloca um evento na fila de envio sem esperar por nenhuma operação de rede.
+        O evento vai para o canal de logs do servidor 'guild_id' (ou para o canal global, sem servidor).
+        Retorna False se a fila estiver cheia e o evento tiver sido descartado.
+        """
+        self.iniciar()
         try:
-            with open('config.json', 'r') as file:
-                return json.load(file)
-        except Exception as e:
-            logger.error(f"Erro ao carregar o arquivo de configuração: {e}")
-            return {}
-
-    async def enviar_log(self, mensagem: str, cor: discord.Color = discord.Color.blue()):
-        canal_logs = self.bot.get_channel(self.canal_logs_id)
-        if not canal_logs:
-            logger.error(f"Canal de logs não encontrado. ID: {self.canal_logs_id}")
-            return
-
-        embed = discord.Embed(
-            title="Log do Servidor",
-            description=mensagem,
-            color=cor,
-            timestamp=datetime.utcnow()
-        )
-        
-        try:
-            await canal_logs.send(embed=embed)
-        except discord.HTTPException as e:
-            logger.error(f"Erro ao enviar log para o canal: {e}")
+            self.fila.put_nowait((guild_id, datetime.utcnow(), mensagem, cor))
+            return True
+        except asyncio.QueueFull:
+            self.eventos_descartados += 1
+            self._descartados_pendentes += 1
+            return False
+
+    async def enviar_log(self, mensagem: str, cor: discord.Color = discord.Color.blue(), guild_id: int = None):
+        self.registrar(mensagem, cor, guild_id)
+
+    def iniciar(self):
+        """
+        Inicia a tarefa de envio, se ainda não estiver em execução.
+        """
+        if self._tarefa is None or self._tarefa.done():
+            self._tarefa = asyncio.get_running_loop().create_task(self._processar_fila())
+
+    async def encerrar(self):
+        """
+        Envia os eventos pendentes e encerra a tarefa de envio. A tarefa não é cancelada:
+        ela termina de enviar o que já retirou da fila antes de parar.
+        """
+        tarefa, self._tarefa = self._tarefa, None
+        if tarefa is not None and not tarefa.done():
+            await self.fila.put(_PARAR)
+            await tarefa
+        lote = []
+        while not self.fila.empty():
+            lote.append(self.fila.get_nowait())
+        if lote:
+            await self._enviar_lote(lote)
+
+    def estatisticas(self) -> dict:
+        return {
+            "na_fila": self.fila.qsize(),
+            "eventos_enviados": self.eventos_enviados,
+            "eventos_descartados": self.eventos_descartados,
+            "mensagens_enviadas": self.mensagens_enviadas,
+            "limites_atingidos": self.limites_atingidos,
+            "falhas_envio": self.falhas_envio,
+        }
+
+    async def _processar_fila(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # Espera o primeiro evento e agrupa os que chegarem até o prazo ou até encher o lote
+            evento = await self.fila.get()
+            if evento is _PARAR:
+                return
+            lote = [evento]
+            parar = False
+            prazo = loop.time() + INTERVALO_ENVIO
+            while len(lote) < EVENTOS_POR_LOTE:
+                restante = prazo - loop.time()
+                if restante <= 0:
+                    break
+                try:
+                    evento = await asyncio.wait_for(self.fila.get(), restante)
+                except asyncio.TimeoutError:
+                    break
+                if evento is _PARAR:
+                    parar = True
+                    break
+                lote.append(evento)
+            try:
+                await self._enviar_lote(lote)
+            except Exception as e:
+                logger.error(f"Erro inesperado ao enviar logs: {e}", exc_info=True)
+            if parar:
+                return
+
+    def _montar_mensagens(self, lote):
+        # Agrupa os eventos em embeds com vários campos (um embed por sequência de mesma cor),
+        # e os embeds em mensagens de até 10 embeds / 6000 caracteres
+        eventos = list(lote)
+        if self._descartados_pendentes:
+            aviso = f"{self._descartados_pendentes} evento(s) descartado(s) por excesso de logs."
+            eventos.insert(0, (datetime.utcnow(), aviso, discord.Color.dark_red()))
+            self._descartados_pendentes = 0
+
+        mensagens = []
+        embeds = []
+        caracteres = 0
+        embed = None
+        for horario, mensagem, cor in eventos:
+            nome = horario.strftime("%H:%M:%S")
+            valor = mensagem if len(mensagem) <= LIMITE_VALOR_CAMPO else f"{mensagem[:LIMITE_VALOR_CAMPO - 3]}..."
+            tamanho = len(nome) + len(valor)
+            novo_embed = embed is None or embed.color != cor or len(embed.fields) >= CAMPOS_POR_EMBED
+            if novo_embed:
+                tamanho += len(TITULO_EMBED)
+            if embeds and caracteres + tamanho > LIMITE_CARACTERES_MENSAGEM:
+                mensagens.append(embeds)
+                embeds, caracteres, novo_embed = [], 0, True
+                tamanho = len(nome) + len(valor) + len(TITULO_EMBED)
+            if novo_embed:
+                if len(embeds) >= EMBEDS_POR_MENSAGEM:
+                    mensagens.append(embeds)
+                    embeds, caracteres = [], 0
+                embed = discord.Embed(title=TITULO_EMBED, color=cor, timestamp=horario)
+                embeds.append(embed)
+            embed.add_field(name=nome, value=valor, inline=False)
+            caracteres += tamanho
+        if embeds:
+            mensagens.append(embeds)
+        return mensagens
+
+    async def _enviar_lote(self, lote):
+        # Separa os eventos pelo canal de logs configurado para cada servidor
+        canais = {}
+        for guild_id, horario, mensagem, cor in lote:
+            canal_logs_id = (await configuracoes.obter(guild_id))["canal_logs"]
+            canais.setdefault(canal_logs_id, []).append((horario, mensagem, cor))
+
+        for canal_logs_id, eventos in canais.items():
+            canal_logs = self.bot.get_channel(canal_logs_id) if canal_logs_id else None
+            if not canal_logs:
+                logger.error(f"Canal de logs não encontrado. ID: {canal_logs_id}")
+                continue
+
+            for embeds in self._montar_mensagens(eventos):
+                if await self._enviar_com_tentativas(canal_logs, embeds):
+                    self.mensagens_enviadas += 1
+                    self.eventos_enviados += sum(len(embed.fields) for embed in embeds)
+
+    async def _enviar_com_tentativas(self, canal_logs, embeds) -> bool:
+        # Reenvia com espera exponencial quando o Discord limita a taxa ou falha temporariamente
+        for tentativa in range(TENTATIVAS_ENVIO):
+            try:
+                await canal_logs.send(embeds=embeds)
+                return True
+            except discord.RateLimited as e:
+                self.limites_atingidos += 1
+                espera = e.retry_after
+            except discord.HTTPException as e:
+                if e.status != 429 and e.status < 500:
+                    logger.error(f"Erro ao enviar log para o canal: {e}")
+                    self.falhas_envio += 1
+                    return False
+                if e.status == 429:
+                    self.limites_atingidos += 1
+                espera = 2 ** tentativa
+            logger.warning(f"Envio de logs adiado por {espera:.1f}s (tentativa {tentativa + 1}/{TENTATIVAS_ENVIO})")
+            await asyncio.sleep(espera)
+        logger.error("Não foi possível enviar os logs após várias tentativas")
+        self.falhas_envio += 1
+        return False
 
     async def log_comando(self, ctx: commands.Context):
         mensagem = f"Comando usado: {ctx.command.name} por {ctx.author} ({ctx.author.id})"
-        await self.enviar_log(mensagem, discord.Color.green())
+        await self.enviar_log(mensagem, discord.Color.green(), ctx.guild.id if ctx.guild else None)
 
     async def log_erro(self, erro: Exception, contexto: str = ""):
         mensagem = f"Erro ocorrido: {type(erro).__name__}: {str(erro)}\nContexto: {contexto}"
@@ -50,21 +202,21 @@ class LogManager:
 
     async def log_membro_entrou(self, membro: discord.Member):
         mensagem = f"Novo membro entrou: {membro} ({membro.id})"
-        await self.enviar_log(mensagem, discord.Color.green())
+        await self.enviar_log(mensagem, discord.Color.green(), membro.guild.id)
 
     async def log_membro_saiu(self, membro: discord.Member):
         mensagem = f"Membro saiu: {membro} ({membro.id})"
-        await self.enviar_log(mensagem, discord.Color.orange())
+        await self.enviar_log(mensagem, discord.Color.orange(), membro.guild.id)
 
     async def log_mensagem_deletada(self, mensagem: discord.Message):
         conteudo = mensagem.content if len(mensagem.content) <= 1000 else f"{mensagem.content[:997]}..."
         msg = f"Mensagem deletada de {mensagem.author} ({mensagem.author.id}) no canal {mensagem.channel.mention}:\n{conteudo}"
-        await self.enviar_log(msg, discord.Color.red())
+        await self.enviar_log(msg, discord.Color.red(), mensagem.guild.id if mensagem.guild else None)
 
     async def log_mensagem_editada(self, antes: discord.Message, depois: discord.Message):
         msg = f"Mensagem editada por {antes.author} ({antes.author.id}) no canal {antes.channel.mention}:\n"
         msg += f"Antes: {antes.content}\nDepois: {depois.content}"
-        await self.enviar_log(msg, discord.Color.yellow())
+        await self.enviar_log(msg, discord.Color.yellow(), antes.guild.id if antes.guild else None)
 
 # Função para inicializar o LogManager
 def setup_log_manager(bot: commands.Bot) -> LogManager:
@@ -1,60 +1,137 @@
+# Marca o início do processo para medir o tempo até o bot ficar pronto
+import time  # Importa o módulo time para medir as fases da inicialização
+INICIO_PROCESSO = time.perf_counter()  # Instante em que o processo começou a importar os módulos
+
 # Importa os módulos necessários
 import discord  # Importa o módulo principal do Discord
 from discord import app_commands  # Importa o submódulo de comandos de aplicação
 from admin_functions import setup_admin_commands, carregar_config, verificar_atualizacoes  # Importa funções administrativas personalizadas
+from config_manager import config_manager  # Importa o serviço de configuração compartilhado
+from configuracao_logs import iniciar_logs  # Importa a configuração do logging em fila
 from user_functions import setup_user_commands  # Importa funções de usuário personalizadas
+from database import abrir_pool_async, fechar_conexoes_async, BancoIndisponivel  # Importa as funções que abrem e fecham o pool assíncrono do banco
+from indice_membros import indice  # Importa o índice em memória de membros dos clãs
+from indice_prefixos import prefixos  # Importa o índice em memória de nomes e TAGs dos clãs
+from cache_cartoes import cartoes  # Importa o cache de cartões de clã já formatados
+from notificacoes import OuvinteAlteracoes  # Importa a escuta das alterações feitas por outros processos
+from cache_servidores import servidores  # Importa o cache de servidores cadastrados
+from config_servidores import configuracoes  # Importa as configurações de cada servidor
+from metricas import marcar_inicio, registrar_fim, criar_trace_http, iniciar_servidor_metricas, registrar_fase, fase_inicializacao  # Importa a instrumentação do bot
+from sincronizacao_comandos import sincronizar_comandos, servidores_sincronizados  # Importa a sincronização de comandos com cache de assinaturas
+from auditoria import garantir_particoes  # Importa a manutenção das partições da auditoria de clãs
+from limitador import LimiteExcedido, responder_limite  # Importa o tratamento do limite de uso dos comandos
+from shards import ler_intervalo, shard_do_servidor, registrar_interacao, registrar_evento_shard  # Importa o apoio à execução em shards
 import asyncio  # Importa o módulo para programação assíncrona
 import logging  # Importa o módulo para registro de logs
-from discord.ext import commands  # Importa o módulo de extensão de comandos do Discord
-import json  # Importa o módulo json para ler o arquivo de configuração
+import argparse  # Importa o módulo argparse para ler os shards da linha de comando
+import json  # Importa o módulo json para tratar erros de leitura do arquivo de configuração
+import datetime  # Importa o módulo datetime para a manutenção diária da auditoria
 
 # Configura o logging
-logging.basicConfig(level=logging.INFO)  # Configura o nível básico de logging
+iniciar_logs()  # Envia os logs a uma fila escrita por uma thread separada, com os níveis do config.json
 logger = logging.getLogger('bot')  # Cria um logger específico para o bot
 
-# Define o ID do servidor Discord
-ID_DO_SERVIDOR = 1067860113689427979  # Armazena o ID do servidor Discord
+# Servidor onde versões anteriores registravam os comandos administrativos (hoje globais)
+SERVIDOR_COMANDOS_ANTIGO = 1067860113689427979  # Seus comandos próprios são removidos na primeira inicialização
+
+# Registra o tempo gasto importando os módulos
+registrar_fase("imports", time.perf_counter() - INICIO_PROCESSO)  # Mede a fase de imports
+
+# Define a árvore de comandos instrumentada
+class ArvoreComandos(app_commands.CommandTree):
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        # Marca o início de cada comando para as métricas
+        marcar_inicio(interaction)  # Registra o instante de início
+        registrar_interacao(interaction)  # Contabiliza a interação no shard que a recebeu
+        return True  # Não bloqueia nenhum comando
+
+    async def on_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        # Contabiliza o comando com erro antes do tratamento padrão
+        comando = interaction.command.qualified_name if interaction.command else "desconhecido"  # Identifica o comando
+        registrar_fim(interaction, comando, erro=True)  # Registra a duração e o erro
+        if isinstance(error, LimiteExcedido):  # Uso acima do limite configurado não é um erro do bot
+            await responder_limite(interaction, error)  # Informa o tempo de espera ao usuário
+            return  # Não registra o erro no log
+        await super().on_error(interaction, error)  # Mantém o registro padrão do erro
 
 # Define a classe principal do cliente do bot
-class BotClient(discord.Client):
-    def __init__(self):
-        # Inicializa o cliente com as intenções padrão
-        super().__init__(intents=discord.Intents.default())  # Chama o construtor da classe pai
+class BotClient(discord.AutoShardedClient):
+    def __init__(self, shard_count=None, shard_ids=None):
+        # Inicializa o cliente com as intenções padrão, medindo todas as requisições HTTP ao Discord.
+        # Sem shard_count o Discord informa a quantidade recomendada; sem shard_ids este processo executa todos os shards
+        super().__init__(intents=discord.Intents.default(), http_trace=criar_trace_http(),
+                         shard_count=shard_count, shard_ids=shard_ids)  # Chama o construtor da classe pai
         # Flag para controlar a sincronização de comandos
         self.synced = False  # Inicializa a flag de sincronização
+        # Flag para medir o tempo até o bot ficar pronto apenas na primeira conexão
+        self.pronto_registrado = False  # Inicializa a flag de tempo até ficar pronto
         # Cria uma árvore de comandos
-        self.tree = app_commands.CommandTree(self)  # Cria uma árvore de comandos para o bot
+        self.tree = ArvoreComandos(self)  # Cria uma árvore de comandos instrumentada para o bot
+        # Servidor local de métricas (formato Prometheus), se configurado
+        self.servidor_metricas = None  # Inicializa a variável do servidor de métricas
         # Inicializa a tarefa de atualização
         self.update_task = None  # Inicializa a variável para a tarefa de atualização
+        # Data da última verificação das partições da auditoria de clãs
+        self.ultima_manutencao = None  # Inicializa a data da última manutenção
+        # Escuta as alterações feitas no banco por outros processos, para manter os caches atualizados
+        self.ouvinte = OuvinteAlteracoes(self.aquecer_caches)  # Recarrega os caches após uma reconexão
+        # Status exibido atualmente na presença do bot
+        self.status_atual = None  # Evita atualizar a presença sem necessidade
+        # Atualiza a presença sempre que a configuração for recarregada
+        config_manager.assinar(self._aplicar_config)  # Assina as recargas da configuração
 
     async def setup_hook(self):
-        # Configura os comandos administrativos
-        admin_commands = setup_admin_commands(self.tree, self)  # Configura os comandos administrativos
-        # Adiciona cada comando administrativo à árvore
-        for cmd in admin_commands:
-            self.tree.add_command(cmd, guild=discord.Object(id=ID_DO_SERVIDOR))  # Adiciona comandos à árvore
-        # Configura os comandos de usuário
-        setup_user_commands(self.tree)  # Configura os comandos de usuário
+        with fase_inicializacao("setup_hook"):  # Mede o setup_hook inteiro
+            # Configura os comandos administrativos (globais; as permissões são verificadas por servidor)
+            setup_admin_commands(self.tree, self)  # Configura os comandos administrativos
+            # Configura os comandos de usuário
+            setup_user_commands(self.tree)  # Configura os comandos de usuário
+            # Abre o pool de conexões do banco
+            with fase_inicializacao("banco"):  # Mede a abertura do pool
+                await abrir_pool_async()  # Abre o pool assíncrono antes do primeiro comando
+                # Começa a escutar as alterações antes de aquecer os caches, para não perder nenhuma
+                await self.ouvinte.iniciar()  # Abre a conexão LISTEN
+            with fase_inicializacao("caches"):  # Mede o aquecimento dos caches
+                await self.aquecer_caches()  # Carrega os caches a partir do banco
+            # Inicia o endpoint local de métricas, se houver uma porta configurada
+            config_metricas = config_manager.obter().get('metricas', {})  # Lê a seção de métricas
+            if config_metricas.get('porta'):
+                self.servidor_metricas = await iniciar_servidor_metricas(config_metricas.get('host', '127.0.0.1'), config_metricas['porta'])  # Inicia o servidor
+
+    async def aquecer_caches(self):
+        # Carrega (ou recarrega) todos os caches em memória a partir do banco
+        try:
+            # Carrega o índice de membros dos clãs a partir do banco
+            await indice.carregar()  # Aquece o índice antes de atender comandos
+            # Carrega o mapeamento de servidores do Discord para o banco
+            await servidores.carregar()  # Aquece o cache de servidores
+        except BancoIndisponivel as e:
+            # O bot inicia mesmo sem banco; os caches consultam o banco diretamente quando ele voltar
+            logger.error(f"Banco indisponível, caches não aquecidos: {e}")  # Registra o erro
+        # Os cartões são validados pela versão de cada clã, mas alterações perdidas podem não ter mudado a versão
+        cartoes.limpar()  # Descarta os cartões já formatados
+        # As configurações por servidor são relidas do banco sob demanda
+        configuracoes.limpar()  # Descarta as configurações em cache
+        # Carrega os nomes e TAGs dos clãs em lotes, em segundo plano, sem atrasar a inicialização
+        prefixos.reiniciar()  # Até o fim do carregamento, as verificações consultam o banco
 
     async def on_ready(self):
         # Espera o bot estar completamente pronto
         await self.wait_until_ready()  # Aguarda o bot estar totalmente pronto
-        # Sincroniza os comandos se ainda não foram sincronizados
+        # Sincroniza os comandos se ainda não foram sincronizados (e apenas se tiverem mudado)
         if not self.synced:
-            try:
-                await self.tree.sync(guild=discord.Object(id=ID_DO_SERVIDOR))  # Tenta sincronizar para o servidor específico
-                self.synced = True  # Marca os comandos como sincronizados
-                print("Comandos sincronizados para o servidor específico.")  # Imprime mensagem de confirmação
-            except discord.errors.Forbidden as e:
-                print(f"Erro ao sincronizar comandos: {e}")  # Registra o erro
-                print("Tentando sincronizar globalmente...")  # Imprime mensagem de tentativa de sincronização global
-                await self.tree.sync()  # Sincroniza globalmente
+            with fase_inicializacao("sincronizacao"):  # Mede a sincronização dos comandos
+                await self.sincronizar_escopos()  # Sincroniza os comandos globais e limpa os antigos comandos por servidor
                 self.synced = True  # Marca os comandos como sincronizados
-                print("Comandos sincronizados globalmente.")  # Imprime mensagem de confirmação
 
-        # Carrega a configuração e define o status do bot
-        config = carregar_config()  # Carrega as configurações do bot
-        await self.change_presence(activity=discord.Game(name=config.get('status', 'Patrick Rauch Consultoria')))  # Define o status do bot
+        # Define o status do bot a partir da configuração em memória
+        with fase_inicializacao("presenca"):  # Mede a definição da presença
+            self.status_atual = None  # Força a definição da presença após (re)conexão
+            await self._aplicar_config(carregar_config())  # Define o status do bot
+        # Registra o tempo total até o bot ficar pronto na primeira conexão
+        if not self.pronto_registrado:
+            registrar_fase("pronto", time.perf_counter() - INICIO_PROCESSO)  # Mede o tempo até ficar pronto
+            self.pronto_registrado = True  # Evita medir novamente em reconexões
         # Imprime uma mensagem indicando que o bot está online
         print(f"Entramos como {self.user}.")  # Imprime mensagem de login bem-sucedido
         
@@ -62,29 +139,91 @@ class BotClient(discord.Client):
         if self.update_task is None:
             self.update_task = self.loop.create_task(self.verificar_atualizacoes_loop())  # Inicia a tarefa de verificação de atualizações
 
+    async def sincronizar_escopos(self):
+        # Os comandos globais são sincronizados apenas pelo processo que executa o shard 0
+        if self.shard_ids is None or 0 in self.shard_ids:
+            await sincronizar_comandos(self.tree)  # Sincroniza globalmente, se as definições mudaram
+        # Servidores que receberam comandos próprios em versões anteriores têm esses comandos removidos:
+        # os do arquivo de assinaturas, o servidor fixo antigo e os de "servidores_comandos", se ainda configurados.
+        # Cada processo cuida dos servidores atendidos pelos seus shards
+        antigos = {SERVIDOR_COMANDOS_ANTIGO, *config_manager.obter().get('servidores_comandos', ())}  # Servidores das versões anteriores
+        for guild_id in sorted(antigos.union(servidores_sincronizados(self.tree))):
+            if self.shard_ids is not None and shard_do_servidor(guild_id, self.shard_count) not in self.shard_ids:
+                continue  # Servidor atendido por outro processo
+            try:
+                await sincronizar_comandos(self.tree, guild=discord.Object(id=guild_id))  # Sincroniza o servidor, se as definições mudaram
+            except discord.errors.Forbidden as e:
+                logger.error(f"Erro ao sincronizar comandos no servidor {guild_id}: {e}")  # O bot não tem acesso ao servidor
+
+    async def on_shard_connect(self, shard_id):
+        # Contabiliza a conexão do shard
+        registrar_evento_shard(shard_id, "conexao")  # Registra nas métricas
+        logger.info(f"Shard {shard_id} conectado")  # Registra a conexão
+
+    async def on_shard_disconnect(self, shard_id):
+        # Contabiliza a desconexão do shard
+        registrar_evento_shard(shard_id, "desconexao")  # Registra nas métricas
+        logger.warning(f"Shard {shard_id} desconectado")  # Registra a desconexão
+
+    async def on_shard_resumed(self, shard_id):
+        # Contabiliza a retomada da sessão do shard
+        registrar_evento_shard(shard_id, "retomada")  # Registra nas métricas
+
+    async def on_app_command_completion(self, interaction: discord.Interaction, command):
+        # Registra a duração total do comando concluído
+        registrar_fim(interaction, command.qualified_name)  # Registra nas métricas
+
+    async def on_guild_join(self, guild):
+        # Cadastra o novo servidor e guarda seu id no cache
+        await servidores.resolver(guild)  # Upsert do servidor no banco
+
+    async def _aplicar_config(self, config):
+        # Atualiza a presença do bot quando o status configurado muda
+        status = config.get('status', 'Patrick Rauch Consultoria')  # Lê o status configurado
+        if status != self.status_atual:
+            self.status_atual = status  # Registra o novo status
+            await self.change_presence(activity=discord.Game(name=status))  # Define o status do bot
+
+    async def close(self):
+        # Encerra o servidor de métricas, se estiver ativo
+        if self.servidor_metricas is not None:
+            await self.servidor_metricas.cleanup()  # Libera a porta do servidor de métricas
+        # Encerra a escuta das alterações do banco
+        await self.ouvinte.encerrar()  # Fecha a conexão LISTEN
+        # Fecha o pool assíncrono do banco de dados antes de desconectar
+        await fechar_conexoes_async()  # Libera as conexões assíncronas
+        await super().close()  # Encerra a conexão com o Discord
+
+    async def manutencao_diaria(self):
+        # Cria antecipadamente as partições da auditoria de clãs, uma vez por dia
+        hoje = datetime.date.today()  # Data atual
+        if self.ultima_manutencao == hoje:
+            return
+        try:
+            await garantir_particoes()  # Cria as partições dos próximos meses, se faltarem
+            self.ultima_manutencao = hoje  # Registra a data da manutenção
+        except BancoIndisponivel as e:
+            logger.error(f"Banco indisponível na manutenção da auditoria: {e}")  # Tenta novamente no próximo ciclo
+
     async def verificar_atualizacoes_loop(self):
         # Loop infinito para verificar atualizações periodicamente
         while True:
             await verificar_atualizacoes()  # Verifica atualizações
+            await self.manutencao_diaria()  # Executa a manutenção diária do banco
+            prefixos.aquecer()  # Tenta novamente carregar o índice de nomes e TAGs, se ele ainda não estiver pronto
             await asyncio.sleep(60)  # Aguarda 60 segundos antes da próxima verificação
 
-# Cria uma instância do cliente do bot
-client = BotClient()  # Instancia o cliente do bot
-
-# Cria uma instância do bot de comandos
-intents = discord.Intents.default()  # Define as intenções padrão
-intents.members = True  # Habilita a intenção de membros
-intents.message_content = True  # Habilita a intenção de conteúdo de mensagens
-
-bot = commands.Bot(command_prefix='!', intents=intents)  # Cria uma instância do bot de comandos
-
 # Bloco de inicialização do script
 if __name__ == "__main__":
+    # Lê os shards executados por este processo (a linha de comando tem prioridade sobre o config.json)
+    parser = argparse.ArgumentParser(description="Bot do Discord")  # Cria o leitor de argumentos
+    parser.add_argument("--shards", type=int, help="quantidade total de shards")  # Total de shards de todos os processos
+    parser.add_argument("--shard-ids", help="shards executados por este processo, por exemplo 0-3 ou 0,2")  # Intervalo deste processo
+    args = parser.parse_args()  # Lê os argumentos
+
     # Carrega o token do arquivo config.json
     try:
-        with open('config.json', 'r') as config_file:
-            config = json.load(config_file)
-            token = config['token']
+        token = config_manager.obter()['token']
     except FileNotFoundError:
         logger.error("Arquivo config.json não encontrado.")
         exit(1)
@@ -95,34 +234,30 @@ if __name__ == "__main__":
         logger.error("Erro ao decodificar o arquivo config.json.")
         exit(1)
 
+    config_shards = config_manager.obter().get('shards', {})  # Seção opcional de shards
+    total_shards = args.shards or config_shards.get('total')  # Total de shards
+    ids_shards = args.shard_ids or config_shards.get('ids')  # Shards deste processo
+    shard_ids = ler_intervalo(ids_shards) if ids_shards else None  # Converte "0-3" em [0, 1, 2, 3]
+    if shard_ids is not None and total_shards is None:
+        logger.error("Informe a quantidade total de shards (--shards ou shards.total) ao escolher os shards do processo.")
+        exit(1)
+
+    # Cria uma instância do cliente do bot
+    client = BotClient(shard_count=total_shards, shard_ids=shard_ids)  # Instancia o cliente do bot
+
     # Inicia o bot com o token de autenticação carregado do config.json
-    client.run(token)
-
-# Comando para sincronização manual dos comandos
-@bot.command()
-@commands.is_owner()
-async def sync(ctx):
-    # Registra o início da sincronização
-    logger.info("Iniciando sincronização...")  # Registra o início da sincronização
-    try:
-        # Tenta sincronizar os comandos
-        synced = await bot.tree.sync()  # Sincroniza os comandos
-        # Registra e envia uma mensagem com o número de comandos sincronizados
-        logger.info(f"Sincronizado {len(synced)} comando(s)")  # Registra o número de comandos sincronizados
-        await ctx.send(f"Sincronizado {len(synced)} comando(s)")  # Envia mensagem de confirmação
-    except Exception as e:
-        # Em caso de erro, registra e envia uma mensagem de erro
-        logger.error(f"Erro durante a sincronização manual: {e}", exc_info=True)  # Registra o erro
-        await ctx.send(f"Erro durante a sincronização: {e}")  # Envia mensagem de erro
+    client.run(token, log_handler=None)  # Mantém o logging em fila configurado acima (sem o handler padrão do discord.py)
 
 # Resumo do arquivo:
 # Este arquivo define a estrutura principal de um bot do Discord. Ele inclui:
 # 1. Importação de módulos necessários
 # 2. Configuração de logging
 # 3. Definição da classe BotClient, que gerencia a funcionalidade principal do bot
-# 4. Configuração de comandos administrativos e de usuário
-# 5. Implementação de funções para sincronização de comandos e verificação de atualizações
-# 6. Criação de instâncias do cliente do bot e do bot de comandos
-# 7. Inicialização do bot com um token de autenticação
-# 8. Implementação de um comando de sincronização manual
+# 4. Configuração de comandos administrativos e de usuário, todos registrados globalmente (as permissões e
+#    configurações de cada servidor vêm de config_servidores.py)
+# 5. Implementação de funções para sincronização de comandos (somente quando as definições mudam) e verificação de atualizações
+#    e medição do tempo de cada fase da inicialização, além da manutenção diária das partições da auditoria de clãs
+# 6. Execução em shards (AutoShardedClient), com a quantidade total e os shards de cada processo definidos na linha
+#    de comando (--shards, --shard-ids) ou na seção "shards" do config.json, e métricas de conexão por shard
+# 7. Criação da instância do cliente do bot e inicialização com um token de autenticação
 # O bot é configurado para responder a comandos, verificar atualizações periodicamente e manter seu status atualizado.
\ No newline at end of file
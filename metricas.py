@@ -0,0 +1,263 @@
+# Importa os módulos necessários
+import bisect  # Importa o módulo bisect para localizar a faixa de cada medição
+import logging  # Importa o módulo logging para registrar eventos
+import math  # Importa o módulo math para o limite infinito dos histogramas
+import re  # Importa o módulo re para normalizar as rotas HTTP
+import time  # Importa o módulo time para medir durações
+from contextlib import contextmanager  # Importa o decorador de gerenciadores de contexto
+
+# Configura o logger para este módulo
+logger = logging.getLogger('bot')
+
+# Limites superiores (em segundos) das faixas dos histogramas
+LIMITES_PADRAO = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, math.inf)
+
+# Chave usada em interaction.extras para guardar o início do comando
+CHAVE_INICIO = "metricas_inicio"
+
+class Histograma:
+    """
+    Histograma de faixas fixas, no formato usado pelo Prometheus.
+    """
+    __slots__ = ("limites", "contagens", "soma", "total")
+
+    def __init__(self, limites=LIMITES_PADRAO):
+        self.limites = limites
+        self.contagens = [0] * len(limites)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        self.contagens[bisect.bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+    def percentil(self, p):
+        """
+        Estima o percentil p (0 a 100) interpolando dentro da faixa correspondente.
+        """
+        if not self.total:
+            return 0.0
+        alvo = self.total * p / 100
+        acumulado = 0
+        for i, contagem in enumerate(self.contagens):
+            if contagem and acumulado + contagem >= alvo:
+                inferior = self.limites[i - 1] if i else 0.0
+                superior = self.limites[i]
+                if math.isinf(superior):
+                    return inferior
+                return inferior + (superior - inferior) * (alvo - acumulado) / contagem
+            acumulado += contagem
+        return self.limites[-2]
+
+class Metricas:
+    """
+    Registro em memória de histogramas e contadores, identificados por nome e rótulos.
+    """
+
+    def __init__(self):
+        self._histogramas = {}
+        self._contadores = {}
+        self.inicio = time.time()
+
+    def observar(self, nome, valor, **rotulos):
+        chave = (nome, tuple(sorted(rotulos.items())))
+        histograma = self._histogramas.get(chave)
+        if histograma is None:
+            histograma = self._histogramas[chave] = Histograma()
+        histograma.observar(valor)
+
+    def incrementar(self, nome, valor=1, **rotulos):
+        chave = (nome, tuple(sorted(rotulos.items())))
+        self._contadores[chave] = self._contadores.get(chave, 0) + valor
+
+    @contextmanager
+    def medir(self, nome, **rotulos):
+        """
+        Mede a duração do bloco e a registra no histograma informado.
+        """
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(nome, time.perf_counter() - inicio, **rotulos)
+
+    def histogramas(self, nome=None):
+        """
+        Retorna [(nome, rótulos, histograma)], opcionalmente filtrando pelo nome.
+        """
+        return [(n, dict(r), h) for (n, r), h in self._histogramas.items() if nome is None or n == nome]
+
+    def contador(self, nome, **rotulos):
+        return self._contadores.get((nome, tuple(sorted(rotulos.items()))), 0)
+
+    def texto_prometheus(self):
+        """
+        Exporta todas as métricas no formato de texto do Prometheus.
+        """
+        linhas = []
+        tipos_emitidos = set()
+        for (nome, rotulos), histograma in sorted(self._histogramas.items(), key=lambda item: item[0]):
+            if nome not in tipos_emitidos:
+                linhas.append(f"# TYPE {nome} histogram")
+                tipos_emitidos.add(nome)
+            acumulado = 0
+            for limite, contagem in zip(histograma.limites, histograma.contagens):
+                acumulado += contagem
+                le = "+Inf" if math.isinf(limite) else repr(limite)
+                linhas.append(f"{nome}_bucket{_formatar_rotulos(rotulos + (('le', le),))} {acumulado}")
+            linhas.append(f"{nome}_sum{_formatar_rotulos(rotulos)} {histograma.soma}")
+            linhas.append(f"{nome}_count{_formatar_rotulos(rotulos)} {histograma.total}")
+        for (nome, rotulos), valor in sorted(self._contadores.items(), key=lambda item: item[0]):
+            if nome not in tipos_emitidos:
+                linhas.append(f"# TYPE {nome} counter")
+                tipos_emitidos.add(nome)
+            linhas.append(f"{nome}{_formatar_rotulos(rotulos)} {valor}")
+        return "\n".join(linhas) + "\n"
+
+def _formatar_rotulos(rotulos):
+    if not rotulos:
+        return ""
+    partes = []
+    for chave, valor in rotulos:
+        valor = str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        partes.append(f'{chave}="{valor}"')
+    return "{" + ",".join(partes) + "}"
+
+# Instância única compartilhada por todos os módulos
+metricas = Metricas()
+
+# ---------------------------------------------------------------------------
+# Comandos de aplicação
+# ---------------------------------------------------------------------------
+
+def marcar_inicio(interaction):
+    """
+    Registra o início do processamento de uma interação.
+    """
+    interaction.extras[CHAVE_INICIO] = time.perf_counter()
+
+def registrar_fim(interaction, comando, erro=False):
+    """
+    Registra a duração total de um comando a partir do início marcado.
+    """
+    inicio = interaction.extras.get(CHAVE_INICIO)
+    if inicio is None:
+        return
+    metricas.observar("bot_comando_segundos", time.perf_counter() - inicio, comando=comando)
+    if erro:
+        metricas.incrementar("bot_comando_erros_total", comando=comando)
+
+async def adiar(interaction, **kwargs):
+    """
+    Equivalente a interaction.response.defer(**kwargs), registrando quanto tempo o
+    comando levou até confirmar o recebimento da interação.
+    """
+    await interaction.response.defer(**kwargs)
+    inicio = interaction.extras.get(CHAVE_INICIO)
+    if inicio is not None and interaction.command is not None:
+        metricas.observar("bot_comando_defer_segundos", time.perf_counter() - inicio,
+                          comando=interaction.command.qualified_name)
+
+# ---------------------------------------------------------------------------
+# Inicialização
+# ---------------------------------------------------------------------------
+
+def registrar_fase(fase, duracao):
+    """
+    Registra a duração de uma fase da inicialização do bot.
+    """
+    metricas.observar("bot_inicializacao_segundos", duracao, fase=fase)
+    logger.info(f"Inicialização: {fase} em {duracao * 1000:.0f}ms")
+
+@contextmanager
+def fase_inicializacao(fase):
+    """
+    Mede a duração do bloco como uma fase da inicialização do bot.
+    """
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar_fase(fase, time.perf_counter() - inicio)
+
+# ---------------------------------------------------------------------------
+# Requisições HTTP ao Discord
+# ---------------------------------------------------------------------------
+
+# Normalização das rotas para evitar um rótulo por ID ou token
+_PADRAO_VERSAO = re.compile(r'^/api/v\d+')
+_PADRAO_ID = re.compile(r'/\d{15,21}(?=/|$)')
+_PADRAO_TOKEN = re.compile(r'/(webhooks|interactions)/\{id\}/[^/]+')
+
+def normalizar_rota(caminho):
+    caminho = _PADRAO_VERSAO.sub('', caminho)
+    caminho = _PADRAO_ID.sub('/{id}', caminho)
+    return _PADRAO_TOKEN.sub(r'/\1/{id}/{token}', caminho)
+
+def criar_trace_http():
+    """
+    Cria um aiohttp.TraceConfig que mede todas as requisições HTTP feitas ao Discord,
+    incluindo as respostas de interações e os followups.
+    """
+    import aiohttp
+
+    async def ao_iniciar(session, contexto, params):
+        contexto.inicio = time.perf_counter()
+
+    async def ao_terminar(session, contexto, params):
+        rota = f"{params.method} {normalizar_rota(params.url.path)}"
+        metricas.observar("bot_discord_http_segundos", time.perf_counter() - contexto.inicio, rota=rota)
+        metricas.incrementar("bot_discord_http_respostas_total", rota=rota, status=params.response.status)
+
+    trace = aiohttp.TraceConfig()
+    trace.on_request_start.append(ao_iniciar)
+    trace.on_request_end.append(ao_terminar)
+    return trace
+
+# ---------------------------------------------------------------------------
+# Exposição
+# ---------------------------------------------------------------------------
+
+def resumo(nome, limite=15):
+    """
+    Retorna linhas de texto com contagem, p50, p99 e tempo total dos histogramas
+    de um nome, ordenadas pelo tempo total.
+    """
+    itens = sorted(metricas.histogramas(nome), key=lambda item: item[2].soma, reverse=True)
+    linhas = []
+    for _, rotulos, histograma in itens[:limite]:
+        descricao = ", ".join(str(valor) for valor in rotulos.values()) or "-"
+        linhas.append(
+            f"{descricao[:45]:45} n={histograma.total:<6} "
+            f"p50={histograma.percentil(50) * 1000:7.1f}ms p99={histograma.percentil(99) * 1000:7.1f}ms "
+            f"total={histograma.soma:8.2f}s"
+        )
+    return linhas
+
+async def iniciar_servidor_metricas(host, porta):
+    """
+    Inicia um servidor HTTP local que responde em /metrics no formato do Prometheus.
+    Retorna o runner do aiohttp, que deve ser encerrado com runner.cleanup().
+    """
+    from aiohttp import web
+
+    async def responder(request):
+        return web.Response(text=metricas.texto_prometheus(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/metrics", responder)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, porta).start()
+    logger.info(f"Métricas disponíveis em http://{host}:{porta}/metrics")
+    return runner
+
+# Resumo do arquivo:
+# Este arquivo implementa a instrumentação do bot: histogramas de faixas fixas e contadores em memória,
+# com custo de registro constante (uma busca binária e uma soma por medição).
+# São medidos o tempo total e o tempo até o defer de cada comando de aplicação, cada chamada ao banco
+# (por função de database.py e tabela, ou pela função que chamou executar_query), cada requisição HTTP ao Discord
+# e cada fase da inicialização (imports, pool do banco, setup_hook, sincronização dos comandos, presença).
+# As métricas são exibidas pelo comando administrativo /metricas e, opcionalmente, por um endpoint local
+# no formato de texto do Prometheus.
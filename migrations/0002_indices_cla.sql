@@ -0,0 +1,13 @@
+-- Índices para as consultas mais frequentes do bot
+
+-- Busca dos clãs de um membro (members_cla @> ARRAY[...])
+CREATE INDEX IF NOT EXISTS idx_cla_members_cla ON cla USING GIN (members_cla);
+
+-- Verificação de nome duplicado por servidor (name_cla = ... AND servidor_id = ...)
+-- A coluna servidor_id na frente também atende a listagem de clãs por servidor
+CREATE INDEX IF NOT EXISTS idx_cla_servidor_nome ON cla (servidor_id, name_cla);
+
+-- Verificação de TAG duplicada por servidor (tag_cla = ... AND servidor_id = ...)
+CREATE INDEX IF NOT EXISTS idx_cla_servidor_tag ON cla (servidor_id, tag_cla);
+
+-- membros.discord_id e servidores.discord_id já possuem índices únicos (UNIQUE)
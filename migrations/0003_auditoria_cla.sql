@@ -0,0 +1,109 @@
+-- Histórico de alterações dos clãs em uma tabela própria, somente de inserção,
+-- substituindo o array cla.id_modificou (que crescia a cada edição)
+
+-- Uma linha por alteração: ação, autor e diferença de membros
+CREATE TABLE IF NOT EXISTS cla_auditoria (
+    id BIGSERIAL,
+    cla_id INTEGER NOT NULL,  -- Sem chave estrangeira: o histórico permanece após a exclusão do clã
+    acao VARCHAR(20) NOT NULL,  -- criar, adicionar, remover, editar, excluir ou historico (migrado de id_modificou)
+    autor_id INTEGER REFERENCES membros(id),
+    adicionados INTEGER[] NOT NULL DEFAULT '{}',
+    removidos INTEGER[] NOT NULL DEFAULT '{}',
+    criado_em TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (criado_em, id)
+) PARTITION BY RANGE (criado_em);
+
+-- Histórico de um clã, do mais recente para o mais antigo (paginação por cursor)
+CREATE INDEX IF NOT EXISTS idx_cla_auditoria_cla ON cla_auditoria (cla_id, criado_em DESC, id DESC);
+
+-- Partição padrão: recebe as linhas de meses sem partição própria
+CREATE TABLE IF NOT EXISTS cla_auditoria_padrao PARTITION OF cla_auditoria DEFAULT;
+
+-- Cria as partições mensais de 'inicio' até 'meses_a_frente' meses após o mês atual.
+-- Um mês que já tenha linhas na partição padrão é mantido lá.
+CREATE OR REPLACE FUNCTION criar_particoes_cla_auditoria(inicio DATE, meses_a_frente INTEGER) RETURNS void AS $$
+DECLARE
+    mes DATE := date_trunc('month', inicio);
+BEGIN
+    WHILE mes <= date_trunc('month', CURRENT_DATE) + make_interval(months => meses_a_frente) LOOP
+        BEGIN
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS %I PARTITION OF cla_auditoria FOR VALUES FROM (%L) TO (%L)',
+                'cla_auditoria_' || to_char(mes, 'YYYY_MM'), mes, (mes + INTERVAL '1 month')::DATE
+            );
+        EXCEPTION WHEN check_violation THEN
+            RAISE NOTICE 'Partição de % mantida na partição padrão', to_char(mes, 'YYYY-MM');
+        END;
+        mes := mes + INTERVAL '1 month';
+    END LOOP;
+END $$ LANGUAGE plpgsql;
+
+SELECT criar_particoes_cla_auditoria(
+    COALESCE((SELECT min(ult_atualizacao)::DATE FROM cla), CURRENT_DATE), 3
+);
+
+-- Registra automaticamente cada criação, alteração de membros e exclusão de clã,
+-- na mesma transação da escrita
+CREATE OR REPLACE FUNCTION registrar_auditoria_cla() RETURNS trigger AS $$
+DECLARE
+    entrada INTEGER[];
+    saida INTEGER[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO cla_auditoria (cla_id, acao, autor_id, adicionados)
+        VALUES (NEW.id, 'criar', NEW.last_modified_by, COALESCE(NEW.members_cla, '{}'));
+        RETURN NEW;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO cla_auditoria (cla_id, acao, autor_id, removidos)
+        VALUES (OLD.id, 'excluir', OLD.last_modified_by, COALESCE(OLD.members_cla, '{}'));
+        RETURN OLD;
+    END IF;
+
+    entrada := ARRAY(SELECT unnest(NEW.members_cla) EXCEPT SELECT unnest(OLD.members_cla));
+    saida := ARRAY(SELECT unnest(OLD.members_cla) EXCEPT SELECT unnest(NEW.members_cla));
+    INSERT INTO cla_auditoria (cla_id, acao, autor_id, adicionados, removidos)
+    VALUES (
+        NEW.id,
+        CASE
+            WHEN cardinality(saida) = 0 AND cardinality(entrada) > 0 THEN 'adicionar'
+            WHEN cardinality(entrada) = 0 AND cardinality(saida) > 0 THEN 'remover'
+            ELSE 'editar'
+        END,
+        NEW.last_modified_by, entrada, saida
+    );
+    RETURN NEW;
+END $$ LANGUAGE plpgsql;
+
+-- Substitui o array de modificadores pelo último modificador
+ALTER TABLE cla ADD COLUMN IF NOT EXISTS last_modified_by INTEGER REFERENCES membros(id);
+
+-- Migra o histórico existente: cada entrada de id_modificou vira um evento, na ordem original
+-- (a data de cada entrada não era registrada, então todas recebem a data da última atualização)
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = 'cla' AND column_name = 'id_modificou') THEN
+        INSERT INTO cla_auditoria (cla_id, acao, autor_id, criado_em)
+        SELECT c.id, 'historico', h.autor_id, COALESCE(c.ult_atualizacao, CURRENT_TIMESTAMP)
+        FROM cla c
+        CROSS JOIN LATERAL unnest(c.id_modificou) WITH ORDINALITY AS h(autor_id, ordem)
+        WHERE EXISTS (SELECT 1 FROM membros m WHERE m.id = h.autor_id)
+        ORDER BY c.id, h.ordem;
+
+        UPDATE cla SET last_modified_by = id_modificou[array_upper(id_modificou, 1)]
+        WHERE id_modificou IS NOT NULL
+          AND EXISTS (SELECT 1 FROM membros m WHERE m.id = id_modificou[array_upper(id_modificou, 1)]);
+
+        ALTER TABLE cla DROP COLUMN id_modificou;
+    END IF;
+END $$;
+
+DROP TRIGGER IF EXISTS trg_cla_auditoria ON cla;
+CREATE TRIGGER trg_cla_auditoria
+    AFTER INSERT OR DELETE ON cla
+    FOR EACH ROW EXECUTE FUNCTION registrar_auditoria_cla();
+
+DROP TRIGGER IF EXISTS trg_cla_auditoria_membros ON cla;
+CREATE TRIGGER trg_cla_auditoria_membros
+    AFTER UPDATE OF members_cla ON cla
+    FOR EACH ROW WHEN (OLD.members_cla IS DISTINCT FROM NEW.members_cla)
+    EXECUTE FUNCTION registrar_auditoria_cla();
@@ -0,0 +1,8 @@
+-- Busca de membros por trecho do nome, tolerante a erros de digitação (/usuario buscar)
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Atende tanto a semelhança por trigramas (<%) quanto o ILIKE '%trecho%'
+CREATE INDEX IF NOT EXISTS idx_membros_nome_trgm ON membros USING GIN (nome gin_trgm_ops);
+
+-- membros.discord_id e membros.steam_id já possuem índices únicos (UNIQUE)
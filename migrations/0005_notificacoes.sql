@@ -0,0 +1,38 @@
+-- Notificações de alteração (LISTEN/NOTIFY) para os caches em memória dos processos do bot.
+-- Cada linha inserida, alterada ou excluída em cla, membros e servidores gera uma notificação
+-- no canal bot_alteracoes, inclusive para edições feitas diretamente no banco.
+
+-- Payload: {"tabela": ..., "operacao": "add" | "edit" | "exclude", "id": ..., "origem": application_name}
+-- 'origem' permite que cada processo ignore as próprias escritas (já aplicadas em memória).
+CREATE OR REPLACE FUNCTION notificar_alteracao_bot() RETURNS trigger AS $$
+DECLARE
+    registro_id INTEGER;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        registro_id := OLD.id;
+    ELSE
+        registro_id := NEW.id;
+    END IF;
+    PERFORM pg_notify('bot_alteracoes', json_build_object(
+        'tabela', TG_TABLE_NAME,
+        'operacao', CASE TG_OP WHEN 'INSERT' THEN 'add' WHEN 'UPDATE' THEN 'edit' ELSE 'exclude' END,
+        'id', registro_id,
+        'origem', current_setting('application_name', true)
+    )::text);
+    RETURN NULL;
+END $$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_cla_notificar ON cla;
+CREATE TRIGGER trg_cla_notificar
+    AFTER INSERT OR UPDATE OR DELETE ON cla
+    FOR EACH ROW EXECUTE FUNCTION notificar_alteracao_bot();
+
+DROP TRIGGER IF EXISTS trg_membros_notificar ON membros;
+CREATE TRIGGER trg_membros_notificar
+    AFTER INSERT OR UPDATE OR DELETE ON membros
+    FOR EACH ROW EXECUTE FUNCTION notificar_alteracao_bot();
+
+DROP TRIGGER IF EXISTS trg_servidores_notificar ON servidores;
+CREATE TRIGGER trg_servidores_notificar
+    AFTER INSERT OR UPDATE OR DELETE ON servidores
+    FOR EACH ROW EXECUTE FUNCTION notificar_alteracao_bot();
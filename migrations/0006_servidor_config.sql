@@ -0,0 +1,38 @@
+-- Configurações de cada servidor do Discord (administradores, canal de logs, limite de membros
+-- por clã e limites de uso dos comandos). Colunas nulas ou vazias usam os valores do config.json.
+CREATE TABLE IF NOT EXISTS servidor_config (
+    servidor_id INTEGER PRIMARY KEY REFERENCES servidores(id) ON DELETE CASCADE,
+    admin_ids BIGINT[] NOT NULL DEFAULT '{}',
+    canal_logs BIGINT,
+    limite_membros INTEGER CHECK (limite_membros BETWEEN 2 AND 100),
+    limites JSONB NOT NULL DEFAULT '{}',
+    atualizado_em TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- O limite de 13 membros por clã passa a ser configurado por servidor; o banco mantém apenas um teto
+ALTER TABLE cla DROP CONSTRAINT IF EXISTS cla_members_cla_check;
+ALTER TABLE cla ADD CONSTRAINT cla_members_cla_check CHECK (cardinality(members_cla) <= 100);
+
+-- A notificação de alteração aceita a coluna da chave como argumento do trigger (padrão: id)
+CREATE OR REPLACE FUNCTION notificar_alteracao_bot() RETURNS trigger AS $$
+DECLARE
+    registro JSONB;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        registro := to_jsonb(OLD);
+    ELSE
+        registro := to_jsonb(NEW);
+    END IF;
+    PERFORM pg_notify('bot_alteracoes', json_build_object(
+        'tabela', TG_TABLE_NAME,
+        'operacao', CASE TG_OP WHEN 'INSERT' THEN 'add' WHEN 'UPDATE' THEN 'edit' ELSE 'exclude' END,
+        'id', (registro ->> COALESCE(TG_ARGV[0], 'id'))::INTEGER,
+        'origem', current_setting('application_name', true)
+    )::text);
+    RETURN NULL;
+END $$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_servidor_config_notificar ON servidor_config;
+CREATE TRIGGER trg_servidor_config_notificar
+    AFTER INSERT OR UPDATE OR DELETE ON servidor_config
+    FOR EACH ROW EXECUTE FUNCTION notificar_alteracao_bot('servidor_id');
@@ -0,0 +1,21 @@
+-- Adição concorrente de membros a clãs diferentes. O FOR UPDATE de ATUALIZACAO_MEMBROS_CLA trava apenas
+-- o clã alterado, e uma subconsulta na mesma instrução enxerga os outros clãs como estavam no início dela;
+-- duas edições simultâneas podiam colocar o mesmo membro em dois clãs.
+-- membros_livres trava cada candidato (advisory lock até o fim da transação, em ordem crescente para não
+-- haver deadlock) e só então procura os outros clãs. Como a função é VOLATILE, essa consulta usa um snapshot
+-- novo e enxerga a edição concorrente que acabou de ser confirmada.
+-- Retorna, na ordem informada, os candidatos que não estão em nenhum clã além de cla_alvo.
+CREATE OR REPLACE FUNCTION membros_livres(cla_alvo INTEGER, candidatos INTEGER[]) RETURNS INTEGER[] AS $$
+DECLARE
+    membro INTEGER;
+BEGIN
+    FOR membro IN SELECT DISTINCT c FROM unnest(candidatos) AS c ORDER BY c LOOP
+        PERFORM pg_advisory_xact_lock(hashtext('cla_membros'), membro);
+    END LOOP;
+    RETURN ARRAY(
+        SELECT u.membro_id
+        FROM unnest(candidatos) WITH ORDINALITY AS u(membro_id, ordem)
+        WHERE NOT EXISTS (SELECT 1 FROM cla o WHERE o.members_cla @> ARRAY[u.membro_id] AND o.id <> cla_alvo)
+        ORDER BY u.ordem
+    );
+END $$ LANGUAGE plpgsql VOLATILE;
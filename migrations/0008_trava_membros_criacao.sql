@@ -0,0 +1,19 @@
+-- Criação de clãs concorrente com edições. A verificação de membros de /cla criar era feita no índice em
+-- memória, sem trava: uma criação simultânea a uma edição podia colocar o mesmo membro em dois clãs do servidor.
+-- membros_livres_no_servidor usa a mesma trava por membro de membros_livres (migração 0007) e, como ela,
+-- consulta os clãs só depois de obter as travas, com um snapshot novo (VOLATILE).
+-- Retorna, na ordem informada, os candidatos que não estão em nenhum clã do servidor.
+CREATE OR REPLACE FUNCTION membros_livres_no_servidor(servidor_alvo INTEGER, candidatos INTEGER[]) RETURNS INTEGER[] AS $$
+DECLARE
+    membro INTEGER;
+BEGIN
+    FOR membro IN SELECT DISTINCT c FROM unnest(candidatos) AS c ORDER BY c LOOP
+        PERFORM pg_advisory_xact_lock(hashtext('cla_membros'), membro);
+    END LOOP;
+    RETURN ARRAY(
+        SELECT u.membro_id
+        FROM unnest(candidatos) WITH ORDINALITY AS u(membro_id, ordem)
+        WHERE NOT EXISTS (SELECT 1 FROM cla o WHERE o.members_cla @> ARRAY[u.membro_id] AND o.servidor_id = servidor_alvo)
+        ORDER BY u.ordem
+    );
+END $$ LANGUAGE plpgsql VOLATILE;
@@ -0,0 +1,80 @@
+class Linha:
+    """
+    Base das linhas tipadas: cada coluna do SELECT vira um atributo (em __slots__, sem __dict__),
+    preenchido pelo nome da coluna, de modo que a ordem das colunas na consulta não importa.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, **colunas):
+        for nome, valor in colunas.items():
+            setattr(self, nome, valor)
+
+    @classmethod
+    def colunas(cls, prefixo=""):
+        """
+        Lista de colunas para o SELECT, na ordem de __slots__ (ex.: "c.id, c.servidor_id").
+        """
+        return ", ".join(f"{prefixo}{coluna}" for coluna in cls.__slots__)
+
+    def __repr__(self):
+        valores = ", ".join(f"{coluna}={getattr(self, coluna, None)!r}" for coluna in self.__slots__)
+        return f"{type(self).__name__}({valores})"
+
+# ----------------------------------------------------------------------
+# Tabela cla
+# ----------------------------------------------------------------------
+
+class ClaResumo(Linha):
+    """
+    Clã no índice de membros (indice_membros.py).
+    """
+    __slots__ = ("id", "servidor_id", "name_cla", "members_cla", "ativo", "ult_atualizacao")
+
+class ClaMembros(Linha):
+    """
+    Clã na verificação de consistência do índice de membros.
+    """
+    __slots__ = ("id", "servidor_id", "members_cla")
+
+class ClaNome(Linha):
+    """
+    Nome e TAG de um clã (índice de prefixos e histórico de clãs).
+    """
+    __slots__ = ("id", "servidor_id", "name_cla", "tag_cla")
+
+class CartaoCla(Linha):
+    """
+    Clã com líder, último modificador e membros já resolvidos para discord_id (cartão de /cla status e /cla list).
+    """
+    __slots__ = ("id", "name_cla", "tag_cla", "ativo", "ult_atualizacao", "servidor_id",
+                 "lider_discord_id", "modificador_discord_id", "membros_discord_ids")
+
+# ----------------------------------------------------------------------
+# Tabelas membros e servidores
+# ----------------------------------------------------------------------
+
+class Membro(Linha):
+    """
+    Id interno e discord_id de um membro.
+    """
+    __slots__ = ("id", "discord_id")
+
+class MembroBusca(Linha):
+    """
+    Membro encontrado por /usuario buscar, com a semelhança ao termo buscado.
+    """
+    __slots__ = ("id", "discord_id", "nome", "steam_id", "semelhanca")
+
+class Servidor(Linha):
+    """
+    Id interno e discord_id de um servidor.
+    """
+    __slots__ = ("id", "discord_id")
+
+# Resumo do arquivo:
+# Este arquivo define as linhas tipadas das tabelas cla, membros e servidores. Cada classe lista em __slots__
+# exatamente as colunas que a consulta precisa (o SELECT é montado com colunas() ou usa os mesmos nomes), e o
+# cursor assíncrono cria os objetos pelo nome das colunas (class_row do psycopg 3) quando executar_query_async
+# recebe modelo=. Sem __dict__, cada linha ocupa pouco mais que uma tupla, e o código acessa os campos pelo nome
+# em vez de desempacotar posições que precisam seguir a ordem do SELECT.
@@ -0,0 +1,157 @@
+# Importa os módulos necessários
+import asyncio  # Importa o módulo asyncio para a tarefa de escuta
+import json  # Importa o módulo json para ler o conteúdo das notificações
+import logging  # Importa o módulo logging para registrar eventos
+import psycopg  # Importa o psycopg 3 para tratar os erros da conexão de escuta
+from database import conectar_async, executar_query_async, notificar_alteracao, BancoIndisponivel, ID_INSTANCIA  # Importa o acesso ao banco
+from metricas import metricas  # Importa o registro de métricas do bot
+
+# Configura o logger para este módulo
+logger = logging.getLogger('bot')
+
+# Canal de notificações usado pelos triggers da migração 0005
+CANAL = "bot_alteracoes"
+
+# Segundos de espera para agrupar as notificações antes de reler as linhas alteradas
+INTERVALO_AGRUPAMENTO = 0.2
+
+# Espera máxima, em segundos, entre tentativas de reconexão
+ESPERA_MAXIMA = 60
+
+# Colunas relidas de cada tabela, repassadas aos observadores de database.py
+COLUNAS = {
+    "cla": "id, servidor_id, name_cla, tag_cla, members_cla, ativo, ult_atualizacao",
+    "membros": "id, discord_id",
+    "servidores": "id, discord_id",
+    "servidor_config": "servidor_id, admin_ids, canal_logs, limite_membros, limites",
+}
+
+# Coluna da chave das tabelas que não usam 'id' (mesmo argumento dos triggers da migração 0006)
+CHAVES = {
+    "servidor_config": "servidor_id",
+}
+
+class OuvinteAlteracoes:
+    """
+    Escuta (LISTEN) as alterações feitas no banco por outros processos do bot ou diretamente
+    no banco, e as aplica aos caches em memória através dos mesmos observadores usados nas
+    escritas locais. Se a conexão cair, reconecta com espera crescente e, como notificações
+    podem ter sido perdidas, recarrega todos os caches com 'ao_reconectar'.
+    """
+
+    def __init__(self, ao_reconectar):
+        self.ao_reconectar = ao_reconectar  # Corrotina que recarrega os caches
+        self.conectado = False
+        self._tarefa = None
+        self._aplicacao = None
+        # tabela -> {id: operacao}, aguardando para serem aplicadas
+        self._pendentes = {}
+
+    async def iniciar(self):
+        """
+        Abre a conexão de escuta e inicia a tarefa em segundo plano. Se o banco estiver
+        fora do ar, a tarefa continua tentando conectar.
+        """
+        conexao = None
+        try:
+            conexao = await self._conectar()
+        except (psycopg.Error, OSError, BancoIndisponivel) as e:
+            logger.error(f"Não foi possível escutar as alterações do banco: {e}")
+        self._tarefa = asyncio.get_running_loop().create_task(self._executar(conexao))
+
+    async def encerrar(self):
+        tarefas = [tarefa for tarefa in (self._tarefa, self._aplicacao) if tarefa is not None]
+        for tarefa in tarefas:
+            tarefa.cancel()
+        # Aguarda as tarefas terminarem (e a conexão de escuta fechar) antes de o pool ser encerrado
+        await asyncio.gather(*tarefas, return_exceptions=True)
+        self._tarefa = self._aplicacao = None
+
+    async def _conectar(self):
+        conexao = await conectar_async()
+        await conexao.execute(f"LISTEN {CANAL}")
+        self.conectado = True
+        logger.info(f"Escutando alterações do banco no canal {CANAL}")
+        return conexao
+
+    async def _executar(self, conexao):
+        espera = 1
+        while True:
+            try:
+                if conexao is None:
+                    conexao = await self._conectar()
+                    # Alterações feitas enquanto a conexão estava fora foram perdidas
+                    await self.ao_reconectar()
+                espera = 1
+                async for notificacao in conexao.notifies():
+                    self._receber(notificacao.payload)
+            except asyncio.CancelledError:
+                if conexao is not None:
+                    await conexao.close()
+                raise
+            except (psycopg.Error, OSError, BancoIndisponivel) as e:
+                logger.warning(f"Conexão de escuta de alterações perdida: {e}; nova tentativa em {espera}s")
+            except Exception as e:
+                # Um erro inesperado (em ao_reconectar, por exemplo) não pode encerrar a escuta de vez
+                logger.error(f"Erro na escuta de alterações do banco: {e}; nova tentativa em {espera}s", exc_info=True)
+            self.conectado = False
+            if conexao is not None:
+                try:
+                    await conexao.close()
+                except (psycopg.Error, OSError):
+                    pass
+                conexao = None
+            await asyncio.sleep(espera)
+            espera = min(espera * 2, ESPERA_MAXIMA)
+
+    def _receber(self, payload):
+        try:
+            alteracao = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Notificação de alteração inválida: {payload!r}")
+            return
+        if alteracao.get("origem") == ID_INSTANCIA or alteracao.get("tabela") not in COLUNAS:
+            # Escritas deste processo já foram aplicadas aos caches
+            return
+        metricas.incrementar("bot_notificacoes_total", tabela=alteracao["tabela"])
+        self._pendentes.setdefault(alteracao["tabela"], {})[alteracao["id"]] = alteracao["operacao"]
+        if self._aplicacao is None or self._aplicacao.done():
+            self._aplicacao = asyncio.get_running_loop().create_task(self._aplicar_pendentes())
+
+    async def _aplicar_pendentes(self):
+        # Agrupa as notificações recebidas em sequência e relê cada tabela com uma única consulta.
+        # Notificações que chegam durante a releitura são aplicadas na volta seguinte do laço.
+        while self._pendentes:
+            await asyncio.sleep(INTERVALO_AGRUPAMENTO)
+            pendentes, self._pendentes = self._pendentes, {}
+            for tabela, operacoes in pendentes.items():
+                try:
+                    await self._aplicar_tabela(tabela, operacoes)
+                except BancoIndisponivel as e:
+                    logger.warning(f"Alterações em {tabela} não aplicadas (banco indisponível): {e}")
+                except Exception as e:
+                    logger.error(f"Erro ao aplicar as alterações em {tabela}: {e}", exc_info=True)
+
+    async def _aplicar_tabela(self, tabela, operacoes):
+        colunas = COLUNAS[tabela]
+        chave = CHAVES.get(tabela, "id")
+        linhas = await executar_query_async(
+            f"SELECT {colunas} FROM {tabela} WHERE {chave} = ANY(%s)", (list(operacoes),), "notificacoes"
+        )
+        if linhas is None:
+            return
+        nomes = [coluna.strip() for coluna in colunas.split(",")]
+        for linha in linhas:
+            registro = dict(zip(nomes, linha))
+            notificar_alteracao(tabela, operacoes.pop(registro[chave]), [registro])
+        # Linhas que não existem mais foram excluídas
+        if operacoes:
+            notificar_alteracao(tabela, "exclude", [{chave: registro_id} for registro_id in operacoes])
+
+# Resumo do arquivo:
+# Este arquivo define o OuvinteAlteracoes, que mantém os caches em memória (índice de membros, índice de nomes
+# e TAGs, cartões de clã, servidores e configurações por servidor) atualizados quando outro processo do bot, ou
+# uma edição manual, altera as tabelas cla, membros, servidores ou servidor_config. Os triggers das migrações
+# 0005 e 0006 publicam cada alteração no canal
+# bot_alteracoes (NOTIFY); aqui as notificações são agrupadas, as linhas alteradas são relidas e repassadas aos
+# observadores de database.py. Em caso de queda da conexão, o ouvinte reconecta e recarrega todos os caches.
@@ -0,0 +1,61 @@
+# Importa os módulos necessários
+import math  # Importa o módulo math para identificar latências ainda desconhecidas
+from metricas import metricas  # Importa o registro de métricas do bot
+
+def ler_intervalo(texto):
+    """
+    Converte uma lista de shards no formato "0-3" ou "0,2,5" (ou uma lista já pronta) em uma lista de inteiros.
+    """
+    if not isinstance(texto, str):
+        return [int(shard_id) for shard_id in texto]
+    shard_ids = []
+    for parte in texto.split(","):
+        inicio, _, fim = parte.strip().partition("-")
+        shard_ids.extend(range(int(inicio), int(fim or inicio) + 1))
+    return shard_ids
+
+def shard_do_servidor(guild_id, total_shards):
+    """
+    Retorna o shard responsável pelo servidor (fórmula do Discord).
+    """
+    return (guild_id >> 22) % total_shards
+
+def shard_da_interacao(interaction):
+    # Mensagens diretas são sempre recebidas pelo shard 0
+    return interaction.guild.shard_id if interaction.guild is not None else 0
+
+def registrar_interacao(interaction):
+    """
+    Contabiliza a interação no shard que a recebeu.
+    """
+    metricas.incrementar("bot_interacoes_total", shard=str(shard_da_interacao(interaction)))
+
+def registrar_evento_shard(shard_id, evento):
+    """
+    Contabiliza um evento de conexão do shard (conexao, desconexao, retomada).
+    """
+    metricas.incrementar("bot_shard_eventos_total", shard=str(shard_id), evento=evento)
+
+def estatisticas_shards(client):
+    """
+    Retorna, para cada shard deste processo: latência (ms), servidores, interações recebidas e desconexões.
+    """
+    servidores = {}
+    for guild in client.guilds:
+        servidores[guild.shard_id] = servidores.get(guild.shard_id, 0) + 1
+    estatisticas = []
+    for shard_id, latencia in sorted(client.latencies):
+        estatisticas.append({
+            "shard": shard_id,
+            "latencia_ms": None if math.isinf(latencia) or math.isnan(latencia) else latencia * 1000,
+            "servidores": servidores.get(shard_id, 0),
+            "interacoes": metricas.contador("bot_interacoes_total", shard=str(shard_id)),
+            "desconexoes": metricas.contador("bot_shard_eventos_total", shard=str(shard_id), evento="desconexao"),
+        })
+    return estatisticas
+
+# Resumo do arquivo:
+# Este arquivo reúne o apoio à execução em shards (AutoShardedClient): leitura das listas de shards
+# ("0-3", "0,2"), cálculo do shard responsável por um servidor e a contabilização, por shard, das interações
+# recebidas e dos eventos de conexão, exibidos aos administradores pelo comando /shards junto com a latência
+# e a quantidade de servidores de cada shard.
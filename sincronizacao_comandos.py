@@ -0,0 +1,95 @@
+# Importa os módulos necessários
+import hashlib  # Importa o módulo hashlib para calcular a assinatura dos comandos
+import json  # Importa o módulo json para serializar as definições e o arquivo de assinaturas
+import logging  # Importa o módulo logging para registrar eventos
+import os  # Importa o módulo os para o caminho do arquivo de assinaturas
+
+# Configura o logger para este módulo
+logger = logging.getLogger('bot')
+
+# Arquivo onde as assinaturas da última sincronização são guardadas (pode ser trocado por BOT_COMANDOS_CACHE).
+# Por padrão fica na pasta do bot, e não no diretório de onde o processo foi iniciado.
+ARQUIVO_ASSINATURAS = os.environ.get(
+    'BOT_COMANDOS_CACHE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.comandos_sincronizados.json')
+)
+
+def _definicao(comando, tree):
+    # O discord.py 2.4+ exige a árvore em to_dict(); versões anteriores não aceitam o argumento
+    try:
+        return comando.to_dict(tree)
+    except TypeError:
+        return comando.to_dict()
+
+def assinatura_comandos(tree, guild=None):
+    """
+    Calcula um hash estável das definições dos comandos registrados na árvore
+    para o escopo informado (global, se guild for None).
+    """
+    definicoes = sorted(
+        (_definicao(comando, tree) for comando in tree.get_commands(guild=guild)),
+        key=lambda definicao: (definicao.get('type', 1), definicao['name'])
+    )
+    conteudo = json.dumps(definicoes, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+def _chave(tree, guild):
+    # A assinatura é guardada por aplicação e por escopo
+    escopo = str(guild.id) if guild is not None else "global"
+    return f"{tree.client.application_id}:{escopo}"
+
+def _ler_assinaturas():
+    try:
+        with open(ARQUIVO_ASSINATURAS, 'r') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+def _gravar_assinaturas(assinaturas):
+    # Grava em um arquivo temporário e substitui, para não deixar o arquivo pela metade
+    temporario = ARQUIVO_ASSINATURAS + ".tmp"
+    with open(temporario, 'w') as f:
+        json.dump(assinaturas, f, indent=4)
+    os.replace(temporario, ARQUIVO_ASSINATURAS)
+
+def servidores_sincronizados(tree):
+    """
+    Retorna os IDs dos servidores com comandos próprios sincronizados por esta aplicação
+    (guardados no arquivo de assinaturas).
+    """
+    prefixo = f"{tree.client.application_id}:"
+    return [
+        int(chave[len(prefixo):]) for chave in _ler_assinaturas()
+        if chave.startswith(prefixo) and chave[len(prefixo):].isdigit()
+    ]
+
+async def sincronizar_comandos(tree, guild=None, forcar=False):
+    """
+    Sincroniza os comandos do escopo informado somente se as definições mudaram
+    desde a última sincronização (ou se forcar=True). Retorna True se sincronizou.
+    Erros do Discord (por exemplo discord.Forbidden) são repassados a quem chamou.
+    """
+    chave = _chave(tree, guild)
+    assinatura = assinatura_comandos(tree, guild)
+    assinaturas = _ler_assinaturas()
+    if not forcar and assinaturas.get(chave) == assinatura:
+        logger.info(f"Comandos de {chave} inalterados; sincronização ignorada")
+        return False
+
+    sincronizados = await tree.sync(guild=guild)
+    logger.info(f"Sincronizado(s) {len(sincronizados)} comando(s) em {chave}")
+    assinaturas[chave] = assinatura
+    try:
+        _gravar_assinaturas(assinaturas)
+    except OSError as e:
+        logger.error(f"Não foi possível gravar as assinaturas dos comandos: {e}")
+    return True
+
+# Resumo do arquivo:
+# Este arquivo evita sincronizações desnecessárias da árvore de comandos com o Discord, que são lentas
+# e sujeitas a limites de requisição. Um hash estável das definições dos comandos de cada escopo (global
+# ou servidor) é comparado com o da última sincronização, guardado em um arquivo local; a sincronização
+# só acontece quando o hash muda ou quando um administrador a força com /sincronizar_comandos.
+# Servidores que ficaram sem comandos próprios (por exemplo os antigos servidores dos comandos administrativos,
+# hoje globais) são sincronizados uma vez com a lista vazia, para remover os comandos; a assinatura da lista
+# vazia fica guardada e as inicializações seguintes não voltam a chamar o Discord para eles.
@@ -0,0 +1,43 @@
+# Testes do disjuntor do banco (database.py) contra um PostgreSQL real.
+# Usam o banco do arquivo de configuração indicado por BOT_CONFIG e são ignorados sem ele.
+import asyncio
+import os
+import pytest
+
+pytest.importorskip("psycopg2")
+pytest.importorskip("psycopg_pool")
+if not os.environ.get("BOT_CONFIG"):
+    pytest.skip("BOT_CONFIG não definido: testes com banco ignorados", allow_module_level=True)
+
+import database
+
+@pytest.fixture
+def banco_isolado(monkeypatch):
+    # Timeout curto e circuito que abriria na primeira falha de conexão, com pools e disjuntor novos
+    opcoes = dict(database.opcoes_banco(), statement_timeout_ms=100, circuito_falhas=1, pool_min=1, pool_max=1)
+    monkeypatch.setattr(database, "opcoes_banco", lambda: opcoes)
+    monkeypatch.setattr(database, "circuito", database.Circuito())
+    monkeypatch.setattr(database, "connection_pool", None)
+    monkeypatch.setattr(database, "_pool_async", None)
+    monkeypatch.setattr(database, "_pool_async_lock", None)
+    yield
+    database.fechar_conexoes()
+
+def test_query_lenta_nao_abre_o_circuito(banco_isolado):
+    assert database.executar_query("SELECT pg_sleep(1)") is None
+    assert database.circuito.estado == database.Circuito.FECHADO
+    assert database.executar_query("SELECT 1") == [(1,)]
+
+def test_query_lenta_assincrona_nao_abre_o_circuito(banco_isolado):
+    async def executar():
+        try:
+            lenta = await database.executar_query_async("SELECT pg_sleep(1)")
+            seguinte = await database.executar_query_async("SELECT 1")
+        finally:
+            await database.fechar_conexoes_async()
+        return lenta, seguinte
+
+    lenta, seguinte = asyncio.run(executar())
+    assert lenta is None
+    assert database.circuito.estado == database.Circuito.FECHADO
+    assert seguinte == [(1,)]